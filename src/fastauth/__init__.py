@@ -1,6 +1,6 @@
 import logging
 
-from .core.config import AuthConfig, RBACConfig, ABACConfig
+from .core.config import AuthConfig, RBACConfig, ABACConfig, HashingConfig, ProxyConfig, IPAccessConfig, RateLimitConfig, LockoutConfig, RiskConfig, StuffingConfig, GeoIPConfig, OAuthConfig
 from .core.manager import AuthManager
 
 logging.getLogger("fastauth").addHandler(logging.NullHandler())
@@ -5,6 +5,7 @@ Provides dependency functions for:
 - Getting the current authenticated user
 - Getting the current session ID
 - Extracting credentials from requests
+- Rejecting clients denied by the IP access lists
 """
 
 from typing import TYPE_CHECKING, Any, Callable, Coroutine, Optional
@@ -12,8 +13,10 @@ from typing import TYPE_CHECKING, Any, Callable, Coroutine, Optional
 from fastapi import HTTPException, Request, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from ..exceptions import (CredentialsException, SessionException,
-                          TokenException, UserException)
+from ..audit import audit_event
+from ..exceptions import (AccessDeniedException, CredentialsException,
+                          SessionException, TokenException, UserException)
+from ..utils import get_request_meta
 
 if TYPE_CHECKING:
     from ..core.manager import AuthManager
@@ -54,21 +57,23 @@ def get_current_user_dependency(
     """
     use_bearer = _get_use_bearer(auth)
     security = HTTPBearer(auto_error=False)
+    # Strategies whose credentials are not tied to a session (API keys)
+    identifies_user = getattr(auth.strategy, "identifies_user", False)
 
     async def _get_current_user_impl(request: Request) -> BaseUser:
         """Core implementation for getting current user."""
         credentials = await _extract_credentials(request, auth)
 
-        # Extract user ID from credentials if jwt strategy
+        # Extract user ID from credentials if jwt strategy (or API keys)
         user_id = None
         session_user_id = None
-        if auth.is_jwt_strategy:
+        if auth.is_jwt_strategy or identifies_user:
             user_id = credentials.get("sub") or credentials.get("user_id")
             if not user_id:
                 raise CredentialsException("Invalid token: missing subject")
 
         # Validate session if session store is configured
-        if auth.session:
+        if auth.session and not identifies_user:
             session_id = credentials.get("sid")
             if not session_id:
                 raise CredentialsException("No session ID in token")
@@ -89,7 +94,7 @@ def get_current_user_dependency(
 
         # Fetch user from user store
         lookup_user_id = session_user_id or user_id
-        user = await auth.user.get(lookup_user_id)
+        user = await auth.user_loader.load(lookup_user_id)
         if not user:
             raise UserException("User not found", status_code=404)
 
@@ -150,3 +155,35 @@ def get_current_session_dependency(
             return await _get_current_session_impl(request)
 
         return current_session_with_cookie
+
+
+def get_ip_access_dependency(
+    auth: "AuthManager",
+) -> Callable[[Request], Coroutine[Any, Any, None]]:
+    """Factory to create the IP access list dependency.
+
+    Returns a callable that rejects requests whose client IP is denied by
+    `auth.ip_access` with a 403, before any other auth work. Without a
+    trusted-proxy resolver (`AuthConfig.proxy`) the direct peer address is
+    checked, since forwarding headers can be set by the client.
+    """
+    access_list = auth.ip_access
+    if access_list is None:
+        raise ValueError("IP access lists are not configured")
+
+    async def check_ip_access(request: Request) -> None:
+        access_list.poll()
+        if auth.client_ip_resolver is not None:
+            client_ip = get_request_meta(request, auth.client_ip_resolver).client_ip
+        else:
+            client_ip = request.client.host if request.client else None
+        if not access_list.is_allowed(client_ip):
+            audit_event(
+                "ip_access_denied",
+                ip_address=client_ip,
+                success=False,
+                path=request.url.path,
+            )
+            raise AccessDeniedException()
+
+    return check_ip_access
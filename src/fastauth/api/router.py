@@ -6,18 +6,25 @@ Provides:
 - POST /auth/login - User login
 - POST /auth/logout - User logout
 - GET /auth/oauth/{provider} - OAuth login redirect
+- GET /auth/oauth/{provider}/callback - OAuth callback
 """
 
+import hmac
+import math
+import secrets
 import uuid
 from typing import TYPE_CHECKING, Any, Optional
 
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response
+from fastapi.responses import RedirectResponse
 
-from ..crypto import hash_password, verify_password, soft_fingerprint
-from ..exceptions import (LoginException, LogoutException, SessionException,
-                          SignUpException, TokenException, UserException)
+from ..audit import audit_event
+from ..exceptions import (LoginException, LogoutException, OAuthException,
+                          RateLimitException, SessionException,
+                          ServiceUnavailableException, SignUpException,
+                          TokenException, UserException)
 from ..users.base import BaseUser
-from ..utils import get_accept_language, get_client_ip, get_user_agent, get_accept_encoding
+from ..utils import get_request_meta
 
 if TYPE_CHECKING:
     from ..core.manager import AuthManager
@@ -29,7 +36,12 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
     Creates endpoints for signup, login, logout, and OAuth.
     Uses the provided AuthManager for business logic.
     """
-    router = APIRouter(prefix="/auth", tags=["Authentication"])
+    # The IP access check runs before every auth route
+    router = APIRouter(
+        prefix="/auth",
+        tags=["Authentication"],
+        dependencies=[Depends(auth.check_ip_access)] if auth.check_ip_access else [],
+    )
 
     async def _issue_tokens(
         request: Request, response: Response, user: BaseUser
@@ -47,11 +59,8 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
         Returns:
             Token dict if not using cookies, None otherwise
         """
-        # Extract request metadata for audit logging
-        user_agent = get_user_agent(request)
-        accept_language = get_accept_language(request)
-        accept_encoding = get_accept_encoding(request)
-        client_ip = get_client_ip(request)
+        # Request metadata shared with the login checks and audit events
+        meta = get_request_meta(request, auth.client_ip_resolver)
 
         # Generate unique token identifier
         jti = str(uuid.uuid4())
@@ -65,8 +74,14 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
         session_id: Optional[str] = None
         if auth.session:
             try:
-                fingerprint = soft_fingerprint(user_agent, client_ip, accept_language, accept_encoding)
-                session_data = {"jti": jti, "user_agent": user_agent, "ip": client_ip, "fingerprint": fingerprint}
+                session_data = {
+                    "jti": jti,
+                    "user_agent": meta.user_agent,
+                    "device_class": meta.user_agent_info.device_class,
+                    "ip": meta.client_ip,
+                    "fingerprint": meta.fingerprint.hex(),
+                }
+                session_data.update(_geo_context(request, meta.client_ip))
                 session_id = await auth.session.create(
                     user_id=user_id,
                     data=session_data,
@@ -88,6 +103,80 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
 
         return token
 
+    def _geo_context(request: Request, client_ip: str) -> dict[str, Any]:
+        """Return the client's country and ASN, if a GeoIP table is configured.
+
+        The result is cached on `request.state`, so the login checks and
+        session creation share one lookup.
+        """
+        if not auth.geoip:
+            return {}
+        geo = getattr(request.state, "geoip", None)
+        if geo is None:
+            record = auth.geoip.lookup(client_ip)
+            geo = {}
+            if record:
+                geo = {"country": record.country, "asn": record.asn}
+            request.state.geoip = geo
+        return geo
+
+    def _login_identifier(login_data: dict[str, Any]) -> Optional[str]:
+        """Return a normalized key for the account a login targets.
+
+        Uses the first configured login field present in the request,
+        lowercased so case variations share one limit.
+        """
+        for field in auth.config.login_fields:
+            value = login_data.get(field)
+            if value:
+                return f"{field}:{str(value).strip().lower()}"
+        return None
+
+    async def _enforce_rate_limit(
+        request: Request, limits: list[tuple[str, int, float]]
+    ) -> None:
+        """Reject the request with a 429 if any of `limits` is exhausted.
+
+        Runs before any user lookup or password hashing so rejected
+        requests stay cheap. Limits are checked in order and the first
+        exhausted one rejects; hits already taken from earlier limits are
+        refunded when the limiter supports it, so e.g. a login blocked by
+        its account limit doesn't use up the client IP's allowance.
+
+        Args:
+            request: FastAPI request (for audit metadata)
+            limits: Tuples of (key, limit, period_seconds)
+        """
+        retry_after = 0.0
+        for i, (key, limit, period_seconds) in enumerate(limits):
+            retry_after = await auth.rate_limiter.hit(key, limit, period_seconds)
+            if retry_after > 0:
+                if hasattr(auth.rate_limiter, "refund"):
+                    for allowed in limits[:i]:
+                        await auth.rate_limiter.refund(*allowed)
+                break
+        if retry_after > 0:
+            audit_event(
+                "rate_limited",
+                ip_address=get_request_meta(request, auth.client_ip_resolver).client_ip,
+                success=False,
+                path=request.url.path,
+            )
+            raise RateLimitException(retry_after=max(1, math.ceil(retry_after)))
+
+    async def _rehash_password(user_id: str, password: str) -> None:
+        """Upgrade a stale password hash to the current parameters.
+
+        Runs as a background task after the login response is sent, so it
+        never adds to login latency and never fails the login.
+        """
+        try:
+            hashed_password = await auth.password_hasher.hash(password)
+            await auth.user.update_password(user_id, hashed_password)
+            audit_event("password_rehash", user_id=user_id, success=True)
+        except Exception:
+            audit_event("password_rehash", user_id=user_id, success=False)
+
     async def _build_user_response(
         user: BaseUser, token: Optional[dict[str, str]] = None
     ) -> dict[str, Any]:
@@ -116,6 +205,20 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
         Validates password, hashes it, creates user, and optionally logs in.
         """
         try:
+            if auth.rate_limiter:
+                limits = auth.config.rate_limit
+                client_ip = get_request_meta(request, auth.client_ip_resolver).client_ip
+                await _enforce_rate_limit(
+                    request,
+                    [
+                        (
+                            f"signup:ip:{client_ip}",
+                            limits.signup_ip_limit,
+                            limits.signup_ip_period_seconds,
+                        )
+                    ],
+                )
+
             # Extract password and user data
             password = form.password
             user_data = form.model_dump(exclude={"password"})
@@ -124,6 +227,11 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
             if not any(field in user_data for field in auth.config.login_fields):
                 raise SignUpException("Missing login field")
 
+            # Reject oversized input before it reaches the hasher
+            max_length = auth.config.hashing.max_password_length
+            if max_length is not None and len(password) > max_length:
+                raise SignUpException("Password is too long")
+
             # Validate password strength
             try:
                 auth.config.password_validator(password)
@@ -131,7 +239,7 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
                 raise SignUpException(f"Weak password: {str(e)}")
 
             # Hash password and create user
-            hashed_password = hash_password(password)
+            hashed_password = await auth.password_hasher.hash(password)
             user_data["password"] = hashed_password
 
             try:
@@ -150,6 +258,8 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
             raise
         except SignUpException:
             raise
+        except (RateLimitException, ServiceUnavailableException):
+            raise
         except Exception as e:
             raise SignUpException(str(e))
 
@@ -158,6 +268,7 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
         form: auth.config.login_request,
         request: Request,
         response: Response,
+        background_tasks: BackgroundTasks,
     ):
         """Authenticate a user and issue tokens.
 
@@ -169,14 +280,109 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
             if not any(field in login_data for field in auth.config.login_fields):
                 raise LoginException()
 
-            # Find user by login field
-            user = await auth.user.find(**login_data)
-            if not user:
+            client_ip = get_request_meta(request, auth.client_ip_resolver).client_ip
+            identifier = _login_identifier(login_data)
+            geo = _geo_context(request, client_ip)
+
+            # Throttle by client IP and by targeted account
+            if auth.rate_limiter:
+                limits = auth.config.rate_limit
+                checks = [
+                    (
+                        f"login:ip:{client_ip}",
+                        limits.login_ip_limit,
+                        limits.login_ip_period_seconds,
+                    )
+                ]
+                if identifier:
+                    checks.append(
+                        (
+                            f"login:id:{identifier}",
+                            limits.login_identifier_limit,
+                            limits.login_identifier_period_seconds,
+                        )
+                    )
+                await _enforce_rate_limit(request, checks)
+
+            # Refuse attempts whose recent failure history looks like an attack
+            block_score = auth.config.risk.block_score
+            if auth.risk and block_score is not None:
+                score = auth.risk.score(client_ip, identifier)
+                if score >= block_score:
+                    audit_event(
+                        "login_blocked",
+                        ip_address=client_ip,
+                        success=False,
+                        risk_score=score,
+                        **geo,
+                    )
+                    raise RateLimitException(
+                        retry_after=max(1, math.ceil(auth.config.risk.window_seconds))
+                    )
+
+            # Many distinct accounts from one source looks like credential stuffing
+            if auth.stuffing and identifier:
+                flagged = auth.stuffing.observe(client_ip, identifier)
+                if flagged and auth.config.stuffing.block:
+                    audit_event(
+                        "login_blocked",
+                        ip_address=client_ip,
+                        success=False,
+                        reason="credential_stuffing",
+                        **geo,
+                    )
+                    raise RateLimitException(
+                        retry_after=max(1, math.ceil(auth.config.stuffing.window_seconds))
+                    )
+
+            max_length = auth.config.hashing.max_password_length
+            if max_length is not None and len(form.password) > max_length:
                 raise LoginException()
 
-            # Verify password
-            if not verify_password(form.password, user.password):
+            # Back off repeated failures per account before any hashing;
+            # the attempt counts as a failure until the password checks out
+            if auth.lockout and identifier:
+                locked_for = await auth.lockout.attempt(identifier)
+                if locked_for > 0:
+                    audit_event(
+                        "login_locked",
+                        ip_address=client_ip,
+                        success=False,
+                        retry_after=locked_for,
+                        **geo,
+                    )
+                    raise RateLimitException(
+                        "Too many failed login attempts",
+                        retry_after=max(1, math.ceil(locked_for)),
+                    )
+
+            # Find user by login field and verify password
+            try:
+                user = await auth.user.find(**login_data)
+                verified = bool(user) and await auth.password_hasher.verify(
+                    form.password, user.password
+                )
+            except Exception:
+                # The password was never checked (shed load, broken pool,
+                # store outage): don't let overload lock users out
+                if auth.lockout and identifier:
+                    if hasattr(auth.lockout, "refund"):
+                        await auth.lockout.refund(identifier)
+                    else:
+                        await auth.lockout.reset(identifier)
+                raise
+            if auth.risk:
+                auth.risk.record(client_ip, identifier, success=verified)
+            if not verified:
                 raise LoginException()
+            if auth.lockout and identifier:
+                await auth.lockout.reset(identifier)
+
+            # Upgrade hashes made with outdated parameters after responding
+            if hasattr(auth.user, "update_password") and auth.password_hasher.needs_update(
+                user.password
+            ):
+                background_tasks.add_task(_rehash_password, user.id, form.password)
 
             # Issue tokens
             token = await _issue_tokens(request, response, user)
@@ -185,6 +391,8 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
 
         except LoginException:
             raise
+        except (RateLimitException, ServiceUnavailableException):
+            raise
         except Exception as e:
             raise LoginException(str(e))
 
@@ -204,12 +412,172 @@ def build_auth_router(auth: "AuthManager") -> APIRouter:
         except Exception as e:
             raise LogoutException(str(e))
 
-    # OAuth routes (if OAuth provider configured)
-    if auth.oauth:
+    # OAuth routes (if OAuth providers configured)
+    if auth.oauth_providers:
+        # Binds each flow to the browser that started it (login CSRF)
+        state_cookie = f"{auth.config.slug}_oauth_state"
+        state_cookie_path = f"{router.prefix}/oauth"
+        # Identities the store can't link are only found again by a
+        # verified email that is a login field
+        links_oauth = hasattr(auth.user, "find_by_oauth") and hasattr(auth.user, "link_oauth")
+        finds_by_email = "email" in auth.config.login_fields
+
+        def _oauth_provider(name: str):
+            provider = auth.oauth_providers.get(name)
+            if provider is None:
+                raise OAuthException("Unknown OAuth provider", status_code=404)
+            return provider
+
+        async def _resolve_oauth_user(profile: dict[str, Any]) -> tuple[BaseUser, str]:
+            """Find, link or create the local user for a provider identity.
+
+            A user is only created when the same identity will resolve to
+            it on the next login: through the store's OAuth link, or by a
+            verified email that is a login field. Unverified emails never
+            create or claim an account.
+
+            Args:
+                profile: Normalized user from the provider's `fetch_user`
+
+            Returns:
+                The user and how it was resolved: "linked" (existing
+                link), "email" (linked by verified email) or "created"
+            """
+            provider, subject = profile["provider"], profile["id"]
+            if links_oauth:
+                user = await auth.user.find_by_oauth(provider, subject)
+                if user is not None:
+                    return user, "linked"
+
+            email = profile.get("email")
+            verified = bool(email and profile.get("email_verified"))
+            user = None
+            if email and finds_by_email:
+                user = await auth.user.find(email=email)
+            if user is not None:
+                # Linking on an address the provider hasn't verified would
+                # hand the account to whoever registered it there
+                if not verified:
+                    raise OAuthException(
+                        "An account with this email already exists", status_code=409
+                    )
+                resolution = "email"
+            else:
+                if not auth.config.oauth.create_users:
+                    raise OAuthException(
+                        "No account is linked to this login", status_code=403
+                    )
+                if email and not verified:
+                    raise OAuthException(
+                        "The provider has not verified this email address", status_code=403
+                    )
+                if not (links_oauth or (verified and finds_by_email)):
+                    # Creating would make a new account on every login
+                    raise OAuthException(
+                        "This login can't be linked to an account", status_code=403
+                    )
+                user_data: dict[str, Any] = {}
+                if email and "email" in auth.schema.model_fields:
+                    user_data["email"] = email
+                if profile.get("name") and "name" in auth.schema.model_fields:
+                    user_data["name"] = profile["name"]
+                # OAuth-only accounts get a random password nobody knows
+                user_data["password"] = await auth.password_hasher.hash(
+                    secrets.token_urlsafe(32)
+                )
+                try:
+                    user = await auth.user.create(**user_data)
+                except Exception as e:
+                    raise UserException(str(e), status_code=400)
+                resolution = "created"
+
+            if links_oauth:
+                await auth.user.link_oauth(user.id, provider, subject)
+            return user, resolution
 
         @router.get("/oauth/{provider}")
         async def oauth_login(provider: str):
-            """Redirect to OAuth provider for authentication."""
-            return {"url": auth.oauth.get_authorization_url(provider)}
+            """Redirect to OAuth provider for authentication.
+
+            Opens a single-use flow carrying the PKCE verifier and nonce.
+            """
+            oauth = _oauth_provider(provider)
+            flow = await auth.oauth_state.create(oauth.name)
+            url = await oauth.get_authorization_url(
+                state=flow.state,
+                code_challenge=flow.code_challenge,
+                code_challenge_method="S256",
+                nonce=flow.nonce,
+            )
+            response = RedirectResponse(url, status_code=302)
+            response.set_cookie(
+                state_cookie,
+                flow.state,
+                max_age=auth.config.oauth.state_ttl_seconds,
+                path=state_cookie_path,
+                httponly=True,
+                secure=auth.config.secure_cookies,
+                samesite="lax",
+            )
+            return response
+
+        @router.get("/oauth/{provider}/callback")
+        async def oauth_callback(
+            request: Request,
+            response: Response,
+            provider: str,
+            code: str | None = None,
+            state: str | None = None,
+            error: str | None = None,
+        ):
+            """Complete the OAuth flow and log the user in.
+
+            Exchanges the code, fetches the provider's user, resolves or
+            links the local user and issues tokens as `/login` does.
+            """
+            oauth = _oauth_provider(provider)
+            client_ip = get_request_meta(request, auth.client_ip_resolver).client_ip
+            try:
+                if error:
+                    raise OAuthException(f"{oauth.name} login failed: {error}")
+
+                # The state must come back to the browser that started the
+                # flow and is accepted once
+                cookie = request.cookies.get(state_cookie)
+                if not (
+                    code
+                    and state
+                    and cookie
+                    and hmac.compare_digest(cookie.encode(), state.encode())
+                ):
+                    raise OAuthException("Invalid OAuth state")
+                flow = await auth.oauth_state.consume(state, oauth.name)
+                if flow is None:
+                    raise OAuthException("Invalid or expired OAuth state")
+
+                token_data = await oauth.exchange_code(code, code_verifier=flow.code_verifier)
+                profile = await oauth.fetch_user(token_data, nonce=flow.nonce)
+                user, resolution = await _resolve_oauth_user(profile)
+            except OAuthException as e:
+                audit_event(
+                    "oauth_login",
+                    ip_address=client_ip,
+                    success=False,
+                    provider=oauth.name,
+                    reason=e.detail,
+                )
+                raise
+
+            audit_event(
+                "oauth_login",
+                user_id=user.id,
+                ip_address=client_ip,
+                success=True,
+                provider=oauth.name,
+                resolution=resolution,
+            )
+            response.delete_cookie(state_cookie, path=state_cookie_path)
+            token = await _issue_tokens(request, response, user)
+            return await _build_user_response(user, token)
 
     return router
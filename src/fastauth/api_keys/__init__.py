@@ -0,0 +1,5 @@
+from .base import APIKeyStore
+from .memory import MemoryAPIKeyStore
+from .sql import SQLAPIKeyStore
+
+__all__ = ["APIKeyStore", "MemoryAPIKeyStore", "SQLAPIKeyStore"]
@@ -0,0 +1,92 @@
+"""
+API key store protocol definitions.
+
+Defines the interface for API key storage backends (memory, DB, etc.)
+"""
+
+from typing import Any, Protocol
+
+
+class APIKeyStore(Protocol):
+    """Protocol for API key storage implementations.
+
+    Keys are stored by their public *prefix* (the key ID embedded in the
+    key) together with a digest of the secret part. The plaintext secret
+    is never stored. Lookups by prefix are on the hot path of every
+    authenticated request and must be backed by an index.
+
+    Key records are dicts with at least `prefix`, `user_id`, `key_hash`,
+    `name`, `scopes` (list of str), `created_at` and `expires_at`
+    (datetime or None).
+
+    Methods:
+        create: Store a new key
+            Args:
+                prefix: Public key ID
+                user_id: Owner of the key
+                key_hash: Digest of the secret part
+                data: Extra fields (`name`, `scopes`)
+                **kwargs: Additional args (commonly 'ttl' for expiration)
+        get: Retrieve a key by prefix
+            Args:
+                prefix: Public key ID
+            Returns:
+                Key record or None if not found/expired
+        get_by_user: Get all keys for a user
+            Args:
+                user_id: The user ID to find keys for
+            Returns:
+                List of key records, or None if none exist
+        delete: Delete (revoke) a key
+            Args:
+                prefix: Public key ID
+    """
+
+    async def create(
+        self,
+        prefix: str,
+        user_id: str,
+        key_hash: str,
+        data: dict[str, Any],
+        **kwargs: Any,
+    ) -> None:
+        """Store a new API key.
+
+        Args:
+            prefix: Public key ID
+            user_id: Owner of the key
+            key_hash: Digest of the secret part
+            data: Extra fields (`name`, `scopes`)
+            **kwargs: Additional args (commonly 'ttl' for expiration)
+        """
+        ...
+
+    async def get(self, prefix: str) -> dict[str, Any] | None:
+        """Retrieve a key record by prefix.
+
+        Args:
+            prefix: Public key ID
+
+        Returns:
+            Key record or None if not found/expired
+        """
+        ...
+
+    async def get_by_user(self, user_id: str) -> list[dict[str, Any]] | None:
+        """Get all keys for a user.
+
+        Args:
+            user_id: The user ID to find keys for
+
+        Returns:
+            List of key records, or None if none exist
+        """
+        ...
+
+    async def delete(self, prefix: str) -> None:
+        """Delete (revoke) a key.
+
+        Args:
+            prefix: Public key ID
+        """
+        ...
@@ -0,0 +1,99 @@
+"""
+In-memory API key store implementation.
+
+Stores API keys in a dictionary keyed by prefix.
+Note: Keys are not persisted and will be lost on restart.
+Best for development/testing or single-instance deployments.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+
+class MemoryAPIKeyStore:
+    """In-memory API key storage with expiration support."""
+
+    def __init__(self):
+        self.store: dict[str, dict[str, Any]] = {}
+        self.user_keys: dict[str, set[str]] = {}  # user_id -> set of prefixes
+
+    async def create(
+        self,
+        prefix: str,
+        user_id: str,
+        key_hash: str,
+        data: dict[str, Any],
+        **kwargs: Any,
+    ) -> None:
+        """Store a new API key.
+
+        Args:
+            prefix: Public key ID
+            user_id: Owner of the key
+            key_hash: Digest of the secret part
+            data: Extra fields (`name`, `scopes`)
+            **kwargs: Optional 'ttl' in seconds (default: no expiration)
+        """
+        now = datetime.now(timezone.utc)
+        ttl = kwargs.get("ttl")
+
+        self.store[prefix] = {
+            "prefix": prefix,
+            "user_id": user_id,
+            "key_hash": key_hash,
+            "name": data.get("name"),
+            "scopes": list(data.get("scopes") or []),
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=ttl) if ttl else None,
+        }
+        self.user_keys.setdefault(user_id, set()).add(prefix)
+
+    async def get(self, prefix: str) -> dict[str, Any] | None:
+        """Retrieve a key record by prefix, deleting it if expired.
+
+        Args:
+            prefix: Public key ID
+
+        Returns:
+            Key record or None if not found/expired
+        """
+        record = self.store.get(prefix)
+        if not record:
+            return None
+
+        expires_at = record["expires_at"]
+        if expires_at and expires_at < datetime.now(timezone.utc):
+            await self.delete(prefix)
+            return None
+
+        return record
+
+    async def get_by_user(self, user_id: str) -> list[dict[str, Any]] | None:
+        """Get all non-expired keys for a user.
+
+        Args:
+            user_id: The user ID to find keys for
+
+        Returns:
+            List of key records
+        """
+        records = []
+        for prefix in list(self.user_keys.get(user_id, ())):
+            record = await self.get(prefix)
+            if record:
+                records.append(record)
+        return records if records else None
+
+    async def delete(self, prefix: str) -> None:
+        """Delete (revoke) a key.
+
+        Args:
+            prefix: Public key ID
+        """
+        record = self.store.pop(prefix, None)
+        if record:
+            prefixes = self.user_keys.get(record["user_id"])
+            if prefixes:
+                prefixes.discard(prefix)
+                if not prefixes:
+                    del self.user_keys[record["user_id"]]
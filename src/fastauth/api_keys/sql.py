@@ -0,0 +1,149 @@
+"""
+SQL database API key store implementation.
+
+Stores API keys in a SQL database. The `prefix` column is the lookup key
+for every authenticated request and should be the primary key (or carry a
+unique index), e.g. with SQLAlchemy:
+
+    class APIKey(Base):
+        __tablename__ = "api_keys"
+        prefix = Column(String(32), primary_key=True)
+        user_id = Column(String, index=True, nullable=False)
+        key_hash = Column(String(64), nullable=False)
+        name = Column(String, nullable=True)
+        scopes = Column(String, nullable=False, default="")
+        expires_at = Column(DateTime(timezone=True), nullable=True)
+        created_at = Column(DateTime(timezone=True), nullable=False)
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any
+
+from .base import APIKeyStore
+
+if TYPE_CHECKING:
+    from ..core.types import DatabaseSession
+
+
+class SQLAPIKeyStore(APIKeyStore):
+    """SQL database-backed API key store.
+
+    Scopes are stored as a single space-separated string column.
+
+    Args:
+        api_key_model: Database model class for API keys
+        db_session: Database session client (e.g., SQLAlchemy session)
+    """
+
+    def __init__(self, api_key_model: type[Any], db_session: "DatabaseSession"):
+        self.api_key_model = api_key_model
+        self.db_session = db_session
+
+        # Validate API key model
+        required_fields = ["prefix", "user_id", "key_hash", "name", "scopes", "expires_at", "created_at"]
+        missing_fields = [field for field in required_fields if not hasattr(api_key_model, field)]
+        if missing_fields:
+            raise ValueError(f"API key model is missing required fields: {', '.join(missing_fields)}")
+
+    def _to_dict(self, key: Any) -> dict[str, Any]:
+        return {
+            "prefix": key.prefix,
+            "user_id": key.user_id,
+            "key_hash": key.key_hash,
+            "name": key.name,
+            "scopes": key.scopes.split() if key.scopes else [],
+            "expires_at": key.expires_at,
+            "created_at": key.created_at,
+        }
+
+    def _find(self, prefix: str) -> Any:
+        return (
+            self.db_session.query(self.api_key_model)
+            .filter(self.api_key_model.prefix == prefix)
+            .first()
+        )
+
+    async def create(
+        self,
+        prefix: str,
+        user_id: str,
+        key_hash: str,
+        data: dict[str, Any],
+        **kwargs: Any,
+    ) -> None:
+        """Store a new API key.
+
+        Args:
+            prefix: Public key ID
+            user_id: Owner of the key
+            key_hash: Digest of the secret part
+            data: Extra fields (`name`, `scopes`)
+            **kwargs: Optional 'ttl' in seconds (default: no expiration)
+        """
+        now = datetime.now(timezone.utc)
+        ttl = kwargs.get("ttl")
+
+        key = self.api_key_model(
+            prefix=prefix,
+            user_id=user_id,
+            key_hash=key_hash,
+            name=data.get("name"),
+            scopes=" ".join(data.get("scopes") or []),
+            expires_at=now + timedelta(seconds=ttl) if ttl else None,
+            created_at=now,
+        )
+
+        self.db_session.add(key)
+        self.db_session.commit()
+
+    async def get(self, prefix: str) -> dict[str, Any] | None:
+        """Retrieve a key record by prefix.
+
+        Args:
+            prefix: Public key ID
+
+        Returns:
+            Key record or None if not found/expired
+        """
+        key = self._find(prefix)
+        if not key:
+            return None
+
+        if key.expires_at and key.expires_at.replace(tzinfo=timezone.utc) < datetime.now(timezone.utc):
+            return None
+
+        return self._to_dict(key)
+
+    async def get_by_user(self, user_id: str) -> list[dict[str, Any]] | None:
+        """Get all keys for a user.
+
+        Args:
+            user_id: The user ID to find keys for
+
+        Returns:
+            List of key records
+        """
+        keys = (
+            self.db_session.query(self.api_key_model)
+            .filter(self.api_key_model.user_id == user_id)
+            .all()
+        )
+
+        now = datetime.now(timezone.utc)
+        results = [
+            self._to_dict(key)
+            for key in keys
+            if not key.expires_at or key.expires_at.replace(tzinfo=timezone.utc) >= now
+        ]
+        return results if results else None
+
+    async def delete(self, prefix: str) -> None:
+        """Delete (revoke) a key.
+
+        Args:
+            prefix: Public key ID
+        """
+        key = self._find(prefix)
+        if key:
+            self.db_session.delete(key)
+            self.db_session.commit()
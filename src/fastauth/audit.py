@@ -1,6 +1,8 @@
 import logging
 from typing import Any, Dict
 
+from .utils import current_request_meta
+
 audit_logger = logging.getLogger("fastauth.audit")
 
 
@@ -16,9 +18,19 @@ def audit_event(
     """
     Emit a structured audit event.
 
+    The request ID and IP address default to those of the request being
+    handled (see `utils.get_request_meta`).
+
     This function NEVER raises and NEVER configures logging.
     """
     try:
+        if request_id is None or ip_address is None:
+            meta = current_request_meta()
+            if meta is not None:
+                if request_id is None:
+                    request_id = meta.request_id
+                if ip_address is None:
+                    ip_address = meta.client_ip
         audit_logger.info(
             event,
             extra={
@@ -1,6 +1,6 @@
 # auth/config.py
 from enum import Enum
-from typing import Annotated, Any, Callable, Type
+from typing import Annotated, Any, Callable, Literal, Type
 
 from pydantic import BaseModel, StringConstraints, create_model, model_validator
 
@@ -20,6 +20,127 @@ class ABACConfig(BaseModel):
     enabled: bool = False
 
 
+class HashingConfig(BaseModel):
+    backend: Literal["thread", "process"] = "thread"
+    # "passlib" keeps the legacy CryptContext-based hasher
+    scheme: Literal["argon2", "passlib"] = "argon2"
+    # accept bcrypt/PBKDF2/scrypt (and wrapped) hashes, upgrading them on login
+    migrate_legacy_hashes: bool = False
+    max_workers: int | None = None
+    # thread backend: cap concurrent Argon2 runs to fit this budget
+    memory_budget_mib: int | None = None
+    # process backend: bounded submission queue and per-job deadline
+    max_queue_size: int = 256
+    job_timeout_seconds: float | None = None
+    # Argon2 costs (None keeps the library default / calibrated value)
+    time_cost: int | None = None
+    memory_cost_kib: int | None = None
+    parallelism: int | None = None
+    # opt-in startup calibration, persisted to `calibration_file` if set
+    calibrate: bool = False
+    calibration_target_ms: float = 50.0
+    calibration_max_memory_mib: int = 32
+    calibration_file: str | None = None
+    # shed hashing work with a 503 once queueing delay exceeds the target
+    admission_control: bool = False
+    admission_target_delay_ms: float = 50.0
+    admission_interval_ms: float = 500.0
+    admission_max_wait_ms: float = 1000.0
+    # longer passwords are rejected before any hashing (None disables)
+    max_password_length: int | None = 1024
+
+
+class ProxyConfig(BaseModel):
+    # resolve client IPs through trusted proxies only (off: trust headers as-is)
+    enabled: bool = False
+    # CIDRs of reverse proxies allowed to set the forwarding header
+    trusted_proxies: list[str] = []
+    header: Literal["x-forwarded-for", "forwarded"] = "x-forwarded-for"
+
+
+class IPAccessConfig(BaseModel):
+    enabled: bool = False
+    # files of CIDRs/addresses, one per line ("#" and ";" start comments)
+    deny_file: str | None = None
+    allow_file: str | None = None
+    # reject every address not on the allow list
+    allow_only: bool = False
+    # how often the files are checked for changes (None disables hot reload)
+    reload_interval_seconds: float | None = 60.0
+
+
+class RateLimitConfig(BaseModel):
+    enabled: bool = False
+    # login attempts per client IP
+    login_ip_limit: int = 30
+    login_ip_period_seconds: float = 60.0
+    # login attempts per account identifier (first login field sent)
+    login_identifier_limit: int = 10
+    login_identifier_period_seconds: float = 300.0
+    # signups per client IP
+    signup_ip_limit: int = 10
+    signup_ip_period_seconds: float = 3600.0
+
+
+class LockoutConfig(BaseModel):
+    enabled: bool = False
+    # failures per account before the first lock
+    threshold: int = 5
+    # lock windows double from base to max with every further failure
+    base_delay_seconds: float = 1.0
+    max_delay_seconds: float = 900.0
+    # failures are forgotten this long after the last one
+    reset_after_seconds: float = 3600.0
+
+
+class RiskConfig(BaseModel):
+    enabled: bool = False
+    # reject logins scoring at or above this (None only records and scores)
+    block_score: float | None = None
+    ip_failure_threshold: float = 50.0
+    identifier_failure_threshold: float = 10.0
+    # sketch sizing: memory is 2 * windows * depth * width * 4 bytes
+    window_seconds: float = 10.0
+    windows: int = 6
+    decay: float = 0.5
+    sketch_width: int = 16384
+    sketch_depth: int = 4
+
+
+class StuffingConfig(BaseModel):
+    enabled: bool = False
+    # reject logins from flagged sources (False only flags and audits)
+    block: bool = False
+    # distinct login identifiers over the horizon that flag a source
+    ip_threshold: int = 20
+    subnet_threshold: int = 50
+    window_seconds: float = 60.0
+    windows: int = 5
+    ipv4_prefix: int = 24
+    ipv6_prefix: int = 64
+    max_sources: int = 100000
+
+
+class GeoIPConfig(BaseModel):
+    enabled: bool = False
+    # table built with `python -m fastauth.risk.geoip`
+    path: str | None = None
+
+
+class OAuthConfig(BaseModel):
+    # single-use state for OAuth redirects: "memory" (per process) or
+    # "signed" (stateless, needs `state_secret`); pass an
+    # `oauth_state_store` to use Redis instead
+    state_backend: Literal["memory", "signed"] = "memory"
+    state_secret: str | None = None
+    # how long the user may take at the provider
+    state_ttl_seconds: int = 600
+    # create a local user on first login when no account matches; only
+    # for identities the user store can link, or with a verified email
+    # that is a login field
+    create_users: bool = True
+
+
 class AuthConfig(BaseModel):
     slug: LowerSnakeStr
     session_ttl_seconds: int = 3600
@@ -31,6 +152,15 @@ class AuthConfig(BaseModel):
 
     rbac: RBACConfig = RBACConfig()
     abac: ABACConfig = ABACConfig()
+    hashing: HashingConfig = HashingConfig()
+    proxy: ProxyConfig = ProxyConfig()
+    ip_access: IPAccessConfig = IPAccessConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    lockout: LockoutConfig = LockoutConfig()
+    risk: RiskConfig = RiskConfig()
+    stuffing: StuffingConfig = StuffingConfig()
+    geoip: GeoIPConfig = GeoIPConfig()
+    oauth: OAuthConfig = OAuthConfig()
 
     signup_request: Type[BaseModel] | None = None
     login_request: Type[BaseModel] | None = None
@@ -1,17 +1,27 @@
 # auth/manager.py
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
 
 from pydantic import BaseModel
 
 from ..oauth.base import OAuthProvider
+from ..oauth.state.base import OAuthStateStore
+from ..lockout.base import LockoutStore
+from ..ip_access import IPAccessList
+from ..network import ClientIPResolver
+from ..ratelimit.base import RateLimiter
+from ..risk.base import RiskEvaluator
 from ..authorization.base import RoleStore
+from ..crypto import PasswordHasher, build_password_hasher, set_password_hasher
 from ..sessions.base import SessionStore
 from ..strategies.base import AuthStrategy
 from ..users.base import UserStore
+from ..users.loader import UserLoader
 from .config import AuthConfig
 
 if TYPE_CHECKING:
     from ..authorization.engine import AuthorizationEngine
+    from ..risk.geoip import GeoIPDatabase
+    from ..risk.stuffing import CredentialStuffingDetector
 
 
 class AuthManager:
@@ -24,25 +34,158 @@ class AuthManager:
         strategy: AuthStrategy,
         schema: type[BaseModel],
         oauth_provider: OAuthProvider | None = None,
+        oauth_providers: Iterable[OAuthProvider] | None = None,
+        oauth_state_store: OAuthStateStore | None = None,
         role_store: RoleStore | None = None,
         authorization_engine: "AuthorizationEngine | None" = None,
+        password_hasher: PasswordHasher | None = None,
+        client_ip_resolver: ClientIPResolver | None = None,
+        ip_access_list: IPAccessList | None = None,
+        rate_limiter: RateLimiter | None = None,
+        lockout_store: LockoutStore | None = None,
+        risk_evaluator: RiskEvaluator | None = None,
+        stuffing_detector: "CredentialStuffingDetector | None" = None,
+        geoip_database: "GeoIPDatabase | None" = None,
     ):
         self.config = config
         self.user = user_store
+        # Coalesces concurrent user lookups into batched `get_many` calls
+        self.user_loader = UserLoader(user_store)
         self.session = session_store
         self.strategy = strategy
         self.schema = schema
         self.oauth = oauth_provider
+        # Providers by name, each served at /auth/oauth/{name}
+        self.oauth_providers: dict[str, OAuthProvider] = {}
+        for provider in [oauth_provider, *(oauth_providers or ())]:
+            if provider is None:
+                continue
+            if provider.name in self.oauth_providers:
+                raise ValueError(f"Duplicate OAuth provider name '{provider.name}'")
+            self.oauth_providers[provider.name] = provider
+        self.oauth_state = oauth_state_store
+        if self.oauth_providers and self.oauth_state is None:
+            oauth = config.oauth
+            if oauth.state_backend == "signed":
+                if not oauth.state_secret:
+                    raise ValueError(
+                        "Signed OAuth state requires `oauth.state_secret` "
+                        "or an `oauth_state_store`"
+                    )
+                from ..oauth.state.signed import SignedOAuthStateStore
+
+                self.oauth_state = SignedOAuthStateStore(
+                    oauth.state_secret, ttl_seconds=oauth.state_ttl_seconds
+                )
+            else:
+                from ..oauth.state.memory import MemoryOAuthStateStore
+
+                self.oauth_state = MemoryOAuthStateStore(
+                    ttl_seconds=oauth.state_ttl_seconds
+                )
         self.role_store = role_store
         self.authorization = authorization_engine
+        self.password_hasher = password_hasher or build_password_hasher(
+            config.hashing
+        )
+        # `ahash_password`/`averify_password` use it too: one pool per process
+        set_password_hasher(self.password_hasher)
+        # Strategies that verify passwords themselves (HTTP Basic) use the
+        # same configured hasher unless given their own
+        if getattr(strategy, "password_hasher", False) is None:
+            strategy.password_hasher = self.password_hasher
+        self.client_ip_resolver = client_ip_resolver
+        if config.proxy.enabled and self.client_ip_resolver is None:
+            self.client_ip_resolver = ClientIPResolver(
+                config.proxy.trusted_proxies, header=config.proxy.header
+            )
+
+        self.ip_access = ip_access_list
+        self.is_ip_access_enabled = config.ip_access.enabled
+        if self.is_ip_access_enabled and self.ip_access is None:
+            ip_access = config.ip_access
+            if not (ip_access.deny_file or ip_access.allow_file):
+                raise ValueError(
+                    "IP access lists require `ip_access.deny_file`, "
+                    "`ip_access.allow_file` or an `ip_access_list`"
+                )
+            self.ip_access = IPAccessList.from_files(
+                ip_access.deny_file,
+                ip_access.allow_file,
+                allow_only=ip_access.allow_only,
+                reload_interval_seconds=ip_access.reload_interval_seconds,
+            )
+
+        self.rate_limiter = rate_limiter
+
+        self.is_rate_limit_enabled = config.rate_limit.enabled
+        if self.is_rate_limit_enabled and self.rate_limiter is None:
+            from ..ratelimit.memory import MemoryRateLimiter
+
+            self.rate_limiter = MemoryRateLimiter()
+
+        self.lockout = lockout_store
+        self.is_lockout_enabled = config.lockout.enabled
+        if self.is_lockout_enabled and self.lockout is None:
+            from ..lockout.memory import MemoryLockoutStore
+
+            lockout = config.lockout
+            self.lockout = MemoryLockoutStore(
+                threshold=lockout.threshold,
+                base_delay_seconds=lockout.base_delay_seconds,
+                max_delay_seconds=lockout.max_delay_seconds,
+                reset_after_seconds=lockout.reset_after_seconds,
+            )
+
+        self.risk = risk_evaluator
+        self.is_risk_enabled = config.risk.enabled
+        if self.is_risk_enabled and self.risk is None:
+            from ..risk.memory import CountMinRiskEvaluator
+
+            risk = config.risk
+            self.risk = CountMinRiskEvaluator(
+                ip_failure_threshold=risk.ip_failure_threshold,
+                identifier_failure_threshold=risk.identifier_failure_threshold,
+                width=risk.sketch_width,
+                depth=risk.sketch_depth,
+                window_seconds=risk.window_seconds,
+                windows=risk.windows,
+                decay=risk.decay,
+            )
+
+        self.stuffing = stuffing_detector
+        self.is_stuffing_detection_enabled = config.stuffing.enabled
+        if self.is_stuffing_detection_enabled and self.stuffing is None:
+            from ..risk.stuffing import CredentialStuffingDetector
+
+            stuffing = config.stuffing
+            self.stuffing = CredentialStuffingDetector(
+                ip_threshold=stuffing.ip_threshold,
+                subnet_threshold=stuffing.subnet_threshold,
+                window_seconds=stuffing.window_seconds,
+                windows=stuffing.windows,
+                ipv4_prefix=stuffing.ipv4_prefix,
+                ipv6_prefix=stuffing.ipv6_prefix,
+                max_sources=stuffing.max_sources,
+            )
+
+        self.geoip = geoip_database
+        self.is_geoip_enabled = config.geoip.enabled
+        if self.is_geoip_enabled and self.geoip is None:
+            if not config.geoip.path:
+                raise ValueError("GeoIP lookup requires `geoip.path` or a `geoip_database`")
+            from ..risk.geoip import GeoIPDatabase
+
+            self.geoip = GeoIPDatabase(config.geoip.path)
 
         self.is_jwt_strategy = getattr(self.strategy, "is_json_web_token", False)
+        self.identifies_user = getattr(self.strategy, "identifies_user", False)
         self.is_stateless = self.session is None
 
         self.is_rbac_enabled = config.rbac.enabled
         self.is_abac_enabled = config.abac.enabled
 
-        if not self.is_jwt_strategy and self.is_stateless:
+        if not (self.is_jwt_strategy or self.identifies_user) and self.is_stateless:
             raise ValueError(
                 f"Auth strategy `{self.strategy.__class__.__name__}` requires a session store"
             )
@@ -60,11 +203,15 @@ class AuthManager:
         from fastauth.api.dependencies import (
             get_current_session_dependency,
             get_current_user_dependency,
+            get_ip_access_dependency,
         )
         from fastauth.api.router import build_auth_router
 
         self.current_user = get_current_user_dependency(self)
         self.current_session = get_current_session_dependency(self)
+        self.check_ip_access = (
+            get_ip_access_dependency(self) if self.ip_access is not None else None
+        )
 
         if self.is_rbac_enabled and self.role_store:
             from fastauth.authorization.engine import AuthorizationEngine
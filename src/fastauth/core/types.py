@@ -60,6 +60,8 @@ class Redis(Protocol):
     ) -> bool: ...
 
     async def delete(self, key: KeyT) -> int: ...
+    async def getdel(self, key: KeyT) -> Optional[bytes]: ...
+    async def expire(self, key: KeyT, time: ExpiryT) -> bool: ...
 
     async def sadd(self, key: KeyT, value: ValueT) -> int: ...
     async def srem(self, key: KeyT, value: ValueT) -> int: ...
@@ -67,6 +69,13 @@ class Redis(Protocol):
 
     def pipeline(self, transaction: bool = True) -> Pipeline: ...
 
+    # HyperLogLog (credential-stuffing detection)
+    async def pfmerge(self, dest: KeyT, *sources: KeyT) -> bool: ...
+
+    # Lua scripting (rate limiting)
+    async def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any: ...
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args: Any) -> Any: ...
+
 
 # -----------------
 # Database Protocol
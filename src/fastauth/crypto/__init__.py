@@ -0,0 +1,169 @@
+"""
+Cryptographic helpers for FastAuth.
+
+Provides password hashing (sync primitives and async, pool-backed
+`PasswordHasher` backends) plus small digest/fingerprint utilities.
+"""
+
+import hashlib
+import secrets
+from typing import TYPE_CHECKING, Any
+
+from . import passwords
+from .admission import AdmissionControlledPasswordHasher
+from .base import PasswordHasher
+from .hashers import Argon2Hasher, Hasher, PasslibHasher, build_crypt_context
+from .passwords import argon2_memory_cost_kib, hash_password, verify_password
+from .process_pool import ProcessPoolPasswordHasher
+from .thread_pool import ThreadPoolPasswordHasher
+
+if TYPE_CHECKING:
+    from ..core.config import HashingConfig
+
+
+def hash_string(input_string: str) -> str:
+    """Hash a string using SHA-256."""
+    return hashlib.sha256(input_string.encode()).hexdigest()
+
+def compare_hash(hash1: str, hash2: str) -> bool:
+    """Compare two hashes."""
+    return secrets.compare_digest(hash1, hash2)
+
+def soft_fingerprint(user_agent: str, ip: str, accept_language: str, accept_encoding: str) -> str:
+    """Generate a soft fingerprint for a user agent and IP address."""
+    return hash_string(f"{user_agent}:{ip}:{accept_language}:{accept_encoding}")
+
+
+def build_password_hasher(config: "HashingConfig") -> PasswordHasher:
+    """Create the password hashing backend selected by `HashingConfig`."""
+    from .calibration import resolve_argon2_parameters
+    from .legacy import LegacyHasher
+
+    params = resolve_argon2_parameters(config)
+    hasher: Hasher
+    if config.scheme == "passlib":
+        hasher = PasslibHasher(build_crypt_context(**params))
+    elif any(value is not None for value in params.values()):
+        hasher = Argon2Hasher(**params)
+    else:
+        hasher = passwords.default_hasher
+
+    if config.migrate_legacy_hashes:
+        hasher = LegacyHasher(primary=hasher)
+
+    backend: PasswordHasher
+    if config.backend == "process":
+        backend = ProcessPoolPasswordHasher(
+            max_workers=config.max_workers,
+            max_queue_size=config.max_queue_size,
+            job_timeout_seconds=config.job_timeout_seconds,
+            hasher=hasher,
+        )
+    else:
+        backend = ThreadPoolPasswordHasher(
+            max_workers=config.max_workers,
+            memory_budget_mib=config.memory_budget_mib,
+            hasher=hasher,
+        )
+
+    if config.admission_control:
+        return AdmissionControlledPasswordHasher(
+            backend,
+            target_delay_ms=config.admission_target_delay_ms,
+            interval_ms=config.admission_interval_ms,
+            max_wait_ms=config.admission_max_wait_ms,
+        )
+    return backend
+
+
+# The process-wide hasher behind `ahash_password`/`averify_password`. An
+# `AuthManager` installs its configured hasher here, so helpers and routes
+# share one pool; without one, a default thread pool is created on first use.
+_default_hasher: PasswordHasher | None = None
+# Whether `_default_hasher` was created here (and may be shut down here)
+_owns_default = False
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the process-wide hasher used by `ahash_password`/`averify_password`.
+
+    This is the hasher of the most recently created `AuthManager`, or a
+    default `ThreadPoolPasswordHasher` when there is none.
+    """
+    global _default_hasher, _owns_default
+    if _default_hasher is None:
+        _default_hasher, _owns_default = ThreadPoolPasswordHasher(), True
+    return _default_hasher
+
+
+def set_password_hasher(hasher: PasswordHasher | None) -> None:
+    """Make `hasher` the process-wide hasher (None restores the default).
+
+    A replaced hasher is shut down only if this module created it.
+    """
+    global _default_hasher, _owns_default
+    previous, owned = _default_hasher, _owns_default
+    _default_hasher, _owns_default = hasher, False
+    if owned and previous is not None and previous is not hasher:
+        previous.shutdown(wait=False)
+
+
+def configure_password_hasher(
+    max_workers: int | None = None, memory_budget_mib: int | None = None
+) -> ThreadPoolPasswordHasher:
+    """Replace the process-wide hasher with one using the given limits."""
+    global _owns_default
+    hasher = ThreadPoolPasswordHasher(
+        max_workers=max_workers, memory_budget_mib=memory_budget_mib
+    )
+    set_password_hasher(hasher)
+    _owns_default = True
+    return hasher
+
+
+async def ahash_password(password: str) -> str:
+    """Async variant of `hash_password` that runs off the event loop."""
+    return await get_password_hasher().hash(password)
+
+
+async def averify_password(password: str, hashed: str) -> bool:
+    """Async variant of `verify_password` that runs off the event loop."""
+    return await get_password_hasher().verify(password, hashed)
+
+
+def __getattr__(name: str) -> Any:
+    # Lazily forward the legacy passlib context (see `passwords.__getattr__`)
+    if name == "pwd_context":
+        return passwords.pwd_context
+    # Imported on demand so `python -m fastauth.crypto.legacy` runs cleanly
+    if name == "LegacyHasher":
+        from .legacy import LegacyHasher
+
+        return LegacyHasher
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "AdmissionControlledPasswordHasher",
+    "Argon2Hasher",
+    "Hasher",
+    "LegacyHasher",
+    "PasslibHasher",
+    "PasswordHasher",
+    "ProcessPoolPasswordHasher",
+    "ThreadPoolPasswordHasher",
+    "ahash_password",
+    "argon2_memory_cost_kib",
+    "averify_password",
+    "build_crypt_context",
+    "build_password_hasher",
+    "compare_hash",
+    "configure_password_hasher",
+    "get_password_hasher",
+    "hash_password",
+    "hash_string",
+    "pwd_context",
+    "set_password_hasher",
+    "soft_fingerprint",
+    "verify_password",
+]
@@ -0,0 +1,193 @@
+"""
+Admission control for password hashing.
+
+Hashing capacity is fixed (a few Argon2 runs per core), so under a
+credential-stuffing wave the backlog only grows and every login ends up
+timing out. `AdmissionControlledPasswordHasher` sits in front of a hashing
+backend and sheds excess work early with a 503 + Retry-After instead.
+
+It owns the queue in front of the backend and applies CoDel's idea to it:
+the *minimum* queueing delay seen over an interval tells a standing queue
+apart from a burst that drains on its own. While a standing queue exists
+(minimum delay above `target_delay_ms`), the controller is *overloaded*:
+arrivals predicted to wait longer than the target are rejected at once and
+queued jobs that waited past the target are dropped before hashing. When
+not overloaded, bursts may queue for up to `max_wait_ms`.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+
+from ..exceptions import ServiceUnavailableException
+from .base import PasswordHasher
+from .hashers import Hasher
+
+
+class AdmissionControlledPasswordHasher:
+    """Wraps a `PasswordHasher` with CoDel-style load shedding.
+
+    The queue is tied to the event loop that uses it, so use one wrapper
+    per loop; one `AuthManager` per server worker process gives exactly that.
+    """
+
+    def __init__(
+        self,
+        backend: PasswordHasher,
+        max_concurrency: int | None = None,
+        target_delay_ms: float = 50.0,
+        interval_ms: float = 500.0,
+        max_wait_ms: float = 1000.0,
+        max_queue_size: int = 1024,
+    ):
+        """Initialize the controller.
+
+        Args:
+            backend: Hashing backend doing the actual work
+            max_concurrency: Jobs handed to the backend at once (default:
+                the backend's worker count)
+            target_delay_ms: Acceptable standing queueing delay
+            interval_ms: Window over which the minimum delay is tracked
+            max_wait_ms: Longest any job may wait for a slot
+            max_queue_size: Hard cap on waiting jobs
+        """
+        self.backend = backend
+        self.max_concurrency = max_concurrency or backend.stats().get("workers", 1)
+        self.target_delay = target_delay_ms / 1000
+        self.interval = interval_ms / 1000
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+
+        self._active = 0
+        self._waiters: deque[tuple[float, asyncio.Future]] = deque()
+        self._overloaded = False
+        self._window_min = math.inf
+        self._interval_end = time.monotonic() + self.interval
+        self._service_time = 0.0
+        self._admitted = 0
+        self._shed = 0
+        self._dropped = 0
+
+    @property
+    def hasher(self) -> Hasher:
+        """The hashing algorithm used by the wrapped backend."""
+        return self.backend.hasher
+
+    def _tick(self, now: float) -> None:
+        if now < self._interval_end:
+            return
+        if self._window_min == math.inf:
+            # No job got a slot all interval: overloaded iff jobs are stuck
+            self._overloaded = bool(self._waiters)
+        else:
+            self._overloaded = self._window_min > self.target_delay
+        self._window_min = math.inf
+        self._interval_end = now + self.interval
+
+    def _wait_limit(self) -> float:
+        return self.target_delay if self._overloaded else self.max_wait
+
+    def _reject(self, predicted_wait: float) -> ServiceUnavailableException:
+        return ServiceUnavailableException(
+            "Password hashing is overloaded",
+            retry_after=max(1, math.ceil(predicted_wait)),
+        )
+
+    async def _acquire(self) -> None:
+        now = time.monotonic()
+        self._tick(now)
+
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self._window_min = min(self._window_min, 0.0)
+            self._admitted += 1
+            return
+
+        predicted_wait = (
+            (len(self._waiters) + 1) * self._service_time / self.max_concurrency
+        )
+        if (
+            len(self._waiters) >= self.max_queue_size
+            or predicted_wait > self._wait_limit()
+        ):
+            self._shed += 1
+            raise self._reject(predicted_wait)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (now, future)
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was handed over just as we gave up; pass it on
+                self._release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._dropped += 1
+            raise self._reject(self.max_wait) from None
+        self._admitted += 1
+
+    def _release(self) -> None:
+        now = time.monotonic()
+        self._tick(now)
+        limit = self._wait_limit()
+
+        # Hand the slot to the next waiter that is still worth serving
+        while self._waiters:
+            enqueued_at, future = self._waiters.popleft()
+            if future.done():
+                continue
+            delay = now - enqueued_at
+            self._window_min = min(self._window_min, delay)
+            if delay > limit:
+                self._dropped += 1
+                future.set_exception(self._reject(limit))
+                continue
+            future.set_result(None)
+            return
+        self._active -= 1
+
+    async def _run(self, operation, *args):
+        await self._acquire()
+        start = time.monotonic()
+        try:
+            return await operation(*args)
+        finally:
+            elapsed = time.monotonic() - start
+            # Exponentially weighted service time, for wait predictions
+            if self._service_time:
+                self._service_time += 0.2 * (elapsed - self._service_time)
+            else:
+                self._service_time = elapsed
+            self._release()
+
+    async def hash(self, password: str) -> str:
+        """Hash a password, or raise a 503 if hashing is overloaded."""
+        return await self._run(self.backend.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password, or raise a 503 if hashing is overloaded."""
+        return await self._run(self.backend.verify, password, hashed)
+
+    def needs_update(self, hashed: str) -> bool:
+        return self.backend.needs_update(hashed)
+
+    def stats(self) -> dict[str, int]:
+        """Return backend metrics plus admission counters."""
+        return {
+            **self.backend.stats(),
+            "admission_active": self._active,
+            "admission_waiting": len(self._waiters),
+            "admission_overloaded": int(self._overloaded),
+            "admission_admitted": self._admitted,
+            "admission_shed": self._shed,
+            "admission_dropped": self._dropped,
+            "admission_service_ms": round(self._service_time * 1000),
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.backend.shutdown(wait=wait)
@@ -0,0 +1,48 @@
+"""
+Password hasher protocol definitions.
+
+Defines the interface for backends that execute password hashing work
+(thread pool, process pool, etc.) on behalf of async request handlers.
+"""
+
+from typing import Protocol
+
+
+class PasswordHasher(Protocol):
+    """Protocol for password hashing backends.
+
+    Implementations must run hashing without blocking the event loop and
+    provide async methods for:
+    - Hashing a password
+    - Verifying a password against a stored hash
+
+    Methods:
+        hash: Hash a password
+            Args:
+                password: The plaintext password
+            Returns:
+                The encoded hash
+        verify: Verify a password
+            Args:
+                password: The plaintext password
+                hashed: The stored hash
+            Returns:
+                True if the password matches
+        needs_update: Check whether a stored hash uses outdated parameters
+            Args:
+                hashed: The stored hash
+            Returns:
+                True if the hash should be recomputed with current settings
+        stats: Report queueing metrics
+            Returns:
+                Dict of counters (pending, queue_depth, rejected, ...)
+        shutdown: Release worker threads/processes
+            Args:
+                wait: Whether to wait for running jobs to finish
+    """
+
+    async def hash(self, password: str) -> str: ...
+    async def verify(self, password: str, hashed: str) -> bool: ...
+    def needs_update(self, hashed: str) -> bool: ...
+    def stats(self) -> dict[str, int]: ...
+    def shutdown(self, wait: bool = True) -> None: ...
@@ -0,0 +1,190 @@
+"""
+Argon2 cost calibration.
+
+Benchmarks Argon2 on the current host and picks ``time_cost``,
+``memory_cost`` and ``parallelism`` so that one verification takes about
+a target latency while staying within a memory budget.
+
+Run it at startup (``HashingConfig(calibrate=True)``) or from the CLI and
+pin the emitted parameters in configuration:
+
+    python -m fastauth.crypto.calibration --target-ms 50 --max-memory-mib 32
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import TYPE_CHECKING, Any
+
+from .hashers import Argon2Hasher
+
+if TYPE_CHECKING:
+    from ..core.config import HashingConfig
+
+logger = logging.getLogger("fastauth")
+
+_CALIBRATION_PASSWORD = "fastauth-calibration-password"
+
+
+def measure_argon2(
+    time_cost: int, memory_cost_kib: int, parallelism: int, samples: int = 3
+) -> float:
+    """Return the median time in milliseconds to verify one Argon2 hash."""
+    hasher = Argon2Hasher(time_cost, memory_cost_kib, parallelism)
+    hashed = hasher.hash(_CALIBRATION_PASSWORD)
+
+    timings = []
+    for _ in range(max(1, samples)):
+        start = time.perf_counter()
+        hasher.verify(_CALIBRATION_PASSWORD, hashed)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def calibrate_argon2(
+    target_ms: float = 50.0,
+    max_memory_mib: int = 32,
+    max_parallelism: int = 4,
+    min_memory_mib: int = 8,
+    max_time_cost: int = 10,
+    samples: int = 3,
+) -> dict[str, Any]:
+    """Pick Argon2 costs that verify in about `target_ms` on this host.
+
+    Memory is the strongest defence, so the full budget is used whenever a
+    single pass fits the target; otherwise memory is halved until it does
+    (down to `min_memory_mib`). The remaining latency budget is then spent
+    on additional passes (`time_cost`).
+
+    Args:
+        target_ms: Desired verification latency in milliseconds
+        max_memory_mib: Memory budget per hash run
+        max_parallelism: Upper bound for Argon2 lanes (capped at CPU count)
+        min_memory_mib: Lowest memory cost calibration may fall back to
+        max_time_cost: Upper bound for passes
+        samples: Verifications timed per measurement (median is used)
+
+    Returns:
+        Dict with `time_cost`, `memory_cost_kib`, `parallelism` and
+        `measured_ms`
+    """
+    parallelism = max(1, min(os.cpu_count() or 1, max_parallelism))
+    # Argon2 requires at least 8 KiB per lane
+    floor_kib = max(min_memory_mib * 1024, 8 * parallelism)
+    memory_kib = max(floor_kib, max_memory_mib * 1024)
+
+    elapsed = measure_argon2(1, memory_kib, parallelism, samples)
+    while elapsed > target_ms and memory_kib > floor_kib:
+        memory_kib = max(floor_kib, memory_kib // 2)
+        elapsed = measure_argon2(1, memory_kib, parallelism, samples)
+
+    # Cost grows roughly linearly with passes; estimate, then verify
+    time_cost = max(1, min(max_time_cost, int(target_ms // max(elapsed, 1e-3))))
+    if time_cost > 1:
+        elapsed = measure_argon2(time_cost, memory_kib, parallelism, samples)
+        while elapsed > target_ms and time_cost > 1:
+            time_cost -= 1
+            elapsed = measure_argon2(time_cost, memory_kib, parallelism, samples)
+
+    return {
+        "time_cost": time_cost,
+        "memory_cost_kib": memory_kib,
+        "parallelism": parallelism,
+        "measured_ms": round(elapsed, 2),
+    }
+
+
+def load_or_calibrate(
+    path: str | None, target_ms: float, max_memory_mib: int
+) -> dict[str, Any]:
+    """Return persisted calibration results, calibrating if none match.
+
+    Results are stored alongside the target they were computed for, so
+    changing the target or budget triggers a fresh calibration. The file
+    is replaced atomically, which keeps concurrently starting workers from
+    reading a partial write.
+    """
+    if path and os.path.exists(path):
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+            if (
+                stored.get("target_ms") == target_ms
+                and stored.get("max_memory_mib") == max_memory_mib
+            ):
+                return stored
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable Argon2 calibration file %s", path)
+
+    result = calibrate_argon2(target_ms=target_ms, max_memory_mib=max_memory_mib)
+    result.update(target_ms=target_ms, max_memory_mib=max_memory_mib)
+    logger.info("Calibrated Argon2 parameters: %s", result)
+
+    if path:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(result, f, indent=2)
+        os.replace(tmp_path, path)
+
+    return result
+
+
+def resolve_argon2_parameters(config: "HashingConfig") -> dict[str, int | None]:
+    """Resolve the Argon2 costs for a `HashingConfig`.
+
+    Explicitly configured costs always win over calibrated ones.
+    """
+    params: dict[str, int | None] = {
+        "time_cost": None,
+        "memory_cost_kib": None,
+        "parallelism": None,
+    }
+    if config.calibrate:
+        calibrated = load_or_calibrate(
+            config.calibration_file,
+            config.calibration_target_ms,
+            config.calibration_max_memory_mib,
+        )
+        params.update({key: calibrated[key] for key in params})
+
+    for key in params:
+        value = getattr(config, key)
+        if value is not None:
+            params[key] = value
+    return params
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m fastauth.crypto.calibration",
+        description="Benchmark Argon2 and emit cost parameters for this host.",
+    )
+    parser.add_argument("--target-ms", type=float, default=50.0)
+    parser.add_argument("--max-memory-mib", type=int, default=32)
+    parser.add_argument("--max-parallelism", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--output", help="Write the parameters to this JSON file")
+    args = parser.parse_args(argv)
+
+    result = calibrate_argon2(
+        target_ms=args.target_ms,
+        max_memory_mib=args.max_memory_mib,
+        max_parallelism=args.max_parallelism,
+        samples=args.samples,
+    )
+    result.update(target_ms=args.target_ms, max_memory_mib=args.max_memory_mib)
+
+    payload = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
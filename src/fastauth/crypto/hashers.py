@@ -0,0 +1,175 @@
+"""
+Password hashing algorithm implementations.
+
+A `Hasher` performs the actual (synchronous) hashing work. The default
+`Argon2Hasher` calls argon2-cffi directly, which skips passlib's scheme
+identification on every verify and releases the GIL while hashing, so
+pool backends get true thread parallelism. `PasslibHasher` remains
+available as a legacy backend; passlib is only imported when it is used.
+"""
+
+from typing import TYPE_CHECKING, Any, Protocol
+
+import argon2
+from argon2.exceptions import InvalidHashError, VerificationError
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+class Hasher(Protocol):
+    """Protocol for password hashing algorithms.
+
+    Implementations run on the calling thread and must be picklable so
+    they can be shipped to process pool workers.
+
+    Attributes:
+        memory_cost_kib: Memory a single hash run allocates, in KiB
+
+    Methods:
+        hash: Hash a password
+            Args:
+                password: The plaintext password
+            Returns:
+                The encoded hash
+        verify: Verify a password
+            Args:
+                password: The plaintext password
+                hashed: The stored hash
+            Returns:
+                True if the password matches, False otherwise
+            Raises:
+                ValueError: If the hash format is not recognized
+        needs_update: Check whether a stored hash uses outdated parameters
+            Args:
+                hashed: The stored hash
+            Returns:
+                True if the hash should be recomputed
+    """
+
+    memory_cost_kib: int
+
+    def hash(self, password: str) -> str: ...
+    def verify(self, password: str, hashed: str) -> bool: ...
+    def needs_update(self, hashed: str) -> bool: ...
+
+
+class Argon2Hasher:
+    """Argon2id hasher built directly on `argon2.PasswordHasher`.
+
+    Produces standard PHC strings (``$argon2id$v=19$...``), so hashes made
+    by passlib's argon2 handler verify unchanged.
+    """
+
+    def __init__(
+        self,
+        time_cost: int | None = None,
+        memory_cost_kib: int | None = None,
+        parallelism: int | None = None,
+    ):
+        """Initialize the hasher.
+
+        Args:
+            time_cost: Number of passes (default: argon2-cffi default)
+            memory_cost_kib: Memory per hash run in KiB (default: argon2-cffi default)
+            parallelism: Number of lanes (default: argon2-cffi default)
+        """
+        options: dict[str, int] = {}
+        if time_cost is not None:
+            options["time_cost"] = time_cost
+        if memory_cost_kib is not None:
+            options["memory_cost"] = memory_cost_kib
+        if parallelism is not None:
+            options["parallelism"] = parallelism
+
+        self._hasher = argon2.PasswordHasher(**options)
+        self.time_cost = self._hasher.time_cost
+        self.memory_cost_kib = self._hasher.memory_cost
+        self.parallelism = self._hasher.parallelism
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            return self._hasher.verify(hashed, password)
+        except InvalidHashError as e:
+            raise ValueError("hash could not be identified") from e
+        except VerificationError:
+            return False
+
+    def needs_update(self, hashed: str) -> bool:
+        try:
+            return self._hasher.check_needs_rehash(hashed)
+        except InvalidHashError:
+            # Not an Argon2 hash at all: anything else is outdated
+            return True
+
+    def __repr__(self) -> str:
+        return (
+            f"Argon2Hasher(time_cost={self.time_cost}, "
+            f"memory_cost_kib={self.memory_cost_kib}, parallelism={self.parallelism})"
+        )
+
+
+def build_crypt_context(
+    time_cost: int | None = None,
+    memory_cost_kib: int | None = None,
+    parallelism: int | None = None,
+    **kwargs: Any,
+) -> "CryptContext":
+    """Build a passlib Argon2 context with the given costs.
+
+    Extra keyword arguments are passed to `CryptContext` (e.g. ``schemes``).
+    """
+    from passlib.context import CryptContext
+
+    settings = {
+        "argon2__time_cost": time_cost,
+        "argon2__memory_cost": memory_cost_kib,
+        "argon2__parallelism": parallelism,
+    }
+    settings = {key: value for key, value in settings.items() if value is not None}
+    kwargs.setdefault("schemes", ["argon2"])
+    kwargs.setdefault("deprecated", "auto")
+    return CryptContext(**kwargs, **settings)
+
+
+class PasslibHasher:
+    """Legacy hasher backed by a passlib `CryptContext`.
+
+    Useful when stored hashes use schemes argon2-cffi cannot verify. The
+    context is rebuilt from its config string after unpickling, so it can
+    be used with the process pool backend.
+    """
+
+    def __init__(self, context: "CryptContext | None" = None):
+        """Initialize the hasher.
+
+        Args:
+            context: Passlib context (default: Argon2 with passlib defaults)
+        """
+        self.context = context or build_crypt_context()
+
+    @property
+    def memory_cost_kib(self) -> int:
+        if "argon2" not in self.context.schemes():
+            return 0
+        return self.context.handler("argon2").memory_cost
+
+    def hash(self, password: str) -> str:
+        return self.context.hash(password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self.context.verify(password, hashed)
+
+    def needs_update(self, hashed: str) -> bool:
+        return self.context.needs_update(hashed)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"config": self.context.to_string()}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        from passlib.context import CryptContext
+
+        self.context = CryptContext.from_string(state["config"])
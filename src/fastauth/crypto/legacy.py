@@ -0,0 +1,433 @@
+"""
+Legacy password hash migration.
+
+Lets users imported from other systems keep logging in with their existing
+bcrypt / PBKDF2 / scrypt hashes. `LegacyHasher` verifies those formats and
+reports them as needing an update, so the login flow rehashes them to
+Argon2 on the next successful login (see `UserStore.update_password`).
+
+Weak legacy hashes can also be strengthened offline, without plaintexts,
+by *wrapping* them: the legacy digest is itself hashed with Argon2 and
+stored as ``$fawrap$<config>$<length>$argon2id$...``. Wrapping a whole user
+table is a CPU-bound batch job; use the bulk tool, which streams JSONL
+records through all cores:
+
+    python -m fastauth.crypto.legacy users.jsonl wrapped.jsonl --workers 8
+
+Supported formats:
+- bcrypt: ``$2a$``, ``$2b$``, ``$2y$`` (requires the optional ``bcrypt`` package)
+- passlib PBKDF2: ``$pbkdf2$``, ``$pbkdf2-sha256$``, ``$pbkdf2-sha512$``
+- passlib scrypt: ``$scrypt$ln=..,r=..,p=..$``
+- Django PBKDF2: ``pbkdf2_sha256$``, ``pbkdf2_sha1$``
+- Werkzeug: ``pbkdf2:<digest>:<iterations>$`` and ``scrypt:<n>:<r>:<p>$``
+"""
+
+import argparse
+import base64
+import binascii
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import secrets
+import sys
+from typing import IO, Any, Iterable, Iterator, Protocol
+
+from .hashers import Argon2Hasher, Hasher
+from .passwords import default_hasher
+
+WRAPPED_PREFIX = "$fawrap$"
+
+
+def _b64decode(value: str, altchars: bytes | None = None) -> bytes:
+    padded = value + "=" * (-len(value) % 4)
+    return base64.b64decode(padded, altchars=altchars, validate=True)
+
+
+def _scrypt_maxmem(n: int, r: int, p: int) -> int:
+    # OpenSSL needs 128 * r * (n + p + 2) bytes; leave headroom for overhead
+    return 128 * r * (n + p + 2) + 1024 * 1024
+
+
+class LegacyScheme(Protocol):
+    """Protocol for foreign hash formats that are verified but never produced.
+
+    A scheme splits a hash into its public *config* (algorithm, cost,
+    salt) and its secret *checksum*, and can re-derive the checksum from a
+    password and the config. `identify` and `split` have defaults for
+    ``<config>$<checksum>`` formats, which only need `decode_checksum`.
+
+    Methods:
+        identify: Check whether a hash is in this format
+            Args:
+                hashed: The stored hash
+            Returns:
+                True if the hash starts with one of `prefixes`
+        split: Split a hash into its config and checksum
+            Args:
+                hashed: The stored hash
+            Returns:
+                ``(config, checksum)``
+        decode_checksum: Decode the checksum part of a hash
+            Args:
+                checksum: The encoded checksum
+            Returns:
+                The raw checksum
+        derive: Compute the checksum a password would have
+            Args:
+                password: The plaintext password
+                config: Config part of the hash
+                length: Checksum length in bytes
+            Returns:
+                The raw checksum
+            Raises:
+                ValueError: If the config is malformed
+    """
+
+    name: str
+    prefixes: tuple[str, ...]
+
+    def identify(self, hashed: str) -> bool:
+        return hashed.startswith(self.prefixes)
+
+    def split(self, hashed: str) -> tuple[str, bytes]:
+        """Return ``(config, checksum)`` for a full hash."""
+        config, _, checksum = hashed.rpartition("$")
+        return config, self.decode_checksum(checksum)
+
+    def decode_checksum(self, checksum: str) -> bytes:
+        """Decode the checksum part of a hash."""
+        ...
+
+    def derive(self, password: str, config: str, length: int) -> bytes:
+        """Compute the checksum `password` would have under `config`."""
+        ...
+
+
+class BcryptScheme(LegacyScheme):
+    name = "bcrypt"
+    prefixes = ("$2a$", "$2b$", "$2y$")
+
+    def split(self, hashed: str) -> tuple[str, bytes]:
+        # $2b$12$ + 22 chars of salt, then 31 chars of checksum
+        return hashed[:29], hashed[29:].encode()
+
+    def derive(self, password: str, config: str, length: int) -> bytes:
+        try:
+            import bcrypt
+        except ImportError as e:
+            raise RuntimeError(
+                "Verifying bcrypt hashes requires the 'bcrypt' package"
+            ) from e
+
+        # bcrypt only ever looked at the first 72 bytes
+        secret = password.encode()[:72]
+        return bcrypt.hashpw(secret, config.encode())[29:]
+
+
+class PasslibPBKDF2Scheme(LegacyScheme):
+    """``$pbkdf2-sha256$<rounds>$<salt>$<checksum>`` (passlib "ab64" encoding)."""
+
+    name = "pbkdf2"
+    prefixes = ("$pbkdf2$", "$pbkdf2-sha256$", "$pbkdf2-sha512$")
+    _digests = {"pbkdf2": "sha1", "pbkdf2-sha256": "sha256", "pbkdf2-sha512": "sha512"}
+
+    def decode_checksum(self, checksum: str) -> bytes:
+        return _b64decode(checksum, altchars=b"./")
+
+    def derive(self, password: str, config: str, length: int) -> bytes:
+        _, ident, rounds, salt = config.split("$")
+        return hashlib.pbkdf2_hmac(
+            self._digests[ident],
+            password.encode(),
+            _b64decode(salt, altchars=b"./"),
+            int(rounds),
+            length,
+        )
+
+
+class PasslibScryptScheme(LegacyScheme):
+    """``$scrypt$ln=<log2 n>,r=<r>,p=<p>$<salt>$<checksum>``."""
+
+    name = "scrypt"
+    prefixes = ("$scrypt$",)
+
+    def decode_checksum(self, checksum: str) -> bytes:
+        return _b64decode(checksum)
+
+    def derive(self, password: str, config: str, length: int) -> bytes:
+        _, _, settings, salt = config.split("$")
+        params = dict(item.split("=") for item in settings.split(","))
+        n, r, p = 2 ** int(params["ln"]), int(params["r"]), int(params["p"])
+        return hashlib.scrypt(
+            password.encode(),
+            salt=_b64decode(salt),
+            n=n,
+            r=r,
+            p=p,
+            maxmem=_scrypt_maxmem(n, r, p),
+            dklen=length,
+        )
+
+
+class DjangoPBKDF2Scheme(LegacyScheme):
+    """``pbkdf2_sha256$<iterations>$<salt>$<base64 checksum>``."""
+
+    name = "django_pbkdf2"
+    prefixes = ("pbkdf2_sha256$", "pbkdf2_sha1$")
+
+    def decode_checksum(self, checksum: str) -> bytes:
+        return _b64decode(checksum)
+
+    def derive(self, password: str, config: str, length: int) -> bytes:
+        algorithm, iterations, salt = config.split("$")
+        digest = algorithm.removeprefix("pbkdf2_")
+        return hashlib.pbkdf2_hmac(
+            digest, password.encode(), salt.encode(), int(iterations), length
+        )
+
+
+class WerkzeugScheme(LegacyScheme):
+    """``pbkdf2:<digest>:<iterations>$<salt>$<hex>`` and ``scrypt:<n>:<r>:<p>$<salt>$<hex>``."""
+
+    name = "werkzeug"
+    prefixes = ("pbkdf2:", "scrypt:")
+
+    def decode_checksum(self, checksum: str) -> bytes:
+        return bytes.fromhex(checksum)
+
+    def derive(self, password: str, config: str, length: int) -> bytes:
+        method, salt = config.split("$")
+        kind, *args = method.split(":")
+        if kind == "scrypt":
+            n, r, p = (int(arg) for arg in args)
+            return hashlib.scrypt(
+                password.encode(),
+                salt=salt.encode(),
+                n=n,
+                r=r,
+                p=p,
+                maxmem=_scrypt_maxmem(n, r, p),
+                dklen=length,
+            )
+        if len(args) != 2:
+            # Old Werkzeug versions omitted the count and used their own
+            # default, which changed between releases; guessing could
+            # never verify reliably
+            raise ValueError("Werkzeug PBKDF2 hash without an iteration count")
+        digest, iterations = args
+        return hashlib.pbkdf2_hmac(
+            digest, password.encode(), salt.encode(), int(iterations), length
+        )
+
+
+DEFAULT_LEGACY_SCHEMES: tuple[LegacyScheme, ...] = (
+    BcryptScheme(),
+    PasslibPBKDF2Scheme(),
+    PasslibScryptScheme(),
+    DjangoPBKDF2Scheme(),
+    WerkzeugScheme(),
+)
+
+
+class LegacyHasher:
+    """Hasher that accepts legacy and wrapped hashes alongside the primary one.
+
+    New hashes are always produced by the primary hasher. Legacy and
+    wrapped hashes verify normally but always report `needs_update`, so
+    they are replaced with primary hashes on the next successful login.
+    """
+
+    def __init__(
+        self,
+        primary: Hasher = default_hasher,
+        schemes: Iterable[LegacyScheme] = DEFAULT_LEGACY_SCHEMES,
+    ):
+        """Initialize the hasher.
+
+        Args:
+            primary: Hasher for new hashes and for the outer layer of
+                wrapped hashes
+            schemes: Legacy formats to recognize
+        """
+        self.primary = primary
+        self.schemes = tuple(schemes)
+
+    @property
+    def memory_cost_kib(self) -> int:
+        return self.primary.memory_cost_kib
+
+    def identify(self, hashed: str) -> LegacyScheme | None:
+        """Return the legacy scheme `hashed` belongs to, if any."""
+        for scheme in self.schemes:
+            if scheme.identify(hashed):
+                return scheme
+        return None
+
+    def is_legacy(self, hashed: str) -> bool:
+        """Return True for legacy or wrapped hashes."""
+        return hashed.startswith(WRAPPED_PREFIX) or self.identify(hashed) is not None
+
+    def hash(self, password: str) -> str:
+        return self.primary.hash(password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        if hashed.startswith(WRAPPED_PREFIX):
+            return self._verify_wrapped(password, hashed)
+
+        scheme = self.identify(hashed)
+        if scheme is None:
+            return self.primary.verify(password, hashed)
+
+        try:
+            config, checksum = scheme.split(hashed)
+            derived = scheme.derive(password, config, len(checksum))
+        except (ValueError, binascii.Error) as e:
+            raise ValueError(f"malformed legacy hash: {e}") from e
+        return secrets.compare_digest(derived, checksum)
+
+    def needs_update(self, hashed: str) -> bool:
+        if self.is_legacy(hashed):
+            return True
+        return self.primary.needs_update(hashed)
+
+    def wrap(self, hashed: str) -> str:
+        """Strengthen a legacy hash by hashing its checksum with the primary hasher.
+
+        No plaintext is needed, so this can run offline over a whole table.
+        """
+        scheme = self.identify(hashed)
+        if scheme is None:
+            raise ValueError("not a recognized legacy hash")
+
+        config, checksum = scheme.split(hashed)
+        encoded_config = base64.urlsafe_b64encode(config.encode()).decode().rstrip("=")
+        inner = self.primary.hash(checksum.hex())
+        return f"{WRAPPED_PREFIX}{encoded_config}${len(checksum)}{inner}"
+
+    def _verify_wrapped(self, password: str, hashed: str) -> bool:
+        try:
+            encoded_config, length, inner = hashed[len(WRAPPED_PREFIX):].split("$", 2)
+            config = _b64decode(encoded_config, altchars=b"-_").decode()
+            inner = "$" + inner
+        except (ValueError, binascii.Error) as e:
+            raise ValueError("malformed wrapped hash") from e
+
+        scheme = self.identify(config)
+        if scheme is None:
+            raise ValueError("wrapped hash uses an unknown legacy scheme")
+        try:
+            checksum = scheme.derive(password, config, int(length))
+        except (ValueError, binascii.Error) as e:
+            raise ValueError(f"malformed wrapped hash: {e}") from e
+        return self.primary.verify(checksum.hex(), inner)
+
+
+# -------------------------
+# BULK WRAPPING
+# -------------------------
+
+_wrap_hasher: LegacyHasher | None = None
+_wrap_field = "password"
+
+
+def _init_wrap_worker(hasher: LegacyHasher, field: str) -> None:
+    global _wrap_hasher, _wrap_field
+    _wrap_hasher = hasher
+    _wrap_field = field
+
+
+def _wrap_record(record: dict[str, Any]) -> dict[str, Any]:
+    hashed = record.get(_wrap_field)
+    if isinstance(hashed, str) and _wrap_hasher.identify(hashed) is not None:
+        record[_wrap_field] = _wrap_hasher.wrap(hashed)
+    return record
+
+
+def wrap_records(
+    records: Iterable[dict[str, Any]],
+    *,
+    field: str = "password",
+    hasher: LegacyHasher | None = None,
+    workers: int | None = None,
+    chunksize: int = 64,
+) -> Iterator[dict[str, Any]]:
+    """Wrap the legacy hashes in a stream of user records using all cores.
+
+    Records are processed in bounded batches, so arbitrarily large inputs
+    stream through with constant memory. Output order matches input order;
+    records without a legacy hash are passed through unchanged.
+
+    Args:
+        records: Iterable of dicts (e.g. parsed JSONL rows)
+        field: Key holding the password hash
+        hasher: LegacyHasher to wrap with (default: Argon2 defaults)
+        workers: Worker processes (default: CPU count)
+        chunksize: Records sent to a worker per task
+    """
+    hasher = hasher or LegacyHasher()
+    workers = workers or os.cpu_count() or 1
+    # Pool.imap reads its input eagerly; feeding bounded batches keeps
+    # memory flat no matter how many records are streamed.
+    batch_size = chunksize * workers * 4
+
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(workers, initializer=_init_wrap_worker, initargs=(hasher, field)) as pool:
+        iterator = iter(records)
+        while batch := list(itertools.islice(iterator, batch_size)):
+            yield from pool.imap(_wrap_record, batch, chunksize)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m fastauth.crypto.legacy",
+        description="Wrap legacy password hashes in JSONL user records with Argon2.",
+    )
+    parser.add_argument("input", help="JSONL file of user records ('-' for stdin)")
+    parser.add_argument("output", help="JSONL file to write ('-' for stdout)")
+    parser.add_argument("--field", default="password")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--time-cost", type=int, default=None)
+    parser.add_argument("--memory-cost-kib", type=int, default=None)
+    parser.add_argument("--parallelism", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    hasher = LegacyHasher(
+        Argon2Hasher(args.time_cost, args.memory_cost_kib, args.parallelism)
+    )
+
+    def _open(path: str, mode: str) -> IO[str]:
+        if path == "-":
+            return sys.stdin if "r" in mode else sys.stdout
+        return open(path, mode)
+
+    source = _open(args.input, "r")
+    sink = _open(args.output, "w")
+    total = wrapped = 0
+    try:
+        records = (json.loads(line) for line in source if line.strip())
+        for record in wrap_records(
+            records,
+            field=args.field,
+            hasher=hasher,
+            workers=args.workers,
+            chunksize=args.chunksize,
+        ):
+            total += 1
+            if str(record.get(args.field, "")).startswith(WRAPPED_PREFIX):
+                wrapped += 1
+            sink.write(json.dumps(record) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    sys.stderr.write(f"{total} records processed, {wrapped} wrapped\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
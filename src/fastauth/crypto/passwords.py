@@ -0,0 +1,35 @@
+"""
+Synchronous password hashing primitives.
+
+These run Argon2 on the calling thread. Async code should go through a
+`PasswordHasher` backend instead so the event loop is never blocked.
+"""
+
+from typing import Any
+
+from .hashers import Argon2Hasher, Hasher, build_crypt_context
+
+default_hasher = Argon2Hasher()
+
+
+def hash_password(password: str) -> str:
+    return default_hasher.hash(password)
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    return default_hasher.verify(password, hashed)
+
+
+def argon2_memory_cost_kib(hasher: Hasher = default_hasher) -> int:
+    """Return the Argon2 memory cost (KiB) a single hash run allocates."""
+    return hasher.memory_cost_kib
+
+
+def __getattr__(name: str) -> Any:
+    # `pwd_context` is kept for backwards compatibility but built lazily,
+    # so passlib is only imported by code that still uses it.
+    if name == "pwd_context":
+        context = build_crypt_context()
+        globals()["pwd_context"] = context
+        return context
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,208 @@
+"""
+Process pool password hasher.
+
+Runs Argon2 in a pool of worker processes so hashing scales across all
+cores instead of being limited to the cores one server worker gets.
+
+The pool is created lazily, per process ID, using the ``spawn`` start
+method. That makes it safe to construct the hasher before a pre-fork server
+(e.g. gunicorn) forks its workers: each worker builds its own pool on first
+use and never inherits a parent's executor threads or locks.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ..exceptions import ServiceUnavailableException
+from .hashers import Hasher
+from .passwords import default_hasher
+
+# Hasher used inside worker processes, installed by `_init_worker`
+_worker_hasher: Hasher | None = None
+
+
+class HashingDeadlineExceeded(Exception):
+    """Raised in a worker when a job is picked up after its deadline."""
+
+
+def _init_worker(hasher: Hasher) -> None:
+    global _worker_hasher
+    _worker_hasher = hasher
+
+
+def _run_job(operation: str, args: tuple, deadline: float | None):
+    # Jobs that sat in the queue past their deadline are dropped unrun
+    if deadline is not None and time.time() > deadline:
+        raise HashingDeadlineExceeded()
+
+    hasher = _worker_hasher or default_hasher
+    if operation == "hash":
+        return hasher.hash(*args)
+    return hasher.verify(*args)
+
+
+class ProcessPoolPasswordHasher:
+    """Runs password hashing on a pool of worker processes.
+
+    Submissions are bounded: once ``max_queue_size`` jobs are waiting for a
+    free worker, new requests are rejected with a 503 instead of piling up.
+    Each job may carry a deadline; jobs that cannot finish in time are
+    cancelled (or skipped by the worker) and surface as a 503 as well.
+    A worker that dies mid-job (OOM kill, restart) breaks the pool; the
+    pool is rebuilt transparently and the job retried once.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_queue_size: int = 256,
+        job_timeout_seconds: float | None = None,
+        hasher: Hasher = default_hasher,
+        start_method: str = "spawn",
+    ):
+        """Initialize the hasher.
+
+        Args:
+            max_workers: Number of worker processes (default: CPU count)
+            max_queue_size: Maximum jobs waiting for a free worker
+            job_timeout_seconds: Optional per-job deadline, measured from
+                submission
+            hasher: Hashing algorithm; pickled once into each worker
+            start_method: Multiprocessing start method for workers
+        """
+        self.hasher = hasher
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue_size = max_queue_size
+        self.job_timeout_seconds = job_timeout_seconds
+        self.start_method = start_method
+
+        self._reset_state()
+        _instances.add(self)
+
+    def _reset_state(self) -> None:
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+        self._pid: int | None = None
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._restarts = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Return the pool owned by this process, creating it if needed."""
+        pid = os.getpid()
+        with self._lock:
+            if self._pool is None or self._pid != pid:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.hasher,),
+                )
+                self._pid = pid
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next submission builds a fresh one."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+                self._restarts += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, operation: str, *args):
+        with self._lock:
+            if self._pending - self.max_workers >= self.max_queue_size:
+                self._rejected += 1
+                raise ServiceUnavailableException(
+                    "Password hashing queue is full", retry_after=1
+                )
+            self._pending += 1
+            self._submitted += 1
+
+        timeout = self.job_timeout_seconds
+        deadline = time.time() + timeout if timeout is not None else None
+        try:
+            for attempt in range(2):
+                pool = self._get_pool()
+                try:
+                    future = pool.submit(_run_job, operation, args, deadline)
+                    remaining = None if deadline is None else max(0.0, deadline - time.time())
+                    return await asyncio.wait_for(asyncio.wrap_future(future), remaining)
+                except BrokenProcessPool as e:
+                    self._discard_pool(pool)
+                    if attempt:
+                        # Still broken after a rebuild: an overload, not a bad password
+                        raise ServiceUnavailableException(
+                            "Password hashing is unavailable", retry_after=1
+                        ) from e
+                except (TimeoutError, HashingDeadlineExceeded):
+                    future.cancel()
+                    with self._lock:
+                        self._timed_out += 1
+                    raise ServiceUnavailableException(
+                        "Password hashing timed out", retry_after=1
+                    )
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password in a worker process."""
+        return await self._submit("hash", password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password in a worker process."""
+        return await self._submit("verify", password, hashed)
+
+    def needs_update(self, hashed: str) -> bool:
+        """Return True if `hashed` was made with outdated parameters.
+
+        Only parses the hash; cheap enough to call on the event loop.
+        """
+        return self.hasher.needs_update(hashed)
+
+    def stats(self) -> dict[str, int]:
+        """Return queueing metrics for monitoring."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "pending": self._pending,
+                "queue_depth": max(0, self._pending - self.max_workers),
+                "max_queue_size": self.max_queue_size,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "restarts": self._restarts,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker processes. They are recreated on next use."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and self._pid == os.getpid():
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_instances: "weakref.WeakSet[ProcessPoolPasswordHasher]" = weakref.WeakSet()
+
+
+def _reset_after_fork() -> None:
+    # A forked child inherits the parent's pool handle and possibly a held
+    # lock; both are unusable there, so start from a clean slate.
+    for hasher in list(_instances):
+        hasher._reset_state()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,116 @@
+"""
+Thread pool password hasher.
+
+Runs Argon2 on a dedicated, bounded thread pool inside the current process.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .hashers import Hasher
+from .passwords import default_hasher
+
+
+class ThreadPoolPasswordHasher:
+    """Runs password hashing on a dedicated, bounded thread pool.
+
+    Argon2 is CPU and memory heavy, so calling it directly from an async
+    handler stalls the event loop for every other request. This hasher
+    offloads the work to its own pool (never the loop's default executor)
+    and caps concurrency so that ``memory_cost * concurrency`` stays within
+    the configured memory budget.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        memory_budget_mib: int | None = None,
+        hasher: Hasher = default_hasher,
+    ):
+        """Initialize the hasher.
+
+        Args:
+            max_workers: Maximum hashing threads (default: CPU count, max 8)
+            memory_budget_mib: Upper bound for memory used by concurrent
+                Argon2 runs. Concurrency is reduced to fit (minimum 1).
+            hasher: Hashing algorithm used for hashing and verification
+        """
+        self.hasher = hasher
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+
+        concurrency = self.max_workers
+        if memory_budget_mib is not None:
+            per_run_mib = max(1, hasher.memory_cost_kib // 1024)
+            concurrency = max(1, min(concurrency, memory_budget_mib // per_run_mib))
+        self.concurrency = concurrency
+
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the pool so importing the module spawns no threads."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.concurrency,
+                        thread_name_prefix="fastauth-hash",
+                    )
+        return self._executor
+
+    def _guarded(self, func, *args):
+        # Memory guard: at most `concurrency` Argon2 runs hold their buffers at once
+        with self._semaphore:
+            return func(*args)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._pending += 1
+        try:
+            return await loop.run_in_executor(
+                self._get_executor(), self._guarded, func, *args
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop."""
+        return await self._run(self.hasher.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password without blocking the event loop."""
+        return await self._run(self.hasher.verify, password, hashed)
+
+    def needs_update(self, hashed: str) -> bool:
+        """Return True if `hashed` was made with outdated parameters.
+
+        Only parses the hash; cheap enough to call on the event loop.
+        """
+        return self.hasher.needs_update(hashed)
+
+    def stats(self) -> dict[str, int]:
+        """Return queueing metrics for monitoring."""
+        with self._lock:
+            pending = self._pending
+            completed = self._completed
+        return {
+            "workers": self.concurrency,
+            "pending": pending,
+            "queue_depth": max(0, pending - self.concurrency),
+            "completed": completed,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker pool. It is recreated on next use."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
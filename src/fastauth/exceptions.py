@@ -77,3 +77,51 @@ class CredentialsException(HTTPException):
 
     def __init__(self, detail: str = "Invalid or missing credentials"):
         super().__init__(status_code=401, detail=detail)
+
+
+class ServiceUnavailableException(HTTPException):
+    """Raised when the server is temporarily unable to process the request.
+
+    Status: 503 Service Unavailable - overloaded, client should retry later
+    """
+
+    def __init__(
+        self,
+        detail: str = "Service temporarily unavailable",
+        retry_after: int | None = None,
+    ):
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+        super().__init__(status_code=503, detail=detail, headers=headers)
+
+
+class RateLimitException(HTTPException):
+    """Raised when a client exceeds a rate limit.
+
+    Status: 429 Too Many Requests - client should retry after Retry-After
+    """
+
+    def __init__(self, detail: str = "Too many requests", retry_after: int = 1):
+        super().__init__(
+            status_code=429, detail=detail, headers={"Retry-After": str(retry_after)}
+        )
+
+
+class AccessDeniedException(HTTPException):
+    """Raised when a client IP is rejected by the IP access lists.
+
+    Status: 403 Forbidden - the client may not use this service
+    """
+
+    def __init__(self, detail: str = "Access denied"):
+        super().__init__(status_code=403, detail=detail)
+
+
+class OAuthException(HTTPException):
+    """Raised when an OAuth flow fails.
+
+    Status: 400 Bad Request - invalid code, state or provider response
+          502 Bad Gateway - the identity provider could not be reached
+    """
+
+    def __init__(self, detail: str = "OAuth authentication failed", status_code: int = 400):
+        super().__init__(status_code=status_code, detail=detail)
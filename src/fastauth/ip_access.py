@@ -0,0 +1,244 @@
+"""
+IP allow and deny lists.
+
+`IPAccessList` holds a deny list (e.g. threat-feed CIDRs) and an allow list
+as `IPRangeSet`s, so a check is an `inet_pton` plus a few bisections no
+matter how many networks are listed. Lists loaded from files are
+hot-reloaded: `poll()` notices changed files at most once per interval and
+rebuilds the sets in a worker thread, then swaps them in with a single
+assignment, so requests never wait for a reload or see a half-built list.
+
+Checks run either app-wide through `IPAccessMiddleware`, before routing, or
+on the auth routes through the dependency `AuthManager` installs when
+`AuthConfig.ip_access` is enabled.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Iterable, Iterator, NamedTuple
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from .network import ClientIPResolver, IPRangeSet, parse_ip
+
+logger = logging.getLogger("fastauth")
+
+
+class IPAccessStats(NamedTuple):
+    networks: int
+    intervals: int
+    nbytes: int
+    bytes_per_network: float
+
+
+def read_networks(path: str | os.PathLike[str]) -> Iterator[str]:
+    """Yield the networks listed in a file.
+
+    One address or CIDR per line; ``#`` and ``;`` start comments, which
+    covers plain lists as well as feeds like Spamhaus DROP.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = line.partition("#")[0].partition(";")[0].strip()
+            if entry:
+                yield entry
+
+
+def _file_stamp(path: str | os.PathLike[str] | None) -> tuple[int, int, int] | None:
+    if path is None:
+        return None
+    stat = os.stat(path)
+    # The inode catches lists replaced by an atomic rename
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class IPAccessList:
+    """Allow and deny lists of IP networks.
+
+    An address on the allow list is always allowed, so allowlisted offices
+    or partners are exempt from broad feed entries. Otherwise an address
+    on the deny list is rejected, and with `allow_only` every address not
+    on the allow list is rejected too.
+    """
+
+    def __init__(
+        self,
+        deny: Iterable[str] = (),
+        allow: Iterable[str] = (),
+        *,
+        allow_only: bool = False,
+    ):
+        """Build the lists from networks in memory.
+
+        Args:
+            deny: CIDRs or addresses to reject
+            allow: CIDRs or addresses to always accept
+            allow_only: Reject every address not on the allow list
+
+        Raises:
+            ValueError: If an entry is not a valid network
+        """
+        self.allow_only = allow_only
+        # (deny, allow) is replaced as a whole, never mutated in place
+        self._lists = (IPRangeSet(deny), IPRangeSet(allow))
+        self.deny_file: str | os.PathLike[str] | None = None
+        self.allow_file: str | os.PathLike[str] | None = None
+        self.reload_interval_seconds: float | None = None
+        self._stamps: tuple[Any, Any] = (None, None)
+        self._next_poll = 0.0
+        self._reload_task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_files(
+        cls,
+        deny_file: str | os.PathLike[str] | None = None,
+        allow_file: str | os.PathLike[str] | None = None,
+        *,
+        allow_only: bool = False,
+        reload_interval_seconds: float | None = 60.0,
+    ) -> "IPAccessList":
+        """Load the lists from files (see `read_networks`).
+
+        Args:
+            deny_file: File of networks to reject
+            allow_file: File of networks to always accept
+            allow_only: Reject every address not on the allow list
+            reload_interval_seconds: How often `poll()` checks the files for
+                changes (None disables hot reload)
+
+        Raises:
+            OSError: If a file cannot be read
+            ValueError: If a file lists an invalid network
+        """
+        access_list = cls(allow_only=allow_only)
+        access_list.deny_file = deny_file
+        access_list.allow_file = allow_file
+        access_list.reload_interval_seconds = reload_interval_seconds
+        access_list.reload()
+        if reload_interval_seconds is not None:
+            access_list._next_poll = time.monotonic() + reload_interval_seconds
+        return access_list
+
+    def is_allowed(self, ip: str | None) -> bool:
+        """Return True if requests from `ip` may proceed.
+
+        Unparseable addresses (including "unknown") are only rejected when
+        `allow_only` is set, as they cannot be on the allow list.
+        """
+        parsed = parse_ip(ip) if ip else None
+        if parsed is None:
+            return not self.allow_only
+        deny, allow = self._lists
+        if allow.contains_value(*parsed):
+            return True
+        if self.allow_only:
+            return False
+        return not deny.contains_value(*parsed)
+
+    def reload(self) -> bool:
+        """Re-read the list files if they changed since the last load.
+
+        This parses the files, so it blocks; `poll()` runs it in a worker
+        thread. The previous lists stay in effect if reading fails.
+
+        Returns:
+            True if new lists were swapped in
+
+        Raises:
+            OSError: If a file cannot be read
+            ValueError: If a file lists an invalid network
+        """
+        stamps = (_file_stamp(self.deny_file), _file_stamp(self.allow_file))
+        if stamps == self._stamps:
+            return False
+        deny, allow = self._lists
+        if self.deny_file is not None:
+            deny = IPRangeSet(read_networks(self.deny_file))
+        if self.allow_file is not None:
+            allow = IPRangeSet(read_networks(self.allow_file))
+        self._lists = (deny, allow)
+        self._stamps = stamps
+        return True
+
+    def poll(self) -> None:
+        """Start a background reload if the files are due for a check.
+
+        Cheap enough to call on every request; must be called from the
+        event loop.
+        """
+        if self.reload_interval_seconds is None or self._reload_task is not None:
+            return
+        now = time.monotonic()
+        if now < self._next_poll:
+            return
+        self._next_poll = now + self.reload_interval_seconds
+        self._reload_task = asyncio.get_running_loop().create_task(self._reload())
+
+    async def _reload(self) -> None:
+        try:
+            if await asyncio.to_thread(self.reload):
+                logger.info("Reloaded IP access lists: %s", self.stats())
+        except Exception:
+            logger.warning("Failed to reload IP access lists", exc_info=True)
+        finally:
+            self._reload_task = None
+
+    def stats(self) -> IPAccessStats:
+        """Return list sizes and their memory footprint."""
+        networks = intervals = nbytes = 0
+        for ranges in self._lists:
+            networks += ranges.network_count
+            intervals += len(ranges)
+            nbytes += ranges.nbytes
+        return IPAccessStats(
+            networks=networks,
+            intervals=intervals,
+            nbytes=nbytes,
+            bytes_per_network=nbytes / networks if networks else 0.0,
+        )
+
+
+class IPAccessMiddleware:
+    """ASGI middleware rejecting requests from denied IPs before routing.
+
+    Example:
+        app.add_middleware(IPAccessMiddleware, access_list=access_list,
+                           resolver=ClientIPResolver(["10.0.0.0/8"]))
+
+    Without a resolver the direct peer address is checked, since
+    forwarding headers can be set by the client.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        access_list: IPAccessList,
+        resolver: ClientIPResolver | None = None,
+    ):
+        self.app = app
+        self.access_list = access_list
+        self.resolver = resolver
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        self.access_list.poll()
+        if self.resolver is not None:
+            client_ip = self.resolver.resolve(Request(scope))
+        else:
+            client = scope.get("client")
+            client_ip = client[0] if client else None
+
+        if self.access_list.is_allowed(client_ip):
+            await self.app(scope, receive, send)
+        elif scope["type"] == "websocket":
+            # Closing before accept makes the server answer the handshake with 403
+            await send({"type": "websocket.close", "code": 1008})
+        else:
+            response = JSONResponse({"detail": "Access denied"}, status_code=403)
+            await response(scope, receive, send)
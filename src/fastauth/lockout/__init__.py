@@ -0,0 +1,5 @@
+from .base import LockoutStore
+from .memory import MemoryLockoutStore
+from .redis import RedisLockoutStore
+
+__all__ = ["LockoutStore", "MemoryLockoutStore", "RedisLockoutStore"]
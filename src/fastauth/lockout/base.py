@@ -0,0 +1,70 @@
+"""
+Account lockout protocol definitions.
+
+Defines the interface for lockout backends (memory, Redis, etc.), which
+throttle password guessing against a single account with exponentially
+growing lock windows.
+"""
+
+from typing import Protocol
+
+
+class LockoutStore(Protocol):
+    """Protocol for account lockout implementations.
+
+    Attempts are registered *before* the password is verified and count as
+    failures until `reset` is called, so concurrent guesses cannot all slip
+    through before the first failure is recorded. Once an identifier has
+    `threshold` counted failures, each further one locks it for
+    ``base_delay * 2 ** (failures - threshold)`` (capped); failures are
+    forgotten `reset_after_seconds` after the last one.
+
+    Methods:
+        attempt: Register a login attempt for an identifier
+            Args:
+                identifier: Normalized login identifier
+            Returns:
+                0.0 if the attempt may proceed, otherwise seconds until
+                the identifier accepts attempts again
+        reset: Forget an identifier's failures (after a successful login)
+            Args:
+                identifier: Normalized login identifier
+
+    Optional methods (detected with ``hasattr``):
+        refund: Uncount the failure registered by one `attempt` whose
+            password check never finished (e.g. the hasher shed load), so
+            overload doesn't lock out users; without it, the identifier's
+            failures are reset instead.
+            Args:
+                identifier: Normalized login identifier
+    """
+
+    async def attempt(self, identifier: str) -> float:
+        """Register a login attempt for an identifier.
+
+        Args:
+            identifier: Normalized login identifier
+
+        Returns:
+            0.0 if the attempt may proceed, otherwise seconds until the
+            identifier accepts attempts again
+        """
+        ...
+
+    async def reset(self, identifier: str) -> None:
+        """Forget an identifier's failures.
+
+        Args:
+            identifier: Normalized login identifier
+        """
+        ...
+
+
+def backoff_delay(
+    failures: int, threshold: int, base_delay: float, max_delay: float
+) -> float:
+    """Return the lock window following the given number of failures."""
+    if failures < threshold:
+        return 0.0
+    # Cap the exponent so huge failure counts cannot overflow
+    return min(max_delay, base_delay * 2 ** min(failures - threshold, 62))
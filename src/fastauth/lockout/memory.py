@@ -0,0 +1,130 @@
+"""
+In-memory account lockout implementation.
+
+Each identifier maps to a single int packing its lock deadline and failure
+count, so a record is one small int object regardless of history. Records
+expire lazily: a stale record is treated as absent when next read, and
+stale records are swept only when the table outgrows `max_keys`.
+Note: State is per process. Best for single-instance deployments.
+"""
+
+import time
+
+from .base import backoff_delay
+
+_FAILURE_BITS = 16
+_FAILURE_MASK = (1 << _FAILURE_BITS) - 1
+
+
+class MemoryLockoutStore:
+    """In-memory lockout store with exponential backoff."""
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        base_delay_seconds: float = 1.0,
+        max_delay_seconds: float = 900.0,
+        reset_after_seconds: float = 3600.0,
+        max_keys: int = 100000,
+    ):
+        """Initialize the lockout store.
+
+        Args:
+            threshold: Failures before the first lock
+            base_delay_seconds: First lock window
+            max_delay_seconds: Longest lock window
+            reset_after_seconds: Failures are forgotten this long after the last
+            max_keys: Upper bound on tracked identifiers; stale ones are
+                evicted first
+        """
+        self.threshold = threshold
+        self.base_delay_ms = int(base_delay_seconds * 1000)
+        self.max_delay_ms = int(max_delay_seconds * 1000)
+        self.reset_after_ms = int(reset_after_seconds * 1000)
+        self.max_keys = max_keys
+        # identifier -> locked_until_ms << 16 | failures; dict order
+        # doubles as recency order because records are re-inserted
+        self.store: dict[str, int] = {}
+
+    def _delay_ms(self, failures: int) -> int:
+        return int(
+            backoff_delay(failures, self.threshold, self.base_delay_ms, self.max_delay_ms)
+        )
+
+    def _expires_at(self, record: int) -> int:
+        failures = record & _FAILURE_MASK
+        locked_until = record >> _FAILURE_BITS
+        # The last failure happened when its lock window started
+        last_failure = locked_until - self._delay_ms(failures)
+        return max(locked_until, last_failure + self.reset_after_ms)
+
+    async def attempt(self, identifier: str) -> float:
+        """Register a login attempt for an identifier.
+
+        Args:
+            identifier: Normalized login identifier
+
+        Returns:
+            0.0 if the attempt may proceed, otherwise seconds until the
+            identifier accepts attempts again
+        """
+        now = int(time.monotonic() * 1000)
+        failures = 0
+        record = self.store.pop(identifier, None)
+        if record is not None and self._expires_at(record) > now:
+            locked_until = record >> _FAILURE_BITS
+            if locked_until > now:
+                self.store[identifier] = record
+                return (locked_until - now) / 1000
+            failures = record & _FAILURE_MASK
+
+        failures = min(failures + 1, _FAILURE_MASK)
+        locked_until = now + self._delay_ms(failures)
+        self.store[identifier] = locked_until << _FAILURE_BITS | failures
+        if len(self.store) > self.max_keys:
+            self._evict(now)
+        return 0.0
+
+    async def reset(self, identifier: str) -> None:
+        """Forget an identifier's failures.
+
+        Args:
+            identifier: Normalized login identifier
+        """
+        self.store.pop(identifier, None)
+
+    async def refund(self, identifier: str) -> None:
+        """Uncount one failure, shortening the lock window to match.
+
+        Args:
+            identifier: Normalized login identifier
+        """
+        now = int(time.monotonic() * 1000)
+        record = self.store.pop(identifier, None)
+        if record is None or self._expires_at(record) <= now:
+            return
+        failures = record & _FAILURE_MASK
+        last_failure = (record >> _FAILURE_BITS) - self._delay_ms(failures)
+        if failures > 1:
+            failures -= 1
+            record = (last_failure + self._delay_ms(failures)) << _FAILURE_BITS | failures
+            if self._expires_at(record) > now:
+                self.store[identifier] = record
+
+    def failures(self, identifier: str) -> int:
+        """Return the failures currently counted for an identifier."""
+        record = self.store.get(identifier)
+        now = int(time.monotonic() * 1000)
+        if record is None or self._expires_at(record) <= now:
+            return 0
+        return record & _FAILURE_MASK
+
+    def _evict(self, now: int) -> None:
+        # Drop expired records, then the least recent; trimming below the
+        # bound amortizes the scan over many inserts
+        expires_at = self._expires_at
+        for key in [key for key, record in self.store.items() if expires_at(record) <= now]:
+            del self.store[key]
+        target = self.max_keys * 9 // 10
+        while len(self.store) > target:
+            del self.store[next(iter(self.store))]
@@ -0,0 +1,155 @@
+"""
+Redis account lockout implementation.
+
+Each attempt is a single atomic Lua script that checks the lock and, if
+the account is open, counts the attempt and arms the next lock window, so
+locks hold across processes and hosts without a read-then-write race.
+Records are a compact ``failures:locked_until_ms`` string whose TTL
+implements the reset window. Requires a Redis client that implements the
+Redis protocol.
+"""
+
+import hashlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..core.types import Redis
+
+# KEYS[1] = key; ARGV = threshold, base_delay_ms, max_delay_ms, reset_after_ms
+# Returns 0 if the attempt may proceed, otherwise milliseconds until unlock
+LOCKOUT_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local threshold = tonumber(ARGV[1])
+local base_delay = tonumber(ARGV[2])
+local max_delay = tonumber(ARGV[3])
+local reset_after = tonumber(ARGV[4])
+local failures = 0
+local record = redis.call('GET', KEYS[1])
+if record then
+    local sep = string.find(record, ':', 1, true)
+    failures = tonumber(string.sub(record, 1, sep - 1))
+    local locked_until = tonumber(string.sub(record, sep + 1))
+    if locked_until > now then
+        return locked_until - now
+    end
+end
+failures = failures + 1
+local delay = 0
+if failures >= threshold then
+    delay = math.min(max_delay, base_delay * 2 ^ math.min(failures - threshold, 62))
+end
+redis.call('SET', KEYS[1], string.format('%d:%d', failures, now + delay),
+    'PX', string.format('%d', delay + reset_after))
+return 0
+"""
+LOCKOUT_SHA = hashlib.sha1(LOCKOUT_SCRIPT.encode()).hexdigest()
+
+# Same keys and arguments; uncounts one failure and re-arms the lock window
+# from the last failure
+REFUND_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local threshold = tonumber(ARGV[1])
+local base_delay = tonumber(ARGV[2])
+local max_delay = tonumber(ARGV[3])
+local reset_after = tonumber(ARGV[4])
+local record = redis.call('GET', KEYS[1])
+if not record then
+    return 0
+end
+local function delay(failures)
+    if failures < threshold then
+        return 0
+    end
+    return math.min(max_delay, base_delay * 2 ^ math.min(failures - threshold, 62))
+end
+local sep = string.find(record, ':', 1, true)
+local failures = tonumber(string.sub(record, 1, sep - 1))
+local last_failure = tonumber(string.sub(record, sep + 1)) - delay(failures)
+failures = failures - 1
+local locked_until = last_failure + delay(failures)
+local ttl = locked_until + reset_after - now
+if failures <= 0 or ttl <= 0 then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('SET', KEYS[1], string.format('%d:%d', failures, locked_until),
+        'PX', string.format('%d', ttl))
+end
+return 0
+"""
+REFUND_SHA = hashlib.sha1(REFUND_SCRIPT.encode()).hexdigest()
+
+
+class RedisLockoutStore:
+    """Redis-backed lockout store with exponential backoff."""
+
+    def __init__(
+        self,
+        redis: "Redis",
+        key_prefix: str = "lockout:",
+        threshold: int = 5,
+        base_delay_seconds: float = 1.0,
+        max_delay_seconds: float = 900.0,
+        reset_after_seconds: float = 3600.0,
+    ):
+        """Initialize the Redis lockout store.
+
+        Args:
+            redis: Redis client instance
+            key_prefix: Prefix for lockout keys (default: "lockout:")
+            threshold: Failures before the first lock
+            base_delay_seconds: First lock window
+            max_delay_seconds: Longest lock window
+            reset_after_seconds: Failures are forgotten this long after the last
+        """
+        self.redis = redis
+        self.key_prefix = key_prefix
+        self._args = (
+            threshold,
+            int(base_delay_seconds * 1000),
+            int(max_delay_seconds * 1000),
+            int(reset_after_seconds * 1000),
+        )
+
+    def _make_key(self, identifier: str) -> str:
+        """Generate a Redis key for an identifier."""
+        return f"{self.key_prefix}{identifier}"
+
+    async def attempt(self, identifier: str) -> float:
+        """Register a login attempt for an identifier.
+
+        Args:
+            identifier: Normalized login identifier
+
+        Returns:
+            0.0 if the attempt may proceed, otherwise seconds until the
+            identifier accepts attempts again
+        """
+        locked_ms = await self._run(LOCKOUT_SCRIPT, LOCKOUT_SHA, identifier)
+        return int(locked_ms) / 1000
+
+    async def refund(self, identifier: str) -> None:
+        """Uncount one failure, shortening the lock window to match.
+
+        Args:
+            identifier: Normalized login identifier
+        """
+        await self._run(REFUND_SCRIPT, REFUND_SHA, identifier)
+
+    async def _run(self, script: str, sha: str, identifier: str) -> int:
+        key = self._make_key(identifier)
+        try:
+            return await self.redis.evalsha(sha, 1, key, *self._args)
+        except Exception as e:
+            if "NOSCRIPT" not in str(e):
+                raise
+            return await self.redis.eval(script, 1, key, *self._args)
+
+    async def reset(self, identifier: str) -> None:
+        """Forget an identifier's failures.
+
+        Args:
+            identifier: Normalized login identifier
+        """
+        await self.redis.delete(self._make_key(identifier))
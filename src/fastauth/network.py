@@ -0,0 +1,332 @@
+"""
+IP network matching and trusted-proxy client IP resolution.
+
+`IPRangeSet` turns a list of CIDRs into merged integer intervals once, so
+membership is an `inet_pton` plus a bisection instead of building
+`ipaddress` objects per check. `ClientIPResolver` uses it to walk
+forwarding headers right to left, skipping only hops added by trusted
+proxies, so clients cannot choose the address rate limits are keyed on.
+"""
+
+import socket
+from array import array
+from bisect import bisect_left as _bisect_left
+from bisect import bisect_right as _bisect_right
+from typing import Iterable, Literal
+
+from fastapi import Request
+
+_AF_INET = int(socket.AF_INET)
+_AF_INET6 = int(socket.AF_INET6)
+_inet_pton = socket.inet_pton
+_HALF_MASK = (1 << 64) - 1
+# Large sets get an index of the first interval per 16-bit address prefix
+_INDEX_BITS = 16
+_INDEX_MIN_INTERVALS = 4096
+
+
+def parse_ip(ip: str) -> tuple[int, int] | None:
+    """Parse an IP address string into ``(version, integer value)``.
+
+    IPv4-mapped IPv6 addresses (``::ffff:a.b.c.d``) are returned as IPv4,
+    and IPv6 zone IDs (``%eth0``) are ignored.
+
+    Returns:
+        Tuple of (4 or 6, address as int), or None if `ip` is not an address
+    """
+    try:
+        if ":" in ip:
+            ip = ip.partition("%")[0]
+            value = int.from_bytes(_inet_pton(_AF_INET6, ip))
+            if value >> 32 == 0xFFFF:
+                return 4, value & 0xFFFFFFFF
+            return 6, value
+        return 4, int.from_bytes(_inet_pton(_AF_INET, ip))
+    except (OSError, ValueError):
+        return None
+
+
+def parse_network(network: str) -> tuple[int, int, int]:
+    """Parse a CIDR or single address into ``(version, first, last)``.
+
+    Host bits are ignored (``10.1.2.3/8`` is ``10.0.0.0/8``), and IPv4-mapped
+    networks of /96 or longer are returned as the IPv4 range they map.
+
+    Raises:
+        ValueError: If `network` is not a valid address or CIDR
+    """
+    address, slash, prefix = network.strip().partition("/")
+    is_ipv6 = ":" in address
+    try:
+        value = int.from_bytes(
+            _inet_pton(_AF_INET6 if is_ipv6 else _AF_INET, address.partition("%")[0])
+        )
+    except (OSError, ValueError):
+        raise ValueError(f"Invalid network: {network!r}") from None
+
+    bits = 128 if is_ipv6 else 32
+    length = bits
+    if slash:
+        if not (prefix.isascii() and prefix.isdigit()) or int(prefix) > bits:
+            raise ValueError(f"Invalid network: {network!r}")
+        length = int(prefix)
+    host_mask = (1 << (bits - length)) - 1
+    start = value & ~host_mask
+    end = start | host_mask
+    if not is_ipv6:
+        return 4, start, end
+    if length >= 96 and start >> 32 == 0xFFFF:
+        return 4, start & 0xFFFFFFFF, end & 0xFFFFFFFF
+    return 6, start, end
+
+
+class IPRangeSet:
+    """Immutable set of IP networks with fast membership tests.
+
+    Networks are merged into sorted, non-overlapping ``[start, end]``
+    integer intervals per address family when the set is built, and stored
+    in packed arrays: 8 bytes per IPv4 interval and 32 bytes per IPv6
+    interval (start and end split into high and low 64-bit columns), so
+    threat feeds with hundreds of thousands of CIDRs stay a few MB.
+    Membership is O(log n) bisections over those arrays; families with
+    many intervals also get a 256 KiB index by 16-bit prefix, so a lookup
+    only bisects the few intervals sharing its prefix.
+    """
+
+    def __init__(self, networks: Iterable[str] = ()):
+        """Build the set.
+
+        Args:
+            networks: CIDRs (``"10.0.0.0/8"``) or single addresses
+
+        Raises:
+            ValueError: If an entry is not a valid network
+        """
+        ranges: dict[int, list[tuple[int, int]]] = {4: [], 6: []}
+        count = 0
+        for network in networks:
+            version, start, end = parse_network(network)
+            ranges[version].append((start, end))
+            count += 1
+        self.network_count = count
+
+        self._v4_starts = array("I")
+        self._v4_ends = array("I")
+        for start, end in _merge(ranges[4]):
+            self._v4_starts.append(start)
+            self._v4_ends.append(end)
+        self._v4_index = _bucket_index(self._v4_starts, 32)
+
+        self._v6_start_highs = array("Q")
+        self._v6_start_lows = array("Q")
+        self._v6_end_highs = array("Q")
+        self._v6_end_lows = array("Q")
+        for start, end in _merge(ranges[6]):
+            self._v6_start_highs.append(start >> 64)
+            self._v6_start_lows.append(start & _HALF_MASK)
+            self._v6_end_highs.append(end >> 64)
+            self._v6_end_lows.append(end & _HALF_MASK)
+        self._v6_index = _bucket_index(self._v6_start_highs, 64)
+
+    def __len__(self) -> int:
+        """Number of merged intervals."""
+        return len(self._v4_starts) + len(self._v6_start_highs)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the interval arrays."""
+        return sum(
+            column.itemsize * len(column)
+            for column in (
+                self._v4_index,
+                self._v4_starts,
+                self._v4_ends,
+                self._v6_index,
+                self._v6_start_highs,
+                self._v6_start_lows,
+                self._v6_end_highs,
+                self._v6_end_lows,
+            )
+            if column is not None
+        )
+
+    def contains_value(self, version: int, value: int) -> bool:
+        """Return True if a parsed address (see `parse_ip`) is in the set."""
+        if version == 4:
+            starts = self._v4_starts
+            buckets = self._v4_index
+            if buckets is None:
+                index = _bisect_right(starts, value) - 1
+            else:
+                bucket = value >> 16
+                index = _bisect_right(starts, value, buckets[bucket], buckets[bucket + 1]) - 1
+            return index >= 0 and value <= self._v4_ends[index]
+
+        # Find the last interval starting at or before `value`: first by
+        # the high half, then by the low half among equal high halves
+        high, low = value >> 64, value & _HALF_MASK
+        highs = self._v6_start_highs
+        buckets = self._v6_index
+        if buckets is None:
+            lo, hi = 0, len(highs)
+        else:
+            bucket = high >> 48
+            lo, hi = buckets[bucket], buckets[bucket + 1]
+        first = _bisect_left(highs, high, lo, hi)
+        last = _bisect_right(highs, high, first, hi)
+        index = _bisect_right(self._v6_start_lows, low, first, last) - 1
+        if index < first:
+            index = first - 1
+        if index < 0:
+            return False
+        end_high = self._v6_end_highs[index]
+        return high < end_high or (high == end_high and low <= self._v6_end_lows[index])
+
+    def __contains__(self, ip: object) -> bool:
+        if not isinstance(ip, str):
+            return False
+        parsed = parse_ip(ip)
+        return parsed is not None and self.contains_value(*parsed)
+
+    def intervals(self, version: int) -> list[tuple[int, int]]:
+        """Return the merged ``(start, end)`` intervals of one family."""
+        if version == 4:
+            return list(zip(self._v4_starts, self._v4_ends))
+        return [
+            (start_high << 64 | start_low, end_high << 64 | end_low)
+            for start_high, start_low, end_high, end_low in zip(
+                self._v6_start_highs,
+                self._v6_start_lows,
+                self._v6_end_highs,
+                self._v6_end_lows,
+            )
+        ]
+
+
+def _bucket_index(keys: array, bits: int) -> array | None:
+    """Return, for every 16-bit prefix (and one past the last), the first
+    interval whose start has that prefix or a greater one."""
+    if len(keys) < _INDEX_MIN_INTERVALS:
+        return None
+    shift = bits - _INDEX_BITS
+    prefixes = [key >> shift for key in keys]
+    return array(
+        "I", [_bisect_left(prefixes, bucket) for bucket in range((1 << _INDEX_BITS) + 1)]
+    )
+
+
+def _merge(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Merge overlapping and adjacent ``(start, end)`` ranges."""
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _strip_port(host: str) -> str:
+    """Return the address part of ``ip``, ``ip:port`` or ``[ipv6]:port``."""
+    host = host.strip().strip('"')
+    if host.startswith("["):
+        return host[1 : host.find("]")] if "]" in host else host[1:]
+    if host.count(":") == 1:
+        return host.partition(":")[0]
+    return host
+
+
+def parse_forwarded_for(value: str) -> list[str]:
+    """Return the ``for=`` addresses of an RFC 7239 `Forwarded` header, in order."""
+    hops = []
+    for element in value.split(","):
+        for pair in element.split(";"):
+            name, _, node = pair.partition("=")
+            if name.strip().lower() == "for":
+                hops.append(_strip_port(node))
+                break
+        else:
+            # An element without `for=` still stands for a hop we can't place
+            hops.append("")
+    return hops
+
+
+class ClientIPResolver:
+    """Resolves the client IP of a request behind trusted reverse proxies.
+
+    The forwarding header is only honored when the direct peer is a trusted
+    proxy. Hops are then read right to left (each proxy appends the address
+    it received the request from), and the first one that is not a trusted
+    proxy is the client. Malformed hops end the walk at the last address
+    that could be verified. Results are memoized per (peer, header value),
+    so a repeat request costs one dict lookup.
+    """
+
+    def __init__(
+        self,
+        trusted_proxies: Iterable[str] = (),
+        header: Literal["x-forwarded-for", "forwarded"] = "x-forwarded-for",
+        cache_size: int = 4096,
+    ):
+        """Initialize the resolver.
+
+        Args:
+            trusted_proxies: CIDRs of proxies allowed to set forwarding headers
+            header: Which forwarding header the proxies set; the other is
+                ignored, since clients could send it unchecked
+            cache_size: Maximum memoized resolutions
+        """
+        self.trusted = IPRangeSet(trusted_proxies)
+        self.header = header
+        self._header_name = header.encode()
+        self.cache_size = cache_size
+        self._cache: dict[tuple[str, str | None], str] = {}
+
+    def _is_trusted(self, ip: str) -> bool:
+        parsed = parse_ip(ip)
+        return parsed is not None and self.trusted.contains_value(*parsed)
+
+    def resolve_hops(self, peer: str, header_value: str | None) -> str:
+        """Resolve the client IP from the direct peer and a header value."""
+        key = (peer, header_value)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        client = peer
+        if header_value and self._is_trusted(peer):
+            if self.header == "forwarded":
+                hops = parse_forwarded_for(header_value)
+            else:
+                hops = [_strip_port(hop) for hop in header_value.split(",")]
+            for hop in reversed(hops):
+                if parse_ip(hop) is None:
+                    break
+                client = hop
+                if not self._is_trusted(hop):
+                    break
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[key] = client
+        return client
+
+    def resolve(self, request: Request) -> str:
+        """Return the client IP of a request.
+
+        Args:
+            request: FastAPI Request object
+
+        Returns:
+            The client's IP address, or "unknown" without a peer address
+        """
+        scope = request.scope
+        client = scope.get("client")
+        peer = client[0] if client else "unknown"
+        # Read the raw ASGI headers: cheaper than `request.headers`, and a
+        # header repeated on several lines must be read as one list
+        name = self._header_name
+        values = [value for key, value in scope["headers"] if key == name]
+        header_value = b", ".join(values).decode("latin-1") if values else None
+        return self.resolve_hops(peer, header_value)
@@ -0,0 +1,22 @@
+from .base import OAuthProvider
+from .github import GitHubOAuthProvider
+from .google import GoogleOAuthProvider
+from .http import build_http_client, close_http_client, get_http_client
+from .oauth2 import OAuth2Provider
+from .oidc import JWKSCache, OIDCProvider
+from .registry import clear_provider_cache, get_provider, register_provider
+
+__all__ = [
+    "GitHubOAuthProvider",
+    "GoogleOAuthProvider",
+    "JWKSCache",
+    "OAuth2Provider",
+    "OAuthProvider",
+    "OIDCProvider",
+    "build_http_client",
+    "clear_provider_cache",
+    "close_http_client",
+    "get_http_client",
+    "get_provider",
+    "register_provider",
+]
@@ -1,10 +1,35 @@
 # oauth/base.py
-from typing import Protocol
+from typing import Any, Protocol
 
 
 class OAuthProvider(Protocol):
+    """Protocol for OAuth identity providers.
+
+    Methods:
+        get_authorization_url: URL to redirect the user to
+            Args:
+                state: Opaque value the provider echoes back to the callback
+                **params: Extra query parameters (e.g. PKCE challenge, prompt)
+        exchange_code: Exchange the callback's code for tokens
+            Args:
+                code: Authorization code from the callback
+                **params: Extra form fields (e.g. PKCE verifier)
+            Returns:
+                The provider's token response
+        fetch_user: Fetch the user the tokens belong to
+            Args:
+                token_data: Result of `exchange_code`
+                nonce: Nonce sent with the authorization request, checked
+                    against the ID token by OpenID Connect providers
+            Returns:
+                Dict with `provider`, `id`, `email`, `email_verified`, `name`
+                and the provider's `raw` payload
+    """
+
     name: str
 
-    async def get_authorization_url(self) -> str: ...
-    async def exchange_code(self, code: str) -> dict: ...
-    async def fetch_user(self, token_data: dict) -> dict: ...
+    async def get_authorization_url(self, state: str | None = None, **params: str) -> str: ...
+    async def exchange_code(self, code: str, **params: str) -> dict[str, Any]: ...
+    async def fetch_user(
+        self, token_data: dict[str, Any], nonce: str | None = None
+    ) -> dict[str, Any]: ...
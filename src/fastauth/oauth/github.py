@@ -0,0 +1,75 @@
+"""
+GitHub OAuth provider.
+
+GitHub is not an OpenID Connect provider: the profile comes from the REST
+API, and the email on the profile is optional and carries no verification
+flag. The profile and the email list are fetched concurrently over the
+shared client, and the primary verified email is preferred.
+"""
+
+import asyncio
+from typing import Any
+
+from ..exceptions import OAuthException
+from .oauth2 import OAuth2Provider
+
+
+class GitHubOAuthProvider(OAuth2Provider):
+    """Sign in with GitHub."""
+
+    name = "github"
+    authorize_url = "https://github.com/login/oauth/authorize"
+    token_url = "https://github.com/login/oauth/access_token"
+    userinfo_url = "https://api.github.com/user"
+    emails_url = "https://api.github.com/user/emails"
+    default_scopes = ("read:user", "user:email")
+
+    async def fetch_user(
+        self, token_data: dict[str, Any], nonce: str | None = None
+    ) -> dict[str, Any]:
+        """Fetch the GitHub user and their primary verified email.
+
+        Args:
+            token_data: Result of `exchange_code`
+            nonce: Unused; GitHub issues no ID token
+
+        Returns:
+            Normalized user dict
+
+        Raises:
+            OAuthException: If the profile request fails
+        """
+        headers = {
+            **self._auth_headers(token_data),
+            "Accept": "application/vnd.github+json",
+        }
+        profile, emails = await asyncio.gather(
+            self._request("GET", self.userinfo_url, headers=headers),
+            self._request("GET", self.emails_url, headers=headers),
+            return_exceptions=True,
+        )
+        if isinstance(profile, BaseException):
+            raise profile
+        if not isinstance(profile, dict) or "id" not in profile:
+            raise OAuthException("github returned no user ID")
+
+        email, verified = profile.get("email"), False
+        # The email list needs the user:email scope; without it, fall back
+        # to the public profile email, unverified
+        if isinstance(emails, list):
+            verified_emails = [
+                entry for entry in emails if isinstance(entry, dict) and entry.get("verified")
+            ]
+            primary = next((e for e in verified_emails if e.get("primary")), None)
+            chosen = primary or (verified_emails[0] if verified_emails else None)
+            if chosen is not None:
+                email, verified = chosen.get("email"), True
+
+        return {
+            "provider": self.name,
+            "id": str(profile["id"]),
+            "email": email,
+            "email_verified": verified,
+            "name": profile.get("name") or profile.get("login"),
+            "raw": profile,
+        }
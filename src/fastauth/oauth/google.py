@@ -0,0 +1,18 @@
+"""
+Google OAuth provider.
+
+Google is an OpenID Connect provider: its endpoints come from the discovery
+document and the user is read from the verified ID token, with the standard
+claims (`sub`, `email`, `email_verified`, `name`).
+"""
+
+from .oidc import OIDCProvider
+
+
+class GoogleOAuthProvider(OIDCProvider):
+    """Sign in with Google."""
+
+    name = "google"
+    issuer = "https://accounts.google.com"
+    # Google's ID tokens may carry the issuer without the scheme
+    issuer_aliases = ("accounts.google.com",)
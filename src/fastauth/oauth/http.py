@@ -0,0 +1,64 @@
+"""
+Shared HTTP client for identity provider calls.
+
+Every OAuth login calls the provider's token and userinfo endpoints. A new
+client per call pays for DNS, TCP and TLS handshakes each time; one
+long-lived client per event loop keeps those connections alive between
+logins, and multiplexes them over HTTP/2 when the optional `h2` package is
+installed. Clients are bound to the loop they were created on, so each
+running loop gets its own.
+"""
+
+import asyncio
+import importlib.util
+import weakref
+from typing import Any
+
+import httpx
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=90.0
+)
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def build_http_client(**kwargs: Any) -> httpx.AsyncClient:
+    """Create a pooled client with the defaults used for provider calls.
+
+    Args:
+        **kwargs: `httpx.AsyncClient` options overriding the defaults
+            (e.g. `transport` to point providers at a stand-in IdP)
+
+    Returns:
+        A new client; the caller owns it and must close it
+    """
+    options: dict[str, Any] = {
+        "timeout": DEFAULT_TIMEOUT,
+        "limits": DEFAULT_LIMITS,
+        "http2": HTTP2_AVAILABLE,
+        "headers": {"Accept": "application/json", "User-Agent": "fastauth"},
+    }
+    options.update(kwargs)
+    return httpx.AsyncClient(**options)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client of the running event loop, creating it once."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = build_http_client()
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running loop's shared client (e.g. on application shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
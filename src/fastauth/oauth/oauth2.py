@@ -0,0 +1,164 @@
+"""
+Generic OAuth 2.0 authorization-code provider.
+
+Built-in providers subclass `OAuth2Provider`, setting their endpoints and
+mapping the provider's user payload in `normalize_user`. All requests go
+through the shared pooled client (see `oauth.http`) unless a client is
+passed in, so connections to the provider are reused across logins.
+"""
+
+from typing import Any, Iterable
+from urllib.parse import urlencode
+
+import httpx
+
+from ..exceptions import OAuthException
+from .http import get_http_client
+
+
+class OAuth2Provider:
+    """OAuth 2.0 authorization-code flow against a provider's endpoints."""
+
+    name: str = "oauth2"
+    authorize_url: str = ""
+    token_url: str = ""
+    userinfo_url: str = ""
+    default_scopes: tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        redirect_uri: str | None = None,
+        scopes: Iterable[str] | None = None,
+        http_client: httpx.AsyncClient | None = None,
+    ):
+        """Initialize the provider.
+
+        Args:
+            client_id: OAuth client ID
+            client_secret: OAuth client secret
+            redirect_uri: Callback URL registered with the provider
+            scopes: Requested scopes (default: the provider's defaults)
+            http_client: Client to use instead of the shared pooled one
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.scopes = tuple(scopes) if scopes is not None else self.default_scopes
+        self._http_client = http_client
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
+
+    async def get_authorization_url(self, state: str | None = None, **params: str) -> str:
+        """Build the URL that starts the flow at the provider.
+
+        Args:
+            state: Opaque value the provider echoes back to the callback
+            **params: Extra query parameters
+
+        Returns:
+            The authorization URL
+        """
+        query = {"response_type": "code", "client_id": self.client_id}
+        if self.redirect_uri:
+            query["redirect_uri"] = self.redirect_uri
+        if self.scopes:
+            query["scope"] = " ".join(self.scopes)
+        if state:
+            query["state"] = state
+        query.update(params)
+        return f"{self.authorize_url}?{urlencode(query)}"
+
+    async def exchange_code(self, code: str, **params: str) -> dict[str, Any]:
+        """Exchange an authorization code for tokens.
+
+        Args:
+            code: Authorization code from the callback
+            **params: Extra form fields
+
+        Returns:
+            The token response, with at least `access_token`
+
+        Raises:
+            OAuthException: If the provider rejects the code or is unreachable
+        """
+        form = {
+            "grant_type": "authorization_code",
+            "code": code,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+        }
+        if self.redirect_uri:
+            form["redirect_uri"] = self.redirect_uri
+        form.update(params)
+        token_data = await self._request("POST", self.token_url, data=form)
+        if not isinstance(token_data, dict):
+            raise OAuthException(f"{self.name} returned an invalid token response")
+        # Some providers (GitHub) report errors with a 200 response
+        if "error" in token_data or "access_token" not in token_data:
+            raise OAuthException(
+                f"{self.name} rejected the authorization code: "
+                f"{token_data.get('error', 'no access token')}"
+            )
+        return token_data
+
+    async def fetch_user(
+        self, token_data: dict[str, Any], nonce: str | None = None
+    ) -> dict[str, Any]:
+        """Fetch the user the tokens belong to.
+
+        Args:
+            token_data: Result of `exchange_code`
+            nonce: Unused; plain OAuth 2.0 responses carry no ID token
+
+        Returns:
+            Normalized user dict (see `normalize_user`)
+
+        Raises:
+            OAuthException: If the request fails
+        """
+        data = await self._request(
+            "GET", self.userinfo_url, headers=self._auth_headers(token_data)
+        )
+        if not isinstance(data, dict):
+            raise OAuthException(f"{self.name} returned an invalid user response")
+        return self.normalize_user(data)
+
+    def normalize_user(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Map the provider's user payload to the common fields.
+
+        The default reads OpenID Connect standard claims.
+        """
+        if "sub" not in data:
+            raise OAuthException(f"{self.name} returned no user ID")
+        return {
+            "provider": self.name,
+            "id": str(data["sub"]),
+            "email": data.get("email"),
+            "email_verified": data.get("email_verified") is True,
+            "name": data.get("name"),
+            "raw": data,
+        }
+
+    def _auth_headers(self, token_data: dict[str, Any]) -> dict[str, str]:
+        return {"Authorization": f"Bearer {token_data['access_token']}"}
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> Any:
+        try:
+            response = await self.http.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            raise OAuthException(f"{self.name} is unreachable", status_code=502) from e
+        if response.is_error:
+            raise OAuthException(
+                f"{self.name} request failed with status {response.status_code}"
+            )
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise OAuthException(f"{self.name} returned an invalid response") from e
+        if not isinstance(data, (dict, list)):
+            raise OAuthException(f"{self.name} returned an invalid response")
+        return data
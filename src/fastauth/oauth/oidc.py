@@ -0,0 +1,411 @@
+"""
+OpenID Connect providers with local ID-token verification.
+
+The token response of an OIDC provider carries a signed `id_token` with the
+user's claims, so `OIDCProvider.fetch_user` verifies it locally instead of
+calling the userinfo endpoint. The discovery document and the provider's
+signing keys (JWKS) are cached in process:
+
+- keys are parsed once per key set and indexed by `kid`;
+- the key set is refreshed in the background before it expires, and a
+  failed refresh keeps serving the keys already loaded;
+- a token signed with an unknown `kid` (key rotation) triggers at most one
+  refetch per `min_refetch_interval_seconds`;
+- concurrent fetches share a single request, so a burst of logins cannot
+  stampede the provider.
+
+RS*/PS*/ES*/EdDSA keys need PyJWT's crypto extra (`cryptography`); keys the
+installed PyJWT cannot load are skipped and reported when a token uses them.
+"""
+
+import asyncio
+import hmac
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Iterable
+
+import httpx
+import jwt
+
+from ..exceptions import OAuthException
+from .http import get_http_client
+from .oauth2 import OAuth2Provider
+
+logger = logging.getLogger("fastauth")
+
+SUPPORTED_ALGORITHMS = frozenset(
+    {
+        "HS256", "HS384", "HS512",
+        "RS256", "RS384", "RS512",
+        "PS256", "PS384", "PS512",
+        "ES256", "ES384", "ES512",
+        "EdDSA",
+    }
+)
+
+_MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+# Refresh once this fraction of the TTL has passed, ahead of expiry
+_REFRESH_AHEAD = 0.8
+
+
+def _cache_ttl(response: httpx.Response, default: float, floor: float) -> float:
+    match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+    if match is None:
+        return default
+    return max(float(match.group(1)), floor)
+
+
+class _SingleFlight:
+    """Run one fetch at a time; callers arriving meanwhile await the same one."""
+
+    def __init__(self, fetch: Callable[[], Awaitable[None]], label: str):
+        self._fetch = fetch
+        self._label = label
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> asyncio.Task:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._fetch())
+            self._task.add_done_callback(self._done)
+        return self._task
+
+    async def run(self) -> None:
+        # Shielded so one cancelled caller doesn't cancel the others' fetch
+        await asyncio.shield(self.start())
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._task = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Fetching %s failed: %s", self._label, task.exception())
+
+
+class JWKSCache:
+    """In-process cache of a provider's signing keys."""
+
+    def __init__(
+        self,
+        jwks_uri: str,
+        http_client: httpx.AsyncClient | None = None,
+        ttl_seconds: float = 3600.0,
+        min_refetch_interval_seconds: float = 60.0,
+    ):
+        """Initialize the cache; nothing is fetched until a key is needed.
+
+        Args:
+            jwks_uri: URL of the provider's JWK set
+            http_client: Client to use instead of the shared pooled one
+            ttl_seconds: Key set lifetime when the response sets no max-age
+            min_refetch_interval_seconds: Minimum time between fetches
+                triggered by unknown key IDs or failed loads
+        """
+        self.jwks_uri = jwks_uri
+        self.ttl_seconds = ttl_seconds
+        self.min_refetch_interval_seconds = min_refetch_interval_seconds
+        self._http_client = http_client
+        self._keys: dict[str | None, jwt.PyJWK] = {}
+        self._raw: dict[str | None, dict[str, Any]] = {}
+        self._unusable: dict[str | None, str] = {}
+        self._loaded_at: float | None = None
+        self._refresh_at = 0.0
+        self._last_attempt: float | None = None
+        self._flight = _SingleFlight(self._fetch, jwks_uri)
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
+
+    @property
+    def kids(self) -> list[str | None]:
+        return list(self._keys)
+
+    async def get_key(self, kid: str | None) -> jwt.PyJWK:
+        """Return the signing key with the given ID.
+
+        Args:
+            kid: Key ID from the token header; without one, a key set with
+                a single key is used
+
+        Returns:
+            The parsed key
+
+        Raises:
+            OAuthException: If the key is unknown or the keys can't be loaded
+        """
+        now = time.monotonic()
+        if self._loaded_at is None:
+            if not self._may_fetch(now):
+                raise OAuthException(
+                    "Identity provider signing keys are unavailable", status_code=502
+                )
+            await self._flight.run()
+        elif now >= self._refresh_at and self._may_fetch(now):
+            # Rate-limited too, so a failing endpoint isn't hit on every login
+            self._flight.start()
+
+        key = self._lookup(kid)
+        if key is None and self._may_fetch(time.monotonic()):
+            # The provider may have rotated in a key we haven't seen yet
+            await self._flight.run()
+            key = self._lookup(kid)
+        if key is None:
+            if kid in self._unusable:
+                raise OAuthException(self._unusable[kid], status_code=500)
+            raise OAuthException("ID token is signed with an unknown key")
+        return key
+
+    async def refresh(self) -> None:
+        """Fetch the key set now, joining a fetch already in progress."""
+        await self._flight.run()
+
+    def _may_fetch(self, now: float) -> bool:
+        return (
+            self._last_attempt is None
+            or now - self._last_attempt >= self.min_refetch_interval_seconds
+        )
+
+    def _lookup(self, kid: str | None) -> jwt.PyJWK | None:
+        if kid is None and len(self._keys) == 1:
+            return next(iter(self._keys.values()))
+        return self._keys.get(kid)
+
+    async def _fetch(self) -> None:
+        self._last_attempt = time.monotonic()
+        try:
+            response = await self.http.get(self.jwks_uri)
+            response.raise_for_status()
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise OAuthException(
+                "Could not fetch identity provider signing keys", status_code=502
+            ) from e
+        entries = data.get("keys") if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            raise OAuthException(
+                "Identity provider returned an invalid key set", status_code=502
+            )
+
+        keys: dict[str | None, jwt.PyJWK] = {}
+        raw: dict[str | None, dict[str, Any]] = {}
+        unusable: dict[str | None, str] = {}
+        for entry in entries:
+            if not isinstance(entry, dict) or entry.get("use", "sig") != "sig":
+                continue
+            kid = entry.get("kid")
+            raw[kid] = entry
+            if self._raw.get(kid) == entry and kid in self._keys:
+                # Unchanged since the last fetch: keep the parsed key
+                keys[kid] = self._keys[kid]
+                continue
+            try:
+                keys[kid] = jwt.PyJWK(entry)
+            except jwt.exceptions.MissingCryptographyError:
+                unusable[kid] = (
+                    f"Verifying {entry.get('kty')} keys requires the "
+                    "'cryptography' package (pip install pyjwt[crypto])"
+                )
+            except jwt.PyJWKError as e:
+                logger.warning("Skipping invalid key %r from %s: %s", kid, self.jwks_uri, e)
+
+        # Swapped together so readers never see a half-updated key set
+        self._keys, self._raw, self._unusable = keys, raw, unusable
+        now = time.monotonic()
+        ttl = _cache_ttl(response, self.ttl_seconds, self.min_refetch_interval_seconds)
+        self._loaded_at = now
+        self._refresh_at = now + ttl * _REFRESH_AHEAD
+
+
+class OIDCProvider(OAuth2Provider):
+    """OpenID Connect provider configured through its discovery document."""
+
+    name = "oidc"
+    issuer: str = ""
+    # Other `iss` values the provider puts in ID tokens; discovery must
+    # still report `issuer` exactly
+    issuer_aliases: tuple[str, ...] = ()
+    default_scopes = ("openid", "email", "profile")
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        redirect_uri: str | None = None,
+        scopes: Iterable[str] | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        *,
+        issuer: str | None = None,
+        name: str | None = None,
+        discovery_ttl_seconds: float = 86400.0,
+        jwks_ttl_seconds: float = 3600.0,
+        min_refetch_interval_seconds: float = 60.0,
+        leeway_seconds: float = 60.0,
+    ):
+        """Initialize the provider.
+
+        Args:
+            client_id: OAuth client ID
+            client_secret: OAuth client secret
+            redirect_uri: Callback URL registered with the provider
+            scopes: Requested scopes (default: openid, email and profile)
+            http_client: Client to use instead of the shared pooled one
+            issuer: Issuer URL (default: the class's `issuer`)
+            name: Provider name reported in user dicts (default: "oidc")
+            discovery_ttl_seconds: How long the discovery document is reused
+            jwks_ttl_seconds: Key set lifetime when the provider sets no max-age
+            min_refetch_interval_seconds: Minimum time between key set
+                fetches triggered by unknown key IDs
+            leeway_seconds: Allowed clock skew for `exp`/`iat`
+
+        Raises:
+            ValueError: If no issuer is configured
+        """
+        super().__init__(client_id, client_secret, redirect_uri, scopes, http_client)
+        if issuer:
+            self.issuer = issuer.rstrip("/")
+        if name:
+            self.name = name
+        if not self.issuer:
+            raise ValueError("OIDC providers require an issuer")
+        self.discovery_url = f"{self.issuer}/.well-known/openid-configuration"
+        self.discovery_ttl_seconds = discovery_ttl_seconds
+        self.jwks_ttl_seconds = jwks_ttl_seconds
+        self.min_refetch_interval_seconds = min_refetch_interval_seconds
+        self.leeway_seconds = leeway_seconds
+        self.metadata: dict[str, Any] = {}
+        self.id_token_algorithms: tuple[str, ...] = ()
+        self.jwks: JWKSCache | None = None
+        self._discovered_at: float | None = None
+        self._discovery = _SingleFlight(self._load_metadata, self.discovery_url)
+
+    async def discover(self) -> dict[str, Any]:
+        """Load the discovery document, reusing it for `discovery_ttl_seconds`.
+
+        Returns:
+            The provider metadata
+
+        Raises:
+            OAuthException: If the document can't be fetched or is invalid
+        """
+        if (
+            self._discovered_at is None
+            or time.monotonic() - self._discovered_at >= self.discovery_ttl_seconds
+        ):
+            await self._discovery.run()
+        return self.metadata
+
+    async def get_authorization_url(self, state: str | None = None, **params: str) -> str:
+        await self.discover()
+        return await super().get_authorization_url(state, **params)
+
+    async def exchange_code(self, code: str, **params: str) -> dict[str, Any]:
+        await self.discover()
+        return await super().exchange_code(code, **params)
+
+    async def fetch_user(
+        self, token_data: dict[str, Any], nonce: str | None = None
+    ) -> dict[str, Any]:
+        """Return the user from the verified ID token.
+
+        Falls back to the userinfo endpoint when the token response has no
+        `id_token`.
+
+        Args:
+            token_data: Result of `exchange_code`
+            nonce: Nonce sent with the authorization request, if any
+
+        Returns:
+            Normalized user dict (see `normalize_user`)
+
+        Raises:
+            OAuthException: If the ID token is invalid
+        """
+        id_token = token_data.get("id_token")
+        if id_token:
+            return self.normalize_user(await self.verify_id_token(id_token, nonce=nonce))
+        await self.discover()
+        return await super().fetch_user(token_data)
+
+    async def verify_id_token(self, id_token: str, nonce: str | None = None) -> dict[str, Any]:
+        """Verify an ID token's signature and claims.
+
+        Args:
+            id_token: The encoded ID token
+            nonce: Expected `nonce` claim, if one was sent
+
+        Returns:
+            The token's claims
+
+        Raises:
+            OAuthException: If the token is invalid
+        """
+        await self.discover()
+        try:
+            header = jwt.get_unverified_header(id_token)
+        except jwt.InvalidTokenError as e:
+            raise OAuthException(f"Invalid ID token: {e}") from e
+        algorithm = header.get("alg")
+        if algorithm not in self.id_token_algorithms:
+            raise OAuthException(f"ID token algorithm {algorithm!r} is not allowed")
+
+        if algorithm.startswith("HS"):
+            # Symmetric ID tokens are signed with the client secret (OIDC Core 10.1)
+            key: Any = self.client_secret
+        else:
+            key = await self.jwks.get_key(header.get("kid"))
+        try:
+            claims = jwt.decode(
+                id_token,
+                key,
+                algorithms=[algorithm],
+                audience=self.client_id,
+                issuer=[self.metadata["issuer"], *self.issuer_aliases],
+                leeway=self.leeway_seconds,
+                options={"require": ["iss", "sub", "aud", "exp", "iat"]},
+            )
+        except jwt.InvalidTokenError as e:
+            raise OAuthException(f"Invalid ID token: {e}") from e
+
+        audience = claims["aud"]
+        if isinstance(audience, list) and len(audience) > 1 and claims.get("azp") != self.client_id:
+            raise OAuthException("Invalid ID token: authorized party mismatch")
+        if nonce is not None and not hmac.compare_digest(
+            str(claims.get("nonce", "")).encode(), nonce.encode()
+        ):
+            raise OAuthException("Invalid ID token: nonce mismatch")
+        return claims
+
+    async def _load_metadata(self) -> None:
+        metadata = await self._request("GET", self.discovery_url)
+        if not isinstance(metadata, dict):
+            raise OAuthException(f"{self.name} returned an invalid discovery document")
+        issuer = metadata.get("issuer")
+        if not isinstance(issuer, str) or issuer.rstrip("/") != self.issuer:
+            raise OAuthException(
+                f"{self.name} discovery issuer {issuer!r} does not match {self.issuer!r}",
+                status_code=502,
+            )
+        try:
+            authorize_url = metadata["authorization_endpoint"]
+            token_url = metadata["token_endpoint"]
+            jwks_uri = metadata["jwks_uri"]
+        except KeyError as e:
+            raise OAuthException(
+                f"{self.name} discovery document has no {e.args[0]}", status_code=502
+            ) from e
+
+        self.authorize_url = authorize_url
+        self.token_url = token_url
+        self.userinfo_url = metadata.get("userinfo_endpoint", "")
+        advertised = metadata.get("id_token_signing_alg_values_supported") or ["RS256"]
+        self.id_token_algorithms = tuple(
+            alg for alg in advertised if alg in SUPPORTED_ALGORITHMS
+        )
+        if self.jwks is None or self.jwks.jwks_uri != jwks_uri:
+            self.jwks = JWKSCache(
+                jwks_uri,
+                http_client=self._http_client,
+                ttl_seconds=self.jwks_ttl_seconds,
+                min_refetch_interval_seconds=self.min_refetch_interval_seconds,
+            )
+        self.metadata = metadata
+        self._discovered_at = time.monotonic()
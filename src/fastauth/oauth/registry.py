@@ -1,15 +1,52 @@
 # oauth/registry.py
-from typing import Dict, Type
+from typing import Any, Dict, Hashable, Type
 
 from .base import OAuthProvider
+from .github import GitHubOAuthProvider
+from .google import GoogleOAuthProvider
+from .oidc import OIDCProvider
 
 _PROVIDERS: Dict[str, Type[OAuthProvider]] = {}
+# Providers hold their configuration plus discovery and signing-key caches,
+# and share the pooled HTTP client, so one instance per configuration is
+# reused
+_INSTANCES: Dict[Hashable, OAuthProvider] = {}
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    return value
 
 
 def register_provider(provider: Type[OAuthProvider]) -> None:
     _PROVIDERS[provider.name] = provider
+    for key in [key for key in _INSTANCES if key[0] == provider.name]:
+        del _INSTANCES[key]
 
 
 def get_provider(name: str, **kwargs) -> OAuthProvider:
-    provider_cls = _PROVIDERS[name]
-    return provider_cls(**kwargs)
+    """Return a provider instance, reusing the one built with the same arguments.
+
+    Raises:
+        KeyError: If no provider is registered under `name`
+    """
+    key = (name, _freeze(kwargs))
+    provider = _INSTANCES.get(key)
+    if provider is None:
+        provider = _INSTANCES[key] = _PROVIDERS[name](**kwargs)
+    return provider
+
+
+def clear_provider_cache() -> None:
+    """Forget cached provider instances (e.g. after rotating credentials)."""
+    _INSTANCES.clear()
+
+
+register_provider(GoogleOAuthProvider)
+register_provider(GitHubOAuthProvider)
+register_provider(OIDCProvider)
@@ -0,0 +1,12 @@
+from .base import OAuthFlow, OAuthStateStore
+from .memory import MemoryOAuthStateStore
+from .redis import RedisOAuthStateStore
+from .signed import SignedOAuthStateStore
+
+__all__ = [
+    "MemoryOAuthStateStore",
+    "OAuthFlow",
+    "OAuthStateStore",
+    "RedisOAuthStateStore",
+    "SignedOAuthStateStore",
+]
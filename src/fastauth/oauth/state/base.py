@@ -0,0 +1,92 @@
+"""
+OAuth flow state protocol definitions.
+
+Every OAuth redirect opens a flow identified by its `state` parameter; the
+callback consumes it exactly once. Besides protecting the callback against
+forged and replayed requests, a flow carries the OpenID Connect nonce and
+the PKCE code verifier; the verifier stays on the server, and only its
+challenge appears in the redirect.
+"""
+
+import base64
+import hashlib
+import os
+from typing import NamedTuple, Protocol
+
+
+class OAuthFlow(NamedTuple):
+    """A pending OAuth login."""
+
+    state: str
+    provider: str
+    code_verifier: str
+    nonce: str
+
+    @property
+    def code_challenge(self) -> str:
+        """S256 PKCE challenge for the code verifier (RFC 7636)."""
+        return code_challenge(self.code_verifier)
+
+
+class OAuthStateStore(Protocol):
+    """Protocol for OAuth state implementations.
+
+    Methods:
+        create: Open a flow for a provider
+            Args:
+                provider: Name of the provider the user is sent to
+            Returns:
+                The new flow
+        consume: Close a flow, at most once
+            Args:
+                state: `state` parameter from the callback
+                provider: Name of the provider the callback is for
+            Returns:
+                The flow, or None if the state is unknown, expired, already
+                consumed or was opened for another provider
+    """
+
+    async def create(self, provider: str) -> OAuthFlow:
+        """Open a flow for a provider.
+
+        Args:
+            provider: Name of the provider the user is sent to
+
+        Returns:
+            The new flow
+        """
+        ...
+
+    async def consume(self, state: str, provider: str) -> OAuthFlow | None:
+        """Close a flow, at most once.
+
+        Args:
+            state: `state` parameter from the callback
+            provider: Name of the provider the callback is for
+
+        Returns:
+            The flow, or None if it is unknown, expired, consumed or was
+            opened for another provider
+        """
+        ...
+
+
+def new_flow(provider: str) -> OAuthFlow:
+    """Create a flow with random state, code verifier and nonce."""
+    # One read from the OS CSPRNG for all three values
+    raw = os.urandom(88)
+    return OAuthFlow(
+        state=b64url(raw[:24]),
+        provider=provider,
+        # 64 characters, within PKCE's 43-128
+        code_verifier=b64url(raw[24:72]),
+        nonce=b64url(raw[72:]),
+    )
+
+
+def code_challenge(code_verifier: str) -> str:
+    return b64url(hashlib.sha256(code_verifier.encode("ascii")).digest())
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
@@ -0,0 +1,116 @@
+"""
+In-memory OAuth state implementation.
+
+Flows live in a dict keyed by state, so creating and consuming one is a
+single dict operation; consuming pops the entry with no await in between,
+which makes it atomic within the event loop. Expiry is tracked by a timing
+wheel: one slot of states per tick, swept as time advances, so expired
+flows are dropped in O(1) amortized time without scanning the table.
+Note: State is per process. Best for single-instance deployments.
+"""
+
+import math
+import time
+
+from ...exceptions import ServiceUnavailableException
+from .base import OAuthFlow, new_flow
+
+
+class MemoryOAuthStateStore:
+    """In-memory single-use OAuth state store."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 600.0,
+        tick_seconds: float = 1.0,
+        max_states: int = 100000,
+    ):
+        """Initialize the state store.
+
+        Args:
+            ttl_seconds: How long a flow may take to come back to the callback
+            tick_seconds: Expiry resolution of the timing wheel
+            max_states: Upper bound on pending flows; new flows are refused
+                while the table is full
+        """
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.tick_ms = max(1, int(tick_seconds * 1000))
+        self.max_states = max_states
+        # state -> (deadline_ms, flow)
+        self.states: dict[str, tuple[int, OAuthFlow]] = {}
+        # A flow lands in the slot of the first tick after its deadline;
+        # the wheel spans the TTL plus the current and landing ticks, so a
+        # slot is only reused after all of its flows have expired
+        self._slots: list[list[str]] = [
+            [] for _ in range(math.ceil(self.ttl_ms / self.tick_ms) + 2)
+        ]
+        self._tick = self._now() // self.tick_ms
+
+    def _now(self) -> int:
+        return int(time.monotonic() * 1000)
+
+    async def create(self, provider: str) -> OAuthFlow:
+        """Open a flow for a provider.
+
+        Args:
+            provider: Name of the provider the user is sent to
+
+        Returns:
+            The new flow
+
+        Raises:
+            ServiceUnavailableException: If `max_states` flows are pending
+        """
+        now = self._now()
+        self._advance(now)
+        if len(self.states) >= self.max_states:
+            raise ServiceUnavailableException("Too many pending OAuth logins")
+        flow = new_flow(provider)
+        deadline = now + self.ttl_ms
+        self.states[flow.state] = (deadline, flow)
+        self._slots[(deadline // self.tick_ms + 1) % len(self._slots)].append(flow.state)
+        return flow
+
+    async def consume(self, state: str, provider: str) -> OAuthFlow | None:
+        """Close a flow, at most once.
+
+        Args:
+            state: `state` parameter from the callback
+            provider: Name of the provider the callback is for
+
+        Returns:
+            The flow, or None if it is unknown, expired, consumed or was
+            opened for another provider
+        """
+        now = self._now()
+        self._advance(now)
+        entry = self.states.pop(state, None)
+        if entry is None:
+            return None
+        deadline, flow = entry
+        if deadline <= now or flow.provider != provider:
+            return None
+        return flow
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def _advance(self, now: int) -> None:
+        tick = now // self.tick_ms
+        if tick == self._tick:
+            return
+        slots = self._slots
+        if tick - self._tick >= len(slots):
+            # Idle for a whole revolution: everything pending has expired
+            self.states.clear()
+            for slot in slots:
+                slot.clear()
+        else:
+            states = self.states
+            for elapsed in range(self._tick + 1, tick + 1):
+                slot = slots[elapsed % len(slots)]
+                for state in slot:
+                    # Consumed flows are already gone
+                    states.pop(state, None)
+                slot.clear()
+        self._tick = tick
@@ -0,0 +1,74 @@
+"""
+Redis OAuth state implementation.
+
+A flow is one key written with `SET ... EX` and consumed with `GETDEL`,
+which reads and deletes it in a single atomic command, so a state is
+accepted at most once across all processes and hosts; Redis expires
+abandoned flows. Requires Redis 6.2+ and a client that implements the
+Redis protocol.
+"""
+
+from typing import TYPE_CHECKING
+
+from .base import OAuthFlow, new_flow
+
+if TYPE_CHECKING:
+    from ...core.types import Redis
+
+
+class RedisOAuthStateStore:
+    """Redis-backed single-use OAuth state store."""
+
+    def __init__(
+        self, redis: "Redis", key_prefix: str = "oauth_state:", ttl_seconds: int = 600
+    ):
+        """Initialize the Redis state store.
+
+        Args:
+            redis: Redis client instance
+            key_prefix: Prefix for state keys (default: "oauth_state:")
+            ttl_seconds: How long a flow may take to come back to the callback
+        """
+        self.redis = redis
+        self.key_prefix = key_prefix
+        self.ttl_seconds = ttl_seconds
+
+    def _make_key(self, state: str) -> str:
+        """Generate a Redis key for a state."""
+        return f"{self.key_prefix}{state}"
+
+    async def create(self, provider: str) -> OAuthFlow:
+        """Open a flow for a provider.
+
+        Args:
+            provider: Name of the provider the user is sent to
+
+        Returns:
+            The new flow
+        """
+        flow = new_flow(provider)
+        # Verifier and nonce are URL-safe base64, so a space never occurs in them
+        value = f"{flow.provider} {flow.code_verifier} {flow.nonce}"
+        await self.redis.set(self._make_key(flow.state), value, ex=self.ttl_seconds)
+        return flow
+
+    async def consume(self, state: str, provider: str) -> OAuthFlow | None:
+        """Close a flow, at most once.
+
+        Args:
+            state: `state` parameter from the callback
+            provider: Name of the provider the callback is for
+
+        Returns:
+            The flow, or None if it is unknown, expired, consumed or was
+            opened for another provider
+        """
+        value = await self.redis.getdel(self._make_key(state))
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            value = value.decode()
+        stored_provider, code_verifier, nonce = value.rsplit(" ", 2)
+        if stored_provider != provider:
+            return None
+        return OAuthFlow(state, stored_provider, code_verifier, nonce)
@@ -0,0 +1,5 @@
+from .base import RateLimiter
+from .memory import MemoryRateLimiter
+from .redis import RedisRateLimiter
+
+__all__ = ["MemoryRateLimiter", "RateLimiter", "RedisRateLimiter"]
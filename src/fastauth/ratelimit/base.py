@@ -0,0 +1,58 @@
+"""
+Rate limiter protocol definitions.
+
+Defines the interface for rate limiting backends (memory, Redis, etc.)
+"""
+
+from typing import Protocol
+
+
+class RateLimiter(Protocol):
+    """Protocol for rate limiter implementations.
+
+    A limit allows `limit` hits per `period_seconds` for each key, with
+    bursts of up to `limit` hits. Keys are opaque strings such as
+    ``"login:ip:203.0.113.7"``.
+
+    Methods:
+        hit: Consume one unit of a key's allowance
+            Args:
+                key: The rate limit key
+                limit: Hits allowed per period
+                period_seconds: Length of the period
+            Returns:
+                0.0 if the hit is allowed, otherwise the number of seconds
+                until the next hit would be allowed
+        reset: Clear a key's state
+            Args:
+                key: The rate limit key
+
+    Optional methods (detected with ``hasattr``):
+        refund: Give back one allowed `hit` whose request was rejected by
+            another limit, so it doesn't count against this one
+            Args:
+                key: The rate limit key
+                limit: Hits allowed per period
+                period_seconds: Length of the period
+    """
+
+    async def hit(self, key: str, limit: int, period_seconds: float) -> float:
+        """Consume one unit of a key's allowance.
+
+        Args:
+            key: The rate limit key
+            limit: Hits allowed per period
+            period_seconds: Length of the period
+
+        Returns:
+            0.0 if allowed, otherwise seconds until the next allowed hit
+        """
+        ...
+
+    async def reset(self, key: str) -> None:
+        """Clear a key's state.
+
+        Args:
+            key: The rate limit key
+        """
+        ...
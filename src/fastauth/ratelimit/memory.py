@@ -0,0 +1,86 @@
+"""
+In-memory rate limiter implementation.
+
+Uses the Generic Cell Rate Algorithm (GCRA): each key stores a single
+float, its *theoretical arrival time*, instead of a log of hits, so a
+check is O(1) in time and memory regardless of the limit.
+Note: State is per process. Best for single-instance deployments.
+"""
+
+import time
+
+
+class MemoryRateLimiter:
+    """In-memory GCRA rate limiter with a bounded key table."""
+
+    def __init__(self, max_keys: int = 100000):
+        """Initialize the rate limiter.
+
+        Args:
+            max_keys: Upper bound on tracked keys; idle keys are evicted first
+        """
+        self.max_keys = max_keys
+        # key -> theoretical arrival time (monotonic seconds); dict order
+        # doubles as recency order because keys are re-inserted on update
+        self.store: dict[str, float] = {}
+
+    async def hit(self, key: str, limit: int, period_seconds: float) -> float:
+        """Consume one unit of a key's allowance.
+
+        Args:
+            key: The rate limit key
+            limit: Hits allowed per period
+            period_seconds: Length of the period
+
+        Returns:
+            0.0 if allowed, otherwise seconds until the next allowed hit
+        """
+        now = time.monotonic()
+        interval = period_seconds / limit
+
+        tat = max(self.store.pop(key, now), now)
+        new_tat = tat + interval
+        allow_at = new_tat - period_seconds
+        if now < allow_at:
+            self.store[key] = tat
+            return allow_at - now
+
+        self.store[key] = new_tat
+        if len(self.store) > self.max_keys:
+            self._evict(now)
+        return 0.0
+
+    async def refund(self, key: str, limit: int, period_seconds: float) -> None:
+        """Give back one allowed hit.
+
+        Args:
+            key: The rate limit key
+            limit: Hits allowed per period
+            period_seconds: Length of the period
+        """
+        tat = self.store.get(key)
+        if tat is None:
+            return
+        tat -= period_seconds / limit
+        if tat <= time.monotonic():
+            del self.store[key]
+        else:
+            self.store[key] = tat
+
+    async def reset(self, key: str) -> None:
+        """Clear a key's state.
+
+        Args:
+            key: The rate limit key
+        """
+        self.store.pop(key, None)
+
+    def _evict(self, now: float) -> None:
+        # Keys whose arrival time has passed hold a full allowance again
+        # and carry no information; drop those, then the least recent.
+        # Trimming below the bound amortizes the scan over many inserts.
+        for key in [key for key, tat in self.store.items() if tat <= now]:
+            del self.store[key]
+        target = self.max_keys * 9 // 10
+        while len(self.store) > target:
+            del self.store[next(iter(self.store))]
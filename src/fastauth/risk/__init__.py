@@ -0,0 +1,29 @@
+from typing import Any
+
+from .base import RiskEvaluator
+from .memory import CountMinRiskEvaluator
+from .hyperloglog import HyperLogLog
+from .sketch import DecayingCountMinSketch
+from .stuffing import CredentialStuffingDetector
+
+__all__ = [
+    "CountMinRiskEvaluator",
+    "CredentialStuffingDetector",
+    "DecayingCountMinSketch",
+    "GeoIPDatabase",
+    "GeoIPRecord",
+    "HyperLogLog",
+    "RiskEvaluator",
+    "build_geoip_file",
+]
+
+_GEOIP_NAMES = ("GeoIPDatabase", "GeoIPRecord", "build_geoip_file")
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on demand so `python -m fastauth.risk.geoip` runs cleanly
+    if name in _GEOIP_NAMES:
+        from . import geoip
+
+        return getattr(geoip, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
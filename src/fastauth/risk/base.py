@@ -0,0 +1,52 @@
+"""
+Risk evaluation protocol definitions.
+
+Defines the interface for components that score login attempts based on
+recent activity (suspicious-login detection).
+"""
+
+from typing import Protocol
+
+
+class RiskEvaluator(Protocol):
+    """Protocol for login risk evaluators.
+
+    Methods are synchronous: they are consulted inline on the login path
+    and must be cheap (constant time, no I/O).
+
+    Methods:
+        record: Record the outcome of a login attempt
+            Args:
+                ip: Client IP address
+                identifier: Normalized login identifier, if known
+                success: Whether the attempt succeeded
+        score: Score a prospective login attempt
+            Args:
+                ip: Client IP address
+                identifier: Normalized login identifier, if known
+            Returns:
+                Risk in [0, 1]; 1 means recent failures reached the
+                configured thresholds
+    """
+
+    def record(self, ip: str | None, identifier: str | None, success: bool) -> None:
+        """Record the outcome of a login attempt.
+
+        Args:
+            ip: Client IP address
+            identifier: Normalized login identifier, if known
+            success: Whether the attempt succeeded
+        """
+        ...
+
+    def score(self, ip: str | None, identifier: str | None) -> float:
+        """Score a prospective login attempt.
+
+        Args:
+            ip: Client IP address
+            identifier: Normalized login identifier, if known
+
+        Returns:
+            Risk in [0, 1]
+        """
+        ...
@@ -0,0 +1,383 @@
+"""
+Offline GeoIP / ASN lookup.
+
+Maps client IPs to a country code and autonomous system number for login
+risk signals (impossible travel, hosting-provider ASNs) without calling an
+external service. Range CSVs such as DB-IP's free "IP to Country Lite" and
+"IP to ASN Lite" downloads, or GeoLite2-ASN's network CSV, are converted
+once into a compact binary table:
+
+    python -m fastauth.risk.geoip geoip.bin \\
+        --country dbip-country-lite.csv --asn dbip-asn-lite.csv
+
+The table stores, per address family, the sorted start address of every
+contiguous range, a parallel column packing country and ASN (gaps are
+explicit "unknown" ranges, so no end column is needed), and a bucket index
+over the leading 16 address bits that narrows each search to a few
+ranges. Lookups `bisect` directly over `memoryview`s of an `mmap` of the file: nothing is
+parsed or copied at startup, and the OS page cache shares the pages
+between worker processes.
+"""
+
+import argparse
+import bisect
+import csv
+import ipaddress
+import mmap
+import os
+import socket
+import struct
+import sys
+from array import array
+from typing import IO, Iterable, NamedTuple
+
+MAGIC = b"FAGI"
+VERSION = 1
+# magic, version, reserved, IPv4 range count, IPv6 range count
+_HEADER = struct.Struct("<4sBxxxQQ")
+_IPV6_HALF = (1 << 64) - 1
+# Bucket index: first range whose start has each 16-bit prefix, plus an end
+_INDEX_BITS = 16
+_INDEX_SIZE = (1 << _INDEX_BITS) + 1
+_IPV4_SHIFT = 32 - _INDEX_BITS
+_IPV6_SHIFT = 64 - _INDEX_BITS
+_AF_INET = int(socket.AF_INET)
+_AF_INET6 = int(socket.AF_INET6)
+_inet_pton = socket.inet_pton
+_bisect_left = bisect.bisect_left
+_bisect_right = bisect.bisect_right
+
+
+class GeoIPRecord(NamedTuple):
+    country: str | None
+    asn: int | None
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+def _encode_country(country: str | None) -> int:
+    if not country or len(country) != 2 or country in ("ZZ", "--"):
+        return 0
+    country = country.upper()
+    return ord(country[0]) << 8 | ord(country[1])
+
+
+class GeoIPDatabase:
+    """Read-only IP range table mapping addresses to country and ASN.
+
+    The file is mapped lazily on first lookup, so constructing the database
+    before a pre-fork server forks is cheap and every worker maps the same
+    pages. A lookup is a `socket.inet_pton`, two index reads and a C-level
+    bisection over a handful of ranges; decoded records are cached.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]):
+        """Initialize the database.
+
+        Args:
+            path: Binary file produced by `build_geoip_file`
+        """
+        self.path = os.fspath(path)
+        self._mm: mmap.mmap | None = None
+        self.ipv4_ranges = 0
+        self.ipv6_ranges = 0
+        # packed (country << 32 | asn) -> record, shared by all ranges
+        self._records: dict[int, GeoIPRecord] = {}
+
+    def _open(self) -> None:
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n4, n6 = _HEADER.unpack_from(mm)
+        expected = _HEADER.size + _table_size(n4, 4) + _table_size(n6, 16)
+        if magic != MAGIC or version != VERSION or sys.byteorder != "little":
+            mm.close()
+            raise ValueError(f"{self.path} is not a GeoIP table")
+        if len(mm) != expected:
+            mm.close()
+            raise ValueError(f"{self.path} is truncated")
+
+        if hasattr(mm, "madvise") and hasattr(mmap, "MADV_RANDOM"):
+            mm.madvise(mmap.MADV_RANDOM)
+
+        view = self._view = memoryview(mm)
+        offset = _HEADER.size
+
+        def column(fmt: str, count: int) -> memoryview:
+            nonlocal offset
+            size = count * struct.calcsize(fmt)
+            col = view[offset : offset + size].cast(fmt)
+            offset += size + _pad(size)
+            return col
+
+        self._v4_index = column("I", _INDEX_SIZE)
+        self._v4_starts = column("I", n4)
+        self._v4_values = column("Q", n4)
+        self._v6_index = column("I", _INDEX_SIZE)
+        self._v6_highs = column("Q", n6)
+        self._v6_lows = column("Q", n6)
+        self._v6_values = column("Q", n6)
+        self.ipv4_ranges = n4
+        self.ipv6_ranges = n6
+        self._mm = mm
+
+    def _record(self, values: memoryview, index: int) -> GeoIPRecord | None:
+        if index < 0:
+            return None
+        value = values[index]
+        record = self._records.get(value)
+        if record is None:
+            if not value:
+                return None
+            code, asn = value >> 32, value & 0xFFFFFFFF
+            country = chr(code >> 8) + chr(code & 0xFF) if code else None
+            if len(self._records) >= 65536:
+                self._records.clear()
+            record = self._records[value] = GeoIPRecord(country, asn or None)
+        return record
+
+    def _lookup_ipv4(self, value: int) -> GeoIPRecord | None:
+        bucket_index = self._v4_index
+        bucket = value >> _IPV4_SHIFT
+        # A result below the bucket is the range spilling over from before it
+        index = _bisect_right(
+            self._v4_starts, value, bucket_index[bucket], bucket_index[bucket + 1]
+        ) - 1
+        return self._record(self._v4_values, index)
+
+    def lookup(self, ip: str | None) -> GeoIPRecord | None:
+        """Return country and ASN for an IP, or None if unknown or invalid."""
+        if not ip:
+            return None
+        if self._mm is None:
+            self._open()
+
+        is_ipv6 = ":" in ip
+        try:
+            value = int.from_bytes(_inet_pton(_AF_INET6 if is_ipv6 else _AF_INET, ip))
+        except (OSError, ValueError):
+            return None
+
+        if not is_ipv6:
+            return self._lookup_ipv4(value)
+        if value >> 32 == 0xFFFF:
+            # IPv4-mapped IPv6 address (::ffff:a.b.c.d)
+            return self._lookup_ipv4(value & 0xFFFFFFFF)
+
+        # Ranges are keyed by (high, low) 64-bit halves of the start address
+        high, low = value >> 64, value & _IPV6_HALF
+        bucket = high >> _IPV6_SHIFT
+        lo, hi = self._v6_index[bucket], self._v6_index[bucket + 1]
+        highs = self._v6_highs
+        first = _bisect_left(highs, high, lo, hi)
+        last = _bisect_right(highs, high, first, hi)
+        index = _bisect_right(self._v6_lows, low, first, last) - 1
+        if index < first:
+            index = first - 1
+        return self._record(self._v6_values, index)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            for name in (
+                "_v4_index",
+                "_v4_starts",
+                "_v4_values",
+                "_v6_index",
+                "_v6_highs",
+                "_v6_lows",
+                "_v6_values",
+                "_view",
+            ):
+                getattr(self, name).release()
+            self._mm.close()
+            self._mm = None
+
+
+def _table_size(count: int, address_size: int) -> int:
+    # bucket index, start address column(s), packed country and ASN (u64),
+    # each 8-aligned
+    sizes = (_INDEX_SIZE * 4, count * address_size, count * 8)
+    return sum(size + _pad(size) for size in sizes)
+
+
+def _parse_ranges(
+    lines: Iterable[str], kind: str
+) -> Iterable[tuple[int, int, int, bool]]:
+    """Yield ``(start, end, value, is_ipv6)`` from a range or network CSV."""
+    for row in csv.reader(lines):
+        if not row or row[0].startswith("#"):
+            continue
+        try:
+            if "/" in row[0]:
+                network = ipaddress.ip_network(row[0].strip(), strict=False)
+                first, last = network.network_address, network.broadcast_address
+                fields = row[1:]
+            else:
+                first = ipaddress.ip_address(row[0].strip())
+                last = ipaddress.ip_address(row[1].strip())
+                fields = row[2:]
+        except (IndexError, ValueError):
+            continue  # header or malformed line
+        if first.version != last.version or not fields:
+            continue
+
+        raw = fields[0].strip()
+        if kind == "country":
+            value = _encode_country(raw)
+        else:
+            raw = raw.upper().removeprefix("AS")
+            value = int(raw) if raw.isdigit() else 0
+        if value:
+            yield int(first), int(last), value, first.version == 6
+
+
+def _clip(ranges: list[tuple[int, int, int]]) -> list[tuple[int, int, int]]:
+    """Sort ranges and cut overlaps so each range ends before the next starts."""
+    ranges = sorted(ranges)
+    clipped = []
+    for i, (start, end, value) in enumerate(ranges):
+        if i + 1 < len(ranges):
+            end = min(end, ranges[i + 1][0] - 1)
+        if start <= end:
+            clipped.append((start, end, value))
+    return clipped
+
+
+def _overlay(
+    countries: list[tuple[int, int, int]], asns: list[tuple[int, int, int]], bits: int
+) -> list[tuple[int, int, int]]:
+    """Combine two range lists into contiguous ``(start, country, asn)`` ranges."""
+    last = (1 << bits) - 1
+    boundaries = {0}
+    for start, end, _ in countries + asns:
+        boundaries.add(start)
+        # A range ending at the family's last address has nothing after it
+        if end < last:
+            boundaries.add(end + 1)
+
+    def values_at(ranges: list[tuple[int, int, int]]):
+        ranges = iter(ranges)
+        current = next(ranges, None)
+
+        def at(point: int) -> int:
+            nonlocal current
+            while current is not None and current[1] < point:
+                current = next(ranges, None)
+            if current is not None and current[0] <= point:
+                return current[2]
+            return 0
+
+        return at
+
+    country_at = values_at(countries)
+    asn_at = values_at(asns)
+    table: list[tuple[int, int, int]] = []
+    for point in sorted(boundaries):
+        entry = (point, country_at(point), asn_at(point))
+        if table and table[-1][1:] == entry[1:]:
+            continue
+        table.append(entry)
+    return table
+
+
+def _bucket_index(starts: list[int], bits: int) -> list[int]:
+    """Return, for every 16-bit prefix (and one past the last), the first
+    range whose start has that prefix or a greater one."""
+    shift = bits - _INDEX_BITS
+    prefixes = [start >> shift for start in starts]
+    return [bisect.bisect_left(prefixes, bucket) for bucket in range(_INDEX_SIZE)]
+
+
+def build_geoip_file(
+    output: str | os.PathLike[str],
+    country_source: Iterable[str] | None = None,
+    asn_source: Iterable[str] | None = None,
+) -> tuple[int, int]:
+    """Build a GeoIP table from range CSVs.
+
+    Each source has rows of ``start_ip,end_ip,value[,...]`` (DB-IP style)
+    or ``network,value[,...]`` (GeoLite2-ASN style); header lines are
+    skipped. ASN values may be given as ``15169`` or ``AS15169``. Where
+    ranges of one source overlap, the one starting later wins from its
+    start on.
+    The file is written to a temporary path and renamed into place.
+
+    Args:
+        output: Destination path
+        country_source: CSV lines mapping ranges to ISO country codes
+        asn_source: CSV lines mapping ranges to AS numbers
+
+    Returns:
+        Tuple of (IPv4 ranges, IPv6 ranges) written
+    """
+    by_family: dict[bool, dict[str, list[tuple[int, int, int]]]] = {
+        False: {"country": [], "asn": []},
+        True: {"country": [], "asn": []},
+    }
+    for kind, source in (("country", country_source), ("asn", asn_source)):
+        if source is None:
+            continue
+        for start, end, value, is_ipv6 in _parse_ranges(source, kind):
+            by_family[is_ipv6][kind].append((start, end, value))
+
+    tables = {
+        is_ipv6: _overlay(
+            _clip(sources["country"]), _clip(sources["asn"]), 128 if is_ipv6 else 32
+        )
+        for is_ipv6, sources in by_family.items()
+    }
+
+    v4, v6 = tables[False], tables[True]
+    output = os.fspath(output)
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+
+    def write_column(f: IO[bytes], typecode: str, values: Iterable[int]) -> None:
+        data = array(typecode, values).tobytes()
+        f.write(data + b"\x00" * _pad(len(data)))
+
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(v4), len(v6)))
+            write_column(f, "I", _bucket_index([start for start, _, _ in v4], 32))
+            write_column(f, "I", (start for start, _, _ in v4))
+            write_column(f, "Q", (country << 32 | asn for _, country, asn in v4))
+            write_column(f, "I", _bucket_index([start for start, _, _ in v6], 128))
+            write_column(f, "Q", (start >> 64 for start, _, _ in v6))
+            write_column(f, "Q", (start & _IPV6_HALF for start, _, _ in v6))
+            write_column(f, "Q", (country << 32 | asn for _, country, asn in v6))
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return len(v4), len(v6)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m fastauth.risk.geoip",
+        description="Build a GeoIP/ASN table from IP range CSVs.",
+    )
+    parser.add_argument("output", help="Binary file to write")
+    parser.add_argument("--country", help="CSV of start_ip,end_ip,country_code")
+    parser.add_argument("--asn", help="CSV of start_ip,end_ip,asn or network,asn")
+    args = parser.parse_args(argv)
+    if not args.country and not args.asn:
+        parser.error("at least one of --country and --asn is required")
+
+    sources = [open(path, newline="") if path else None for path in (args.country, args.asn)]
+    try:
+        ipv4, ipv6 = build_geoip_file(args.output, *sources)
+    finally:
+        for source in sources:
+            if source is not None:
+                source.close()
+
+    sys.stderr.write(f"{ipv4} IPv4 and {ipv6} IPv6 ranges written to {args.output}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+In-process risk evaluator implementation.
+
+Tracks failed and successful logins per client IP and per account in
+time-decayed count-min sketches, so memory stays fixed (a few MB) no
+matter how many distinct IPs or accounts are seen.
+Note: State is per process.
+"""
+
+from .sketch import DecayingCountMinSketch
+
+
+class CountMinRiskEvaluator:
+    """Scores logins from recent failure counts held in count-min sketches.
+
+    The score is the larger of:
+    - IP failures / (`ip_failure_threshold` + IP successes), so busy
+      shared addresses (NAT, proxies) with many good logins are damped
+    - account failures / `identifier_failure_threshold`
+    capped at 1.0. Recording is O(depth) with both keys updated in one
+    `add_many` call; scoring is O(depth * windows).
+    """
+
+    def __init__(
+        self,
+        ip_failure_threshold: float = 50.0,
+        identifier_failure_threshold: float = 10.0,
+        width: int = 16384,
+        depth: int = 4,
+        window_seconds: float = 10.0,
+        windows: int = 6,
+        decay: float = 0.5,
+    ):
+        """Initialize the evaluator.
+
+        Args:
+            ip_failure_threshold: Weighted failures per IP that score 1.0
+            identifier_failure_threshold: Weighted failures per account
+                that score 1.0
+            width: Counters per sketch row
+            depth: Rows per sketch
+            window_seconds: Length of one time window
+            windows: Windows kept per sketch
+            decay: Weight multiplier per window of age
+        """
+        self.ip_failure_threshold = ip_failure_threshold
+        self.identifier_failure_threshold = identifier_failure_threshold
+        sketch_args = (width, depth, window_seconds, windows, decay)
+        # Keys are namespaced ("ip:", "id:") so one sketch serves both
+        self.failures = DecayingCountMinSketch(*sketch_args)
+        self.successes = DecayingCountMinSketch(*sketch_args)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.failures.memory_bytes + self.successes.memory_bytes
+
+    def record(self, ip: str | None, identifier: str | None, success: bool) -> None:
+        """Record the outcome of a login attempt.
+
+        Args:
+            ip: Client IP address
+            identifier: Normalized login identifier, if known
+            success: Whether the attempt succeeded
+        """
+        sketch = self.successes if success else self.failures
+        if ip and identifier:
+            sketch.add_many((f"ip:{ip}", f"id:{identifier}"))
+        elif ip:
+            sketch.add(f"ip:{ip}")
+        elif identifier:
+            sketch.add(f"id:{identifier}")
+
+    def counts(self, ip: str | None, identifier: str | None) -> dict[str, float]:
+        """Return the decay-weighted counts behind `score`."""
+        return {
+            "ip_failures": self.failures.estimate(f"ip:{ip}") if ip else 0.0,
+            "ip_successes": self.successes.estimate(f"ip:{ip}") if ip else 0.0,
+            "identifier_failures": (
+                self.failures.estimate(f"id:{identifier}") if identifier else 0.0
+            ),
+        }
+
+    def score(self, ip: str | None, identifier: str | None) -> float:
+        """Score a prospective login attempt.
+
+        Args:
+            ip: Client IP address
+            identifier: Normalized login identifier, if known
+
+        Returns:
+            Risk in [0, 1]
+        """
+        counts = self.counts(ip, identifier)
+        ip_score = counts["ip_failures"] / (
+            self.ip_failure_threshold + counts["ip_successes"]
+        )
+        identifier_score = (
+            counts["identifier_failures"] / self.identifier_failure_threshold
+        )
+        return min(1.0, max(ip_score, identifier_score))
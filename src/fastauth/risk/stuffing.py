@@ -0,0 +1,260 @@
+"""
+Credential-stuffing detection.
+
+Credential stuffing shows up as one source trying *many different*
+accounts, usually with few attempts each, which per-account counters
+miss. `CredentialStuffingDetector` keeps a HyperLogLog of the distinct
+login identifiers seen from every client IP and from its network prefix
+(/24 for IPv4, /64 for IPv6, since botnets and cloud ranges rotate
+addresses within one), over a sliding horizon of `windows` windows.
+A source whose distinct count reaches its threshold is flagged and an
+audit event is emitted.
+
+The sketches use Redis's HyperLogLog layout, so workers can pool what
+they see through PFMERGE (`sync`); windows are aligned on wall-clock
+time, so every worker agrees on the Redis key of a window.
+Note: Without `sync`, state is per process.
+"""
+
+import ipaddress
+import math
+import secrets
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from ..audit import audit_event
+from .hyperloglog import HyperLogLog, hll_pattern
+
+if TYPE_CHECKING:
+    from ..core.types import Redis
+
+
+@lru_cache(maxsize=65536)
+def _network(ip: str, ipv4_prefix: int, ipv6_prefix: int) -> str | None:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    prefix = ipv4_prefix if address.version == 4 else ipv6_prefix
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class _Source:
+    __slots__ = ("windows", "merged", "distinct", "flagged", "dirty")
+
+    def __init__(self):
+        # window number -> distinct identifiers seen in that window
+        self.windows: dict[int, HyperLogLog] = {}
+        # union of `windows`, kept incrementally so counting is O(1)
+        self.merged = HyperLogLog()
+        self.distinct = 0
+        self.flagged = False
+        self.dirty = False
+
+
+class CredentialStuffingDetector:
+    """Flags IPs and network prefixes trying many distinct accounts.
+
+    Observing a login costs one MurmurHash64A run and a few dict updates;
+    sources that only ever use a handful of identifiers cost a few hundred
+    bytes each. The number of tracked sources is capped at `max_sources`,
+    evicting the least recently seen.
+    """
+
+    def __init__(
+        self,
+        ip_threshold: int = 20,
+        subnet_threshold: int = 50,
+        window_seconds: float = 60.0,
+        windows: int = 5,
+        ipv4_prefix: int = 24,
+        ipv6_prefix: int = 64,
+        max_sources: int = 100000,
+    ):
+        """Initialize the detector.
+
+        Args:
+            ip_threshold: Distinct identifiers per IP that flag it
+            subnet_threshold: Distinct identifiers per network prefix that
+                flag it
+            window_seconds: Length of one time window
+            windows: Windows making up the sliding horizon
+            ipv4_prefix: Prefix length grouping IPv4 addresses
+            ipv6_prefix: Prefix length grouping IPv6 addresses
+            max_sources: Maximum IPs and prefixes tracked at once
+        """
+        self.ip_threshold = ip_threshold
+        self.subnet_threshold = subnet_threshold
+        self.window_seconds = window_seconds
+        self.windows = windows
+        self.ipv4_prefix = ipv4_prefix
+        self.ipv6_prefix = ipv6_prefix
+        self.max_sources = max_sources
+        # Insertion order doubles as recency order (touched keys move last)
+        self._sources: dict[str, _Source] = {}
+
+    @property
+    def horizon_seconds(self) -> float:
+        return self.window_seconds * self.windows
+
+    def _window(self) -> int:
+        return int(time.time() // self.window_seconds)
+
+    def source_keys(self, ip: str) -> list[tuple[str, int]]:
+        """Return ``(source key, threshold)`` pairs covering an IP."""
+        keys = [(f"ip:{ip}", self.ip_threshold)]
+        network = _network(ip, self.ipv4_prefix, self.ipv6_prefix)
+        if network:
+            keys.append((f"net:{network}", self.subnet_threshold))
+        return keys
+
+    def _expire(self, source: _Source, window: int) -> None:
+        oldest = window - self.windows + 1
+        if all(w >= oldest for w in source.windows):
+            return
+        # A window slid out: rebuild the union from the ones still live
+        source.windows = {w: h for w, h in source.windows.items() if w >= oldest}
+        source.merged = HyperLogLog()
+        for hll in source.windows.values():
+            source.merged.merge(hll)
+        source.distinct = source.merged.count()
+
+    def _get(self, key: str, window: int, create: bool) -> _Source | None:
+        source = self._sources.pop(key, None)
+        if source is None:
+            if not create:
+                return None
+            source = _Source()
+            if len(self._sources) >= self.max_sources:
+                del self._sources[next(iter(self._sources))]
+        self._sources[key] = source
+        self._expire(source, window)
+        return source
+
+    def observe(self, ip: str | None, identifier: str | None) -> bool:
+        """Record a login attempt.
+
+        Args:
+            ip: Client IP address
+            identifier: Normalized login identifier
+
+        Returns:
+            True if the IP or its network is flagged
+        """
+        if not ip or not identifier:
+            return False
+
+        window = self._window()
+        # Hash once; the same register update applies to every sketch
+        index, value = hll_pattern(identifier)
+        flagged = False
+        for key, threshold in self.source_keys(ip):
+            source = self._get(key, window, create=True)
+            hll = source.windows.get(window)
+            if hll is None:
+                hll = source.windows[window] = HyperLogLog()
+            if hll.update(index, value):
+                source.dirty = True
+                if source.merged.update(index, value):
+                    source.distinct = source.merged.count()
+
+            distinct = source.distinct
+            if distinct >= threshold:
+                flagged = True
+                if not source.flagged:
+                    source.flagged = True
+                    audit_event(
+                        "credential_stuffing_detected",
+                        ip_address=ip,
+                        success=False,
+                        source=key,
+                        distinct_identifiers=distinct,
+                    )
+            else:
+                source.flagged = False
+        return flagged
+
+    def distinct_identifiers(self, key: str) -> int:
+        """Return the distinct identifiers seen from a source key over the horizon."""
+        source = self._get(key, self._window(), create=False)
+        return source.distinct if source else 0
+
+    def is_flagged(self, ip: str | None) -> bool:
+        """Return True if the IP or its network reached its threshold."""
+        if not ip:
+            return False
+        return any(
+            self.distinct_identifiers(key) >= threshold
+            for key, threshold in self.source_keys(ip)
+        )
+
+    def export(self, key: str) -> bytes | None:
+        """Return a source's horizon sketch in Redis's HyperLogLog layout."""
+        source = self._get(key, self._window(), create=False)
+        return source.merged.to_bytes() if source else None
+
+    async def sync(
+        self,
+        redis: "Redis",
+        key_prefix: str = "stuffing:",
+        min_distinct: int = 2,
+    ) -> int:
+        """Pool the latest two windows with other workers through Redis.
+
+        For every source that changed since the last sync, the sketches of
+        the current and the previous window that hold at least
+        `min_distinct` local identifiers are merged into shared Redis
+        HyperLogLogs with PFMERGE, and the merged results are folded back
+        in, so thresholds apply to what all workers saw. The previous
+        window is included so that neither this worker's last updates
+        before a rollover nor what other workers pushed for it afterwards
+        are lost. Run it periodically, more often than `window_seconds`
+        (every few seconds), from a background task.
+
+        Args:
+            redis: Async Redis client
+            key_prefix: Prefix of the shared keys
+            min_distinct: Skip window sketches with fewer local distinct
+                identifiers
+
+        Returns:
+            Number of sources synced
+        """
+        window = self._window()
+        ttl = math.ceil(self.horizon_seconds)
+        synced = 0
+        for key, source in list(self._sources.items()):
+            if not source.dirty:
+                continue
+            source.dirty = False
+            pooled_any = False
+            for w in (window - 1, window):
+                hll = source.windows.get(w)
+                if hll is None or hll.count() < min_distinct:
+                    continue
+                pooled = await self._pool_window(redis, f"{key_prefix}{w}:{key}", hll, ttl)
+                if pooled is not None:
+                    hll.merge(pooled)
+                    source.merged.merge(pooled)
+                pooled_any = True
+            if pooled_any:
+                source.distinct = source.merged.count()
+                synced += 1
+        return synced
+
+    async def _pool_window(
+        self, redis: "Redis", shared_key: str, hll: HyperLogLog, ttl: int
+    ) -> HyperLogLog | None:
+        upload_key = f"{shared_key}:{secrets.token_hex(4)}"
+        await redis.set(upload_key, hll.to_bytes(), ex=ttl)
+        try:
+            await redis.pfmerge(shared_key, upload_key)
+        finally:
+            await redis.delete(upload_key)
+        await redis.expire(shared_key, ttl)
+        merged = await redis.get(shared_key)
+        return HyperLogLog.from_bytes(merged) if merged else None
+
+    def clear(self) -> None:
+        self._sources.clear()
@@ -31,7 +31,9 @@ class SQLSessionStore(SessionStore):
         missing_fields = [field for field in required_fields if not hasattr(session_model, field)]
         if missing_fields:
             raise ValueError(f"Session model is missing required fields: {', '.join(missing_fields)}")
-        
+        # Optional column: persisted only by models that define it
+        self.has_device_class = hasattr(session_model, "device_class")
+
 
     async def create(self, user_id: str, data: dict[str, Any], **kwargs) -> str:
         """Create a new session.
@@ -49,7 +51,9 @@ class SQLSessionStore(SessionStore):
         user_agent = data.pop("user_agent", None)
         jti = data.pop("jti", None)
         fingerprint = data.pop("fingerprint", None)
-        
+        device_class = data.pop("device_class", None)
+        optional_fields = {"device_class": device_class} if self.has_device_class else {}
+
         ttl = kwargs.get("ttl", 86400)  # default 24 hours
         session_id = uuid.uuid4().hex
         now = datetime.now(timezone.utc)
@@ -64,6 +68,7 @@ class SQLSessionStore(SessionStore):
             expires_at=now.replace(second=0, microsecond=0) + timedelta(seconds=ttl),
             created_at=now,
             updated_at=now,
+            **optional_fields,
         )
 
         self.db_session.add(session)
@@ -104,6 +109,8 @@ class SQLSessionStore(SessionStore):
             "created_at": session.created_at,
             "updated_at": session.updated_at,
         }
+        if self.has_device_class:
+            session_data["device_class"] = session.device_class
         return session_data
 
     async def get_by_user(self, user_id: str) -> list[dict[str, Any]] | None:
@@ -140,6 +147,8 @@ class SQLSessionStore(SessionStore):
                 "created_at": s.created_at,
                 "updated_at": s.updated_at,
             }
+            if self.has_device_class:
+                s_dict["device_class"] = s.device_class
             results.append(s_dict)
 
         return results
@@ -1,4 +1,6 @@
+from .api_key import APIKeyStrategy
+from .basic import BasicAuthStrategy
 from .jwt import JWTStrategy
 from .opaque import OpaqueSessionStrategy
 
-__all__ = ["JWTStrategy", "OpaqueSessionStrategy"]
+__all__ = ["APIKeyStrategy", "BasicAuthStrategy", "JWTStrategy", "OpaqueSessionStrategy"]
@@ -0,0 +1,200 @@
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+from fastapi import Request, Response
+
+from ..crypto import compare_hash, hash_string
+from ..exceptions import TokenException
+from .cache import VerifiedCredentialCache
+
+if TYPE_CHECKING:
+    from ..api_keys.base import APIKeyStore
+
+
+class APIKeyStrategy:
+    """API key strategy - long-lived keys for machine clients.
+
+    Keys look like ``<key_prefix>_<key_id>_<secret>``. The key ID is a
+    public lookup prefix; only a SHA-256 digest (or HMAC-SHA-256 with
+    `pepper`) of the high-entropy secret is stored, so verification is a
+    single digest plus an indexed lookup instead of a password hash.
+    Verified keys are kept in an in-process LRU, making repeat requests a
+    dictionary hit.
+
+    Revoking through `revoke_key` takes effect immediately in this
+    process; other processes notice once their cache entry expires
+    (`cache_ttl_seconds`).
+    """
+
+    def __init__(
+        self,
+        store: "APIKeyStore",
+        key_prefix: str = "fa",
+        header_name: str = "X-API-Key",
+        allow_bearer: bool = True,
+        pepper: str | None = None,
+        cache_size: int = 10000,
+        cache_ttl_seconds: float = 60.0,
+    ):
+        """Initialize the strategy.
+
+        Args:
+            store: API key store
+            key_prefix: Human-readable prefix identifying keys from this app
+            header_name: Header carrying the key
+            allow_bearer: Also accept keys from `Authorization: Bearer`
+            pepper: Optional server-side secret; digests become HMAC-SHA-256
+            cache_size: Maximum verified keys cached in-process (0 disables)
+            cache_ttl_seconds: How long a verified key is trusted without
+                hitting the store
+        """
+        # Credentials carry the user ID directly; no session is involved
+        self.identifies_user = True
+        self.use_cookie = False
+        self.store = store
+        self.key_prefix = key_prefix
+        self.header_name = header_name
+        self.allow_bearer = allow_bearer
+        self._pepper = pepper.encode() if pepper else None
+        self._cache = VerifiedCredentialCache(cache_size, cache_ttl_seconds)
+
+    def _hash_secret(self, secret: str) -> str:
+        if self._pepper is None:
+            return hash_string(secret)
+        return hmac.new(self._pepper, secret.encode(), hashlib.sha256).hexdigest()
+
+    def _parse(self, api_key: str) -> tuple[str, str] | None:
+        """Split a key into ``(key_id, secret)``, or None if malformed."""
+        head = f"{self.key_prefix}_"
+        if not api_key.startswith(head):
+            return None
+        # The key ID is hex, so the first underscore ends it
+        key_id, _, secret = api_key[len(head):].partition("_")
+        if not key_id or not secret:
+            return None
+        return key_id, secret
+
+    async def create_key(
+        self,
+        user_id: str,
+        name: str | None = None,
+        scopes: list[str] | None = None,
+        ttl_seconds: int | None = None,
+    ) -> tuple[str, str]:
+        """Create and store a new API key.
+
+        Args:
+            user_id: Owner of the key
+            name: Optional label
+            scopes: Optional scopes granted to the key
+            ttl_seconds: Optional lifetime (default: no expiration)
+
+        Returns:
+            Tuple of (api_key, key_id). The key is only available now.
+        """
+        key_id = secrets.token_hex(8)
+        secret = secrets.token_urlsafe(32)
+        await self.store.create(
+            key_id,
+            user_id,
+            self._hash_secret(secret),
+            {"name": name, "scopes": scopes or []},
+            ttl=ttl_seconds,
+        )
+        return f"{self.key_prefix}_{key_id}_{secret}", key_id
+
+    async def revoke_key(self, key_id: str) -> None:
+        """Delete a key and drop it from this process's cache."""
+        self._cache.invalidate(key_id)
+        await self.store.delete(key_id)
+
+    async def verify(self, api_key: str) -> dict[str, Any]:
+        """Verify an API key.
+
+        Returns:
+            Claims with `sub`, `key_id` and `scopes`
+
+        Raises:
+            TokenException: If the key is malformed, unknown, expired or wrong
+        """
+        parsed = self._parse(api_key)
+        if parsed is None:
+            raise TokenException("Malformed API key")
+        key_id, secret = parsed
+
+        digest = self._hash_secret(secret)
+        cache_key = f"{key_id}:{digest}"
+        claims = self._cache.get(cache_key)
+        if claims is not None:
+            return dict(claims)
+
+        record = await self.store.get(key_id)
+        if not record or not compare_hash(digest, record["key_hash"]):
+            raise TokenException("Invalid API key")
+
+        claims = {
+            "sub": record["user_id"],
+            "key_id": key_id,
+            "scopes": list(record.get("scopes") or []),
+        }
+
+        # Never trust a cached key past its own expiry
+        ttl = None
+        expires_at = record.get("expires_at")
+        if expires_at:
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            ttl = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        self._cache.put(cache_key, key_id, claims, ttl)
+
+        return dict(claims)
+
+    async def issue(
+        self, response: Response, data: dict[str, Any], ttl_seconds: int
+    ) -> dict[str, str]:
+        """Create a new API key for the authenticated user.
+
+        Args:
+            response: FastAPI response object (unused)
+            data: Claims including 'sub' (user_id)
+            ttl_seconds: Lifetime of the key in seconds
+
+        Returns:
+            Dict with `api_key` and `key_id`
+        """
+        user_id = data.get("sub")
+        if not user_id:
+            raise ValueError("User ID not found in claims")
+
+        api_key, key_id = await self.create_key(user_id, ttl_seconds=ttl_seconds)
+        return {"api_key": api_key, "key_id": key_id}
+
+    async def extract(self, request: Request) -> dict[str, Any] | None:
+        """Extract and verify the API key from a request.
+
+        Looks for the key in:
+        - The `header_name` header
+        - Authorization header (Bearer scheme), if `allow_bearer`
+
+        Returns:
+            Dict with claims or None if no key was sent
+        """
+        api_key = request.headers.get(self.header_name)
+        if not api_key and self.allow_bearer:
+            authorization = request.headers.get("Authorization")
+            if authorization:
+                scheme, _, param = authorization.partition(" ")
+                if scheme.lower() == "bearer":
+                    api_key = param
+
+        if not api_key:
+            return None
+
+        return await self.verify(api_key)
+
+    async def revoke(self, response: Response) -> None:
+        """No-op: API keys are revoked explicitly with `revoke_key`."""
+        return None
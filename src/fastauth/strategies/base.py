@@ -20,6 +20,9 @@ class AuthStrategy(Protocol):
 
     Attributes:
         use_cookie: Whether to use cookies for authentication
+        identifies_user: Optional; True if extracted credentials carry the
+            user ID (`sub`) themselves and are not bound to a session
+            (e.g. API keys)
 
     Methods:
         issue: Issue a new authentication token
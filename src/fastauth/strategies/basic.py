@@ -0,0 +1,163 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import secrets
+from typing import TYPE_CHECKING, Any
+
+from fastapi import Request, Response
+
+from ..crypto import PasswordHasher, get_password_hasher
+from ..exceptions import CredentialsException
+from .cache import VerifiedCredentialCache
+
+if TYPE_CHECKING:
+    from ..users.base import UserStore
+
+
+class BasicAuthStrategy:
+    """HTTP Basic strategy - username and password sent with every request.
+
+    Meant for legacy integrations that cannot obtain tokens. Verifying a
+    password is deliberately slow, so successfully verified credentials
+    are remembered in a short-lived, size-bounded LRU keyed by
+    HMAC(secret, username:password:stored hash); a repeat request costs a
+    user lookup and one keyed hash instead of an Argon2 run. Concurrent
+    first requests with the same credentials share a single verification.
+
+    Because the user's current password hash is part of the key, any
+    change to it (a new password, a rehash) misses the cache, in every
+    process, so an old password stops working as soon as the store
+    returns the new hash.
+    """
+
+    def __init__(
+        self,
+        user_store: "UserStore",
+        password_hasher: PasswordHasher | None = None,
+        login_field: str = "username",
+        cache_secret: bytes | None = None,
+        cache_size: int = 10000,
+        cache_ttl_seconds: float = 30.0,
+    ):
+        """Initialize the strategy.
+
+        Args:
+            user_store: Store used to look up users by `login_field`
+            password_hasher: Backend used to verify passwords (default: the
+                `AuthManager`'s hasher built from `config.hashing`, or the
+                process-wide hasher when used without a manager)
+            login_field: User field matched against the Basic username
+            cache_secret: HMAC key for cache entries (default: random per
+                process, so cached digests are useless outside it)
+            cache_size: Maximum credentials cached (0 disables the cache)
+            cache_ttl_seconds: How long verified credentials are trusted
+        """
+        # Credentials carry the user identity directly; no session is involved
+        self.identifies_user = True
+        self.use_cookie = False
+        self.user_store = user_store
+        # Filled in by `AuthManager` when left unset
+        self.password_hasher = password_hasher
+        self.login_field = login_field
+        self._cache_secret = cache_secret or secrets.token_bytes(32)
+        self._cache = VerifiedCredentialCache(cache_size, cache_ttl_seconds)
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def _cache_key(self, username: str, password: str, hashed_password: str) -> str:
+        message = f"{username}:{password}:{hashed_password}".encode()
+        return hmac.new(self._cache_secret, message, hashlib.sha256).hexdigest()
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Forget all cached credentials of a user right away.
+
+        Not needed after a password change, which already misses the
+        cache; this only frees the entries early.
+        """
+        self._cache.invalidate(str(user_id))
+
+    async def _verify(self, user: Any, password: str) -> dict[str, Any] | None:
+        password_hasher = self.password_hasher or get_password_hasher()
+        if not await password_hasher.verify(password, user.password):
+            return None
+        return {"sub": user.id}
+
+    async def _verify_and_cache(
+        self, cache_key: str, user: Any, password: str
+    ) -> dict[str, Any] | None:
+        claims = await self._verify(user, password)
+        if claims is not None:
+            self._cache.put(cache_key, str(claims["sub"]), claims)
+        return claims
+
+    def _verified(self, cache_key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller gave up
+
+    async def verify(self, username: str, password: str) -> dict[str, Any]:
+        """Verify Basic credentials, using the cache when possible.
+
+        Returns:
+            Claims with `sub`
+
+        Raises:
+            CredentialsException: If the credentials are invalid
+        """
+        user = await self.user_store.find(**{self.login_field: username})
+        if not user:
+            raise CredentialsException("Invalid credentials")
+        cache_key = self._cache_key(username, password, user.password)
+        claims = self._cache.get(cache_key)
+        if claims is not None:
+            return dict(claims)
+
+        # Share one verification among concurrent identical requests
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._verify_and_cache(cache_key, user, password))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda task: self._verified(cache_key, task))
+        # Shielded so one cancelled caller doesn't cancel the others' verification
+        claims = await asyncio.shield(task)
+
+        if claims is None:
+            raise CredentialsException("Invalid credentials")
+        return dict(claims)
+
+    async def issue(
+        self, response: Response, data: dict[str, Any], ttl_seconds: int
+    ) -> None:
+        """No-op: clients keep sending their credentials."""
+        return None
+
+    async def extract(self, request: Request) -> dict[str, Any] | None:
+        """Extract and verify Basic credentials from the Authorization header.
+
+        Returns:
+            Dict with claims or None if no Basic credentials were sent
+        """
+        authorization = request.headers.get("Authorization")
+        if not authorization:
+            return None
+
+        scheme, _, param = authorization.partition(" ")
+        if scheme.lower() != "basic":
+            return None
+
+        try:
+            decoded = base64.b64decode(param, validate=True).decode()
+        except (binascii.Error, UnicodeDecodeError):
+            raise CredentialsException("Malformed Basic credentials")
+
+        username, separator, password = decoded.partition(":")
+        if not separator or not username:
+            raise CredentialsException("Malformed Basic credentials")
+
+        return await self.verify(username, password)
+
+    async def revoke(self, response: Response) -> None:
+        """No-op: there is no token to clear."""
+        return None
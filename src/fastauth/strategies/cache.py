@@ -0,0 +1,87 @@
+"""
+In-process cache of verified credentials.
+
+Shared by strategies whose credentials are re-sent on every request (API
+keys, HTTP Basic) so that only the first request pays for verification.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class VerifiedCredentialCache:
+    """Size- and TTL-bounded LRU of verified credentials.
+
+    Entries are keyed by a digest of the presented credential, so a hit
+    proves the caller sent the same secret that was verified before. Each
+    entry also belongs to a *group* (a key ID, a user ID) so all entries
+    of a revoked key or a changed password can be dropped at once.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 60.0):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum entries kept (0 disables caching)
+            ttl_seconds: Maximum time an entry is trusted
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str, dict[str, Any]]] = OrderedDict()
+        self._groups: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cache_key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(cache_key)
+                return None
+            self._entries.move_to_end(cache_key)
+            return entry[2]
+
+    def put(
+        self,
+        cache_key: str,
+        group: str,
+        claims: dict[str, Any],
+        ttl: float | None = None,
+    ) -> None:
+        """Cache `claims`; `ttl` may only shorten the configured TTL."""
+        ttl = self.ttl_seconds if ttl is None else min(ttl, self.ttl_seconds)
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._remove(cache_key)
+            self._entries[cache_key] = (time.monotonic() + ttl, group, claims)
+            self._groups.setdefault(group, set()).add(cache_key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, group: str) -> None:
+        """Drop every entry belonging to `group`."""
+        with self._lock:
+            for cache_key in self._groups.pop(group, ()):
+                self._entries.pop(cache_key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, cache_key: str) -> None:
+        entry = self._entries.pop(cache_key, None)
+        if entry is None:
+            return
+        keys = self._groups.get(entry[1])
+        if keys is not None:
+            keys.discard(cache_key)
+            if not keys:
+                del self._groups[entry[1]]
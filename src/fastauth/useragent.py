@@ -0,0 +1,105 @@
+"""
+User-Agent classification.
+
+`parse_user_agent` reduces a User-Agent header to browser, OS and device
+class. All tokens of interest are alternatives of one precompiled regex,
+so a header is scanned once and the tokens found are then resolved by
+priority (an Edge UA also names Chrome and Safari, a Chrome UA names
+Safari). Results are kept in an LRU cache keyed by the raw header: real
+traffic repeats a small set of UAs, so almost every call is a dict hit.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Longer headers are classified by their prefix; this also bounds the
+# work and cache memory an attacker can cause with oversized headers
+_MAX_LENGTH = 512
+_CACHE_SIZE = 4096
+
+_TOKENS = re.compile(
+    r"(?P<edge>Edg(?:e|A|iOS)?/)"
+    r"|(?P<opera>OPR/|Opera)"
+    r"|(?P<samsung>SamsungBrowser/)"
+    r"|(?P<firefox>Firefox/|FxiOS/)"
+    r"|(?P<chrome>Chrome/|CriOS/|Chromium/)"
+    r"|(?P<safari>Safari/)"
+    r"|(?P<ie>MSIE |Trident/)"
+    r"|(?P<windows_phone>Windows Phone)"
+    r"|(?P<windows>Windows)"
+    r"|(?P<ipad>iPad)"
+    r"|(?P<iphone>iPhone|iPod)"
+    r"|(?P<android>Android)"
+    r"|(?P<chromeos>CrOS)"
+    r"|(?P<macos>Macintosh|Mac OS X)"
+    r"|(?P<linux>Linux|X11)"
+    r"|(?P<tablet>Tablet)"
+    r"|(?P<mobile>Mobi)"
+    r"|(?P<bot>(?i:bot\b|crawl|spider|slurp|headless|curl/|wget/|python-|httpx/|go-http-client))"
+)
+
+# (token group, name), in priority order
+_BROWSERS = (
+    ("edge", "Edge"),
+    ("opera", "Opera"),
+    ("samsung", "Samsung Internet"),
+    ("firefox", "Firefox"),
+    ("chrome", "Chrome"),
+    ("ie", "Internet Explorer"),
+    ("safari", "Safari"),
+)
+_OPERATING_SYSTEMS = (
+    ("windows_phone", "Windows Phone"),
+    ("windows", "Windows"),
+    ("ipad", "iOS"),
+    ("iphone", "iOS"),
+    ("android", "Android"),
+    ("chromeos", "ChromeOS"),
+    ("macos", "macOS"),
+    ("linux", "Linux"),
+)
+_DESKTOP_OPERATING_SYSTEMS = frozenset({"Windows", "macOS", "Linux", "ChromeOS"})
+
+
+class UserAgentInfo(NamedTuple):
+    browser: str
+    os: str
+    # "desktop", "mobile", "tablet", "bot" or "other"
+    device_class: str
+
+
+UNKNOWN_USER_AGENT = UserAgentInfo("Other", "Other", "other")
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _classify(user_agent: str) -> UserAgentInfo:
+    found = {match.lastgroup for match in _TOKENS.finditer(user_agent)}
+    browser = next((name for group, name in _BROWSERS if group in found), "Other")
+    os = next((name for group, name in _OPERATING_SYSTEMS if group in found), "Other")
+
+    if "bot" in found:
+        device_class = "bot"
+    elif "ipad" in found or "tablet" in found or ("android" in found and "mobile" not in found):
+        device_class = "tablet"
+    elif "mobile" in found or "iphone" in found or "windows_phone" in found:
+        device_class = "mobile"
+    elif os in _DESKTOP_OPERATING_SYSTEMS:
+        device_class = "desktop"
+    else:
+        device_class = "other"
+    return UserAgentInfo(browser, os, device_class)
+
+
+def parse_user_agent(user_agent: Optional[str]) -> UserAgentInfo:
+    """Classify a User-Agent header.
+
+    Args:
+        user_agent: Raw User-Agent header value
+
+    Returns:
+        Browser, OS and device class; "Other"/"other" where unknown
+    """
+    if not user_agent:
+        return UNKNOWN_USER_AGENT
+    return _classify(user_agent[:_MAX_LENGTH])
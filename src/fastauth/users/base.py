@@ -38,6 +38,35 @@ class UserStore(Protocol):
         delete: Delete a user
             Args:
                 user_id: The user ID to delete
+
+    Optional methods (detected with ``hasattr``):
+        update_password: Replace a user's stored password hash. When present,
+            hashes made with outdated parameters are transparently upgraded
+            after a successful login.
+            Args:
+                user_id: The user ID to update
+                hashed_password: The new password hash
+        get_many: Get several users in one round trip. Concurrent
+            lookups are coalesced into one call (see `users.loader`);
+            without it, they fall back to concurrent `get` calls.
+            Args:
+                user_ids: The user IDs to look up
+            Returns:
+                The found users, in any order; missing IDs are omitted
+        find_by_oauth: Find the user linked to an OAuth account. Should be
+            an indexed lookup on (provider, subject); without it, OAuth
+            logins fall back to `find` by verified email.
+            Args:
+                provider: OAuth provider name
+                subject: The user's ID at the provider
+            Returns:
+                The linked user or None if there is none
+        link_oauth: Link an OAuth account to a user, so later logins
+            resolve through `find_by_oauth`.
+            Args:
+                user_id: The user ID to link
+                provider: OAuth provider name
+                subject: The user's ID at the provider
     """
 
     async def create(self, **kwargs) -> BaseUser: ...
@@ -0,0 +1,108 @@
+"""
+Coalescing user loader.
+
+Authenticated endpoints load the current user on every request. Under
+load, many of those lookups are in flight at once, often for the same hot
+users. `UserLoader` queues the lookups made within one event-loop tick
+and resolves them with a single `UserStore.get_many` call; lookups of an
+ID that is already queued or being fetched share that fetch. Nothing is
+cached once a fetch completes, so users are never served stale.
+
+Stores without `get_many` are supported transparently: the batch is
+fetched with concurrent `get` calls, still deduplicated.
+"""
+
+import asyncio
+from typing import Iterable
+
+from .base import BaseUser, UserStore
+
+
+class UserLoader:
+    """DataLoader-style batching and deduplication of user lookups."""
+
+    def __init__(self, store: UserStore, max_batch_size: int = 100):
+        """Initialize the loader.
+
+        Args:
+            store: User store to load from
+            max_batch_size: Most IDs passed to one `get_many` call
+        """
+        self.store = store
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self._has_get_many = hasattr(store, "get_many")
+        # user ID -> result of its queued or running fetch
+        self._pending: dict[str, asyncio.Future] = {}
+        self._queue: list[str] = []
+        # Running fetches, referenced so they aren't garbage collected
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, user_id: str) -> BaseUser | None:
+        """Load a user, batched with other lookups in the same tick.
+
+        Args:
+            user_id: The user ID to look up
+
+        Returns:
+            The user or None if not found
+        """
+        future = self._pending.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[user_id] = loop.create_future()
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            self._queue.append(user_id)
+        # Shielded so a cancelled caller doesn't fail the others sharing it
+        return await asyncio.shield(future)
+
+    async def load_many(self, user_ids: Iterable[str]) -> list[BaseUser | None]:
+        """Load several users in as few round trips as possible.
+
+        Args:
+            user_ids: The user IDs to look up
+
+        Returns:
+            The users in the order of `user_ids`, None where not found
+        """
+        return list(await asyncio.gather(*(self.load(user_id) for user_id in user_ids)))
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), self.max_batch_size):
+            task = asyncio.ensure_future(
+                self._fetch(queue[start : start + self.max_batch_size])
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, user_ids: list[str]) -> None:
+        self.batches += 1
+        try:
+            if self._has_get_many:
+                users = {
+                    str(user.id): user for user in await self.store.get_many(user_ids)
+                }
+                results = [users.get(str(user_id)) for user_id in user_ids]
+            else:
+                results = await asyncio.gather(
+                    *(self.store.get(user_id) for user_id in user_ids)
+                )
+        except Exception as e:
+            for user_id in user_ids:
+                future = self._pending.pop(user_id)
+                if not future.done():
+                    future.set_exception(e)
+                    # Marked retrieved in case every caller was cancelled
+                    future.exception()
+            return
+        except BaseException:
+            for user_id in user_ids:
+                self._pending.pop(user_id).cancel()
+            raise
+
+        for user_id, user in zip(user_ids, results):
+            future = self._pending.pop(user_id)
+            if not future.done():
+                future.set_result(user)
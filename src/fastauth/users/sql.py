@@ -0,0 +1,301 @@
+"""
+Async SQL user store implementation.
+
+Reference `UserStore` on SQLAlchemy's asyncio extension, for any database
+with an async driver (aiosqlite, asyncpg, asyncmy, ...). Next to each
+login field (`AuthConfig.login_fields`) the user model stores its
+case-folded form in a `<field>_key` column under a unique index, so
+`find(email="Ada@Example.com")` is a single index lookup on every backend
+(functional `lower()` indexes differ between databases and only fold
+ASCII on SQLite). E.g. with SQLAlchemy:
+
+    class User(Base):
+        __tablename__ = "users"
+        id = Column(String(36), primary_key=True)
+        password = Column(String(255), nullable=False)
+        email = Column(String(320), nullable=True)
+        email_key = Column(String(320), nullable=True, unique=True)
+        username = Column(String(64), nullable=True)
+        username_key = Column(String(64), nullable=True, unique=True)
+        name = Column(String(255), nullable=True)
+        created_at = Column(DateTime(timezone=True), nullable=False)
+
+Reads select only the columns the user schema is built from.
+`SQLOAuthUserStore` additionally keeps OAuth identities in a link model,
+keyed by provider and subject:
+
+    class UserOAuth(Base):
+        __tablename__ = "user_oauth"
+        provider = Column(String(64), primary_key=True)
+        subject = Column(String(255), primary_key=True)
+        user_id = Column(String(36), ForeignKey("users.id"), index=True, nullable=False)
+
+Requires SQLAlchemy 2 with asyncio support (`pip install
+"sqlalchemy[asyncio]"`) and an async driver.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Iterable
+
+from pydantic import BaseModel
+
+try:
+    import sqlalchemy as sa
+    from sqlalchemy.exc import IntegrityError
+except ImportError as e:
+    raise ImportError(
+        "SQLUserStore requires SQLAlchemy 2 with asyncio support: "
+        "pip install 'sqlalchemy[asyncio]'"
+    ) from e
+
+from .base import BaseUser
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Bound parameters per `IN (...)` query, below every backend's limit
+_MAX_BATCH = 500
+
+
+def normalize_login(value: Any) -> str:
+    """Return the case-normalized form a login field is indexed under."""
+    return str(value).strip().casefold()
+
+
+class SQLUserStore:
+    """Async SQL database-backed user store.
+
+    Each operation checks out its own connection from the engine's pool,
+    so the store is safe to share between concurrent requests.
+
+    Args:
+        user_model: Database model class for users
+        engine: SQLAlchemy async engine
+        login_fields: Fields users log in with (`AuthConfig.login_fields`)
+        schema: Model users are returned as; only its fields are loaded
+    """
+
+    def __init__(
+        self,
+        user_model: type[Any],
+        engine: "AsyncEngine",
+        login_fields: Iterable[str] = ("email",),
+        schema: type[BaseModel] = BaseUser,
+    ):
+        self.user_model = user_model
+        self.engine = engine
+        self.login_fields = tuple(login_fields)
+        self.schema = schema
+
+        # Validate user model
+        required_fields = ["id", "password"]
+        for field in self.login_fields:
+            required_fields += [field, f"{field}_key"]
+        missing_fields = [field for field in required_fields if not hasattr(user_model, field)]
+        if missing_fields:
+            raise ValueError(f"User model is missing required fields: {', '.join(missing_fields)}")
+
+        # Only the columns the schema is built from, never the `_key` copies
+        self._columns = set(user_model.__table__.c.keys())
+        fields = ["id", "password", *self.login_fields]
+        fields += [f for f in schema.model_fields if f not in fields and f in self._columns]
+        self._projection = [getattr(user_model, field) for field in fields]
+        self._has_created_at = "created_at" in self._columns
+
+    def _to_user(self, values: Any) -> BaseModel:
+        return self.schema.model_validate(
+            {
+                column.key: values[column.key]
+                for column in self._projection
+                if values.get(column.key) is not None
+            }
+        )
+
+    async def _fetch_one(self, statement: Any) -> BaseModel | None:
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(statement)).first()
+        return self._to_user(row._mapping) if row is not None else None
+
+    async def create(self, **kwargs) -> BaseModel:
+        """Create a new user.
+
+        Args:
+            **kwargs: User data; `password` plus login and other fields
+
+        Returns:
+            The created user
+
+        Raises:
+            ValueError: If a field has no column or a login value is taken
+        """
+        unknown = set(kwargs) - self._columns
+        if unknown:
+            raise ValueError(f"Unknown user fields: {', '.join(sorted(unknown))}")
+        values = {**kwargs, "id": str(kwargs.get("id") or uuid.uuid4().hex)}
+        if self._has_created_at:
+            values.setdefault("created_at", datetime.now(timezone.utc))
+        for field in self.login_fields:
+            if values.get(field) is not None:
+                values[f"{field}_key"] = normalize_login(values[field])
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(sa.insert(self.user_model).values(**values))
+        except IntegrityError as e:
+            raise ValueError("User already exists") from e
+        return self._to_user(values)
+
+    async def find(self, **kwargs) -> BaseModel | None:
+        """Find a user by login fields, case-insensitively.
+
+        Args:
+            **kwargs: Login field values (other fields are ignored)
+
+        Returns:
+            The user matching all given login fields, or None
+        """
+        conditions = [
+            getattr(self.user_model, f"{field}_key") == normalize_login(kwargs[field])
+            for field in self.login_fields
+            if kwargs.get(field) is not None
+        ]
+        if not conditions:
+            return None
+        return await self._fetch_one(sa.select(*self._projection).where(*conditions).limit(1))
+
+    async def get(self, user_id: str) -> BaseModel | None:
+        """Get a user by ID.
+
+        Args:
+            user_id: The user ID to look up
+
+        Returns:
+            The user or None if not found
+        """
+        return await self._fetch_one(
+            sa.select(*self._projection).where(self.user_model.id == str(user_id))
+        )
+
+    async def get_many(self, user_ids: Iterable[str]) -> list[BaseModel]:
+        """Get several users by ID.
+
+        Args:
+            user_ids: The user IDs to look up
+
+        Returns:
+            The found users, in any order; missing IDs are omitted
+        """
+        ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        users = []
+        async with self.engine.connect() as conn:
+            for start in range(0, len(ids), _MAX_BATCH):
+                result = await conn.execute(
+                    sa.select(*self._projection).where(
+                        self.user_model.id.in_(ids[start : start + _MAX_BATCH])
+                    )
+                )
+                users.extend(self._to_user(row._mapping) for row in result)
+        return users
+
+    async def delete(self, user_id: str) -> None:
+        """Delete a user.
+
+        Args:
+            user_id: The user ID to delete
+        """
+        async with self.engine.begin() as conn:
+            await conn.execute(sa.delete(self.user_model).where(self.user_model.id == str(user_id)))
+
+    async def update_password(self, user_id: str, hashed_password: str) -> None:
+        """Replace a user's stored password hash.
+
+        Args:
+            user_id: The user ID to update
+            hashed_password: The new password hash
+        """
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                sa.update(self.user_model)
+                .where(self.user_model.id == str(user_id))
+                .values(password=hashed_password)
+            )
+
+
+class SQLOAuthUserStore(SQLUserStore):
+    """Async SQL user store that also links OAuth identities to users.
+
+    Without the link methods, OAuth logins can only resolve users by a
+    verified email, so `SQLUserStore` doesn't define them.
+
+    Args:
+        user_model: Database model class for users
+        oauth_model: Database model class for OAuth links
+        engine: SQLAlchemy async engine
+        login_fields: Fields users log in with (`AuthConfig.login_fields`)
+        schema: Model users are returned as; only its fields are loaded
+    """
+
+    def __init__(
+        self,
+        user_model: type[Any],
+        oauth_model: type[Any],
+        engine: "AsyncEngine",
+        login_fields: Iterable[str] = ("email",),
+        schema: type[BaseModel] = BaseUser,
+    ):
+        super().__init__(user_model, engine, login_fields=login_fields, schema=schema)
+        self.oauth_model = oauth_model
+
+        # Validate OAuth model
+        required_fields = ["provider", "subject", "user_id"]
+        missing_fields = [field for field in required_fields if not hasattr(oauth_model, field)]
+        if missing_fields:
+            raise ValueError(f"OAuth model is missing required fields: {', '.join(missing_fields)}")
+
+    async def delete(self, user_id: str) -> None:
+        """Delete a user and their OAuth links.
+
+        Args:
+            user_id: The user ID to delete
+        """
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                sa.delete(self.oauth_model).where(self.oauth_model.user_id == str(user_id))
+            )
+            await conn.execute(sa.delete(self.user_model).where(self.user_model.id == str(user_id)))
+
+    async def find_by_oauth(self, provider: str, subject: str) -> BaseModel | None:
+        """Find the user linked to an OAuth account.
+
+        Args:
+            provider: OAuth provider name
+            subject: The user's ID at the provider
+
+        Returns:
+            The linked user or None if there is none
+        """
+        link = self.oauth_model
+        return await self._fetch_one(
+            sa.select(*self._projection)
+            .join(link, link.user_id == self.user_model.id)
+            .where(link.provider == provider, link.subject == subject)
+        )
+
+    async def link_oauth(self, user_id: str, provider: str, subject: str) -> None:
+        """Link an OAuth account to a user.
+
+        Args:
+            user_id: The user ID to link
+            provider: OAuth provider name
+            subject: The user's ID at the provider
+        """
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(
+                    sa.insert(self.oauth_model).values(
+                        provider=provider, subject=subject, user_id=str(user_id)
+                    )
+                )
+        except IntegrityError:
+            # Linked concurrently; the first link wins
+            pass
@@ -6,27 +6,43 @@ IP address resolution (with reverse proxy support), request metadata
 extraction, and other helper functions.
 """
 
-from typing import Optional
+import hashlib
+import uuid
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Optional
 
 from fastapi import Request
 
+from .useragent import UserAgentInfo, parse_user_agent
 
-def get_client_ip(request: Request) -> str:
+if TYPE_CHECKING:
+    from .network import ClientIPResolver
+
+
+def get_client_ip(request: Request, resolver: "ClientIPResolver | None" = None) -> str:
     """Extract the client's real IP address from a request.
 
-    Handles common reverse proxy scenarios by checking headers in order:
+    With a `resolver`, forwarding headers are only honored as far as they
+    were written by trusted proxies (see `ClientIPResolver`). Without one,
+    common reverse proxy headers are trusted as-is, in order:
     1. X-Forwarded-For (most common, may contain multiple IPs)
     2. X-Real-IP (nginx and some other proxies)
     3. request.client.host (FastAPI's direct connection)
 
     For X-Forwarded-For, only the first IP (original client) is used.
+    Clients can set these headers themselves, so configure a resolver
+    (`AuthConfig.proxy`) whenever the result keys security decisions.
 
     Args:
         request: FastAPI Request object
+        resolver: Optional trusted-proxy resolver
 
     Returns:
         The client's IP address as a string
     """
+    if resolver is not None:
+        return resolver.resolve(request)
+
     # Check X-Forwarded-For header (may contain: client, proxy1, proxy2)
     forwarded_for = request.headers.get("X-Forwarded-For")
     if forwarded_for:
@@ -59,6 +75,20 @@ def get_user_agent(request: Request) -> Optional[str]:
     return request.headers.get("User-Agent")
 
 
+def get_user_agent_info(request: Request) -> UserAgentInfo:
+    """Classify the request's User-Agent (browser, OS, device class).
+
+    Parsing is cached per distinct User-Agent string, see `parse_user_agent`.
+
+    Args:
+        request: FastAPI Request object
+
+    Returns:
+        Parsed User-Agent; "Other"/"other" fields when absent or unknown
+    """
+    return parse_user_agent(get_user_agent(request))
+
+
 def get_accept_language(request: Request) -> Optional[str]:
     """Extract the Accept-Language header from a request.
 
@@ -81,3 +111,117 @@ def get_accept_encoding(request: Request) -> Optional[str]:
         Accept-Encoding string or None if not present
     """
     return request.headers.get("Accept-Encoding")
+
+
+# Header name -> RequestMeta.__init__ argument position, for a single scan
+_META_HEADERS = {
+    b"user-agent": 0,
+    b"accept-language": 1,
+    b"accept-encoding": 2,
+    b"x-request-id": 3,
+}
+_MAX_REQUEST_ID_LENGTH = 128
+
+_request_meta: ContextVar["RequestMeta | None"] = ContextVar(
+    "fastauth_request_meta", default=None
+)
+
+
+class RequestMeta:
+    """Request metadata shared by every auth stage of one request.
+
+    Get it through `get_request_meta()`, which builds it once per request
+    from a single pass over the raw headers; the fingerprint digest and a
+    generated request ID are only computed when first read.
+    """
+
+    __slots__ = (
+        "client_ip",
+        "user_agent",
+        "accept_language",
+        "accept_encoding",
+        "_request_id",
+        "_fingerprint",
+    )
+
+    def __init__(
+        self,
+        client_ip: str,
+        user_agent: Optional[str] = None,
+        accept_language: Optional[str] = None,
+        accept_encoding: Optional[str] = None,
+        request_id: Optional[str] = None,
+    ):
+        self.client_ip = client_ip
+        self.user_agent = user_agent
+        self.accept_language = accept_language
+        self.accept_encoding = accept_encoding
+        self._request_id = request_id
+        self._fingerprint: Optional[bytes] = None
+
+    @property
+    def request_id(self) -> str:
+        """The client's X-Request-ID, or a generated one."""
+        if self._request_id is None:
+            self._request_id = uuid.uuid4().hex
+        return self._request_id
+
+    @property
+    def user_agent_info(self) -> UserAgentInfo:
+        """Browser, OS and device class parsed from the User-Agent."""
+        return parse_user_agent(self.user_agent)
+
+    @property
+    def fingerprint(self) -> bytes:
+        """SHA-256 digest of the soft fingerprint inputs.
+
+        Its hex form equals `crypto.soft_fingerprint()` of the same values.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha256(
+                f"{self.user_agent}:{self.client_ip}:"
+                f"{self.accept_language}:{self.accept_encoding}".encode()
+            ).digest()
+        return self._fingerprint
+
+
+def get_request_meta(
+    request: Request, resolver: "ClientIPResolver | None" = None
+) -> RequestMeta:
+    """Return the request's `RequestMeta`, building it on first use.
+
+    The instance is cached on `request.state` and in a context variable
+    (see `current_request_meta`), so later stages reuse it.
+
+    Args:
+        request: FastAPI Request object
+        resolver: Optional trusted-proxy resolver (see `get_client_ip`)
+
+    Returns:
+        The request's metadata
+    """
+    state = request.scope.setdefault("state", {})
+    meta = state.get("request_meta")
+    if meta is not None:
+        return meta
+
+    values: list[Optional[str]] = [None, None, None, None]
+    for name, value in request.scope["headers"]:
+        position = _META_HEADERS.get(name)
+        if position is not None and values[position] is None:
+            values[position] = value.decode("latin-1")
+    request_id = values[3]
+    if request_id is not None:
+        request_id = request_id.strip()[:_MAX_REQUEST_ID_LENGTH] or None
+
+    meta = RequestMeta(
+        get_client_ip(request, resolver), values[0], values[1], values[2], request_id
+    )
+    state["request_meta"] = meta
+    _request_meta.set(meta)
+    return meta
+
+
+def current_request_meta() -> Optional[RequestMeta]:
+    """Return the `RequestMeta` of the request being handled, if any."""
+    return _request_meta.get()
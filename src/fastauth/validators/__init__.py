@@ -0,0 +1,19 @@
+"""
+Built-in password validators for `AuthConfig.password_validator`.
+
+Validators raise ValueError with a user-facing reason when a password is
+rejected and return True otherwise.
+"""
+
+from typing import Any
+
+__all__ = ["BreachedPasswordValidator", "build_breached_file"]
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on demand so `python -m fastauth.validators.breached` runs cleanly
+    if name in __all__:
+        from . import breached
+
+        return getattr(breached, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
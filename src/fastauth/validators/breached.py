@@ -0,0 +1,257 @@
+"""
+Offline breached-password check.
+
+Looks passwords up in a local copy of a breached-password corpus (e.g. the
+Pwned Passwords SHA-1 or NTLM "ordered by hash" downloads) without any
+network call. The corpus is converted once into a compact binary file:
+
+    python -m fastauth.validators.breached pwned-passwords-sha1-ordered-by-hash-v8.txt \\
+        breached-sha1.bin --width 8
+
+The file holds a small header followed by the leading `width` bytes of
+every digest, sorted and fixed-width. Lookups binary-search the file
+through `mmap`, so nothing is loaded into RAM: each check touches ~30
+pages, which the OS page cache shares between all worker processes.
+
+An 8-byte prefix keeps ~900M entries in ~7 GiB with a false-positive rate
+around 1 in 10^10 per lookup.
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from typing import IO, Iterable
+
+MAGIC = b"FABP"
+VERSION = 1
+# magic, version, algorithm, width, reserved, entry count
+_HEADER = struct.Struct("<4sBBBxQ")
+ALGORITHMS = {"sha1": 1, "ntlm": 2}
+_ALGORITHM_NAMES = {code: name for name, code in ALGORITHMS.items()}
+
+
+def _md4(data: bytes) -> bytes:
+    # MD4 (RFC 1320); OpenSSL 3 no longer ships it, and NTLM needs it
+    mask = 0xFFFFFFFF
+
+    def rotl(x: int, n: int) -> int:
+        return ((x << n) | (x >> (32 - n))) & mask
+
+    message = data + b"\x80" + b"\x00" * ((55 - len(data)) % 64)
+    message += struct.pack("<Q", len(data) * 8)
+    a, b, c, d = 0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476
+
+    for offset in range(0, len(message), 64):
+        x = struct.unpack("<16I", message[offset : offset + 64])
+        aa, bb, cc, dd = a, b, c, d
+
+        for i in (0, 4, 8, 12):
+            a = rotl((a + ((b & c) | (~b & d)) + x[i]) & mask, 3)
+            d = rotl((d + ((a & b) | (~a & c)) + x[i + 1]) & mask, 7)
+            c = rotl((c + ((d & a) | (~d & b)) + x[i + 2]) & mask, 11)
+            b = rotl((b + ((c & d) | (~c & a)) + x[i + 3]) & mask, 19)
+        for i in (0, 1, 2, 3):
+            a = rotl((a + ((b & c) | (b & d) | (c & d)) + x[i] + 0x5A827999) & mask, 3)
+            d = rotl((d + ((a & b) | (a & c) | (b & c)) + x[i + 4] + 0x5A827999) & mask, 5)
+            c = rotl((c + ((d & a) | (d & b) | (a & b)) + x[i + 8] + 0x5A827999) & mask, 9)
+            b = rotl((b + ((c & d) | (c & a) | (d & a)) + x[i + 12] + 0x5A827999) & mask, 13)
+        for i in (0, 2, 1, 3):
+            a = rotl((a + (b ^ c ^ d) + x[i] + 0x6ED9EBA1) & mask, 3)
+            d = rotl((d + (a ^ b ^ c) + x[i + 8] + 0x6ED9EBA1) & mask, 9)
+            c = rotl((c + (d ^ a ^ b) + x[i + 4] + 0x6ED9EBA1) & mask, 11)
+            b = rotl((b + (c ^ d ^ a) + x[i + 12] + 0x6ED9EBA1) & mask, 15)
+
+        a, b, c, d = (a + aa) & mask, (b + bb) & mask, (c + cc) & mask, (d + dd) & mask
+
+    return struct.pack("<4I", a, b, c, d)
+
+
+def password_digest(password: str, algorithm: str = "sha1") -> bytes:
+    """Return the digest a breach corpus stores for `password`."""
+    if algorithm == "sha1":
+        return hashlib.sha1(password.encode()).digest()
+    if algorithm == "ntlm":
+        return _md4(password.encode("utf-16-le"))
+    raise ValueError(f"Unsupported algorithm: {algorithm}")
+
+
+class BreachedPasswordValidator:
+    """Password validator rejecting passwords found in a breach corpus.
+
+    Usable directly as `AuthConfig.password_validator`. The file is mapped
+    lazily on first use, so constructing the validator before a pre-fork
+    server forks is cheap and every worker maps the same pages.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]):
+        """Initialize the validator.
+
+        Args:
+            path: Binary file produced by `build_breached_file`
+        """
+        self.path = os.fspath(path)
+        self._mm: mmap.mmap | None = None
+        self.algorithm = ""
+        self.width = 0
+        self.count = 0
+
+    def _open(self) -> mmap.mmap:
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, algorithm, width, count = _HEADER.unpack_from(mm)
+        if magic != MAGIC or version != VERSION or algorithm not in _ALGORITHM_NAMES:
+            mm.close()
+            raise ValueError(f"{self.path} is not a breached-password file")
+        if len(mm) != _HEADER.size + width * count:
+            mm.close()
+            raise ValueError(f"{self.path} is truncated")
+
+        if hasattr(mm, "madvise") and hasattr(mmap, "MADV_RANDOM"):
+            # Binary search jumps around; readahead would only waste cache
+            mm.madvise(mmap.MADV_RANDOM)
+
+        self.algorithm = _ALGORITHM_NAMES[algorithm]
+        self.width = width
+        self.count = count
+        self._mm = mm
+        return mm
+
+    def contains_digest(self, digest: bytes) -> bool:
+        """Return True if the corpus contains `digest` (compared on its prefix)."""
+        mm = self._mm or self._open()
+        width = self.width
+        target = digest[:width]
+
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _HEADER.size + mid * width
+            entry = mm[offset : offset + width]
+            if entry < target:
+                lo = mid + 1
+            elif entry > target:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def is_breached(self, password: str) -> bool:
+        """Return True if `password` appears in the corpus."""
+        if self._mm is None:
+            self._open()
+        return self.contains_digest(password_digest(password, self.algorithm))
+
+    def __call__(self, password: str) -> bool:
+        if self.is_breached(password):
+            raise ValueError("password has appeared in a data breach")
+        return True
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+
+def _parse_corpus(lines: Iterable[str], min_count: int) -> Iterable[bytes]:
+    # Lines look like "HEXDIGEST:COUNT" (count optional)
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        digest, _, count = line.partition(":")
+        if count and int(count) < min_count:
+            continue
+        yield bytes.fromhex(digest)
+
+
+def build_breached_file(
+    source: Iterable[str],
+    output: str | os.PathLike[str],
+    algorithm: str = "sha1",
+    width: int = 8,
+    min_count: int = 1,
+) -> int:
+    """Convert a sorted breach corpus into a breached-password file.
+
+    Streams the input, so memory use is constant. Duplicate prefixes are
+    collapsed. The file is written to a temporary path and renamed into
+    place, so running validators never see a partial file.
+
+    Args:
+        source: Lines of ``HEXDIGEST[:COUNT]``, sorted by digest
+        output: Destination path
+        algorithm: "sha1" or "ntlm" (must match the corpus)
+        width: Leading digest bytes kept per entry
+        min_count: Skip entries seen fewer times than this
+
+    Returns:
+        Number of entries written
+
+    Raises:
+        ValueError: If the input is not sorted
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unsupported algorithm: {algorithm}")
+
+    output = os.fspath(output)
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    count = 0
+    previous = b""
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, ALGORITHMS[algorithm], width, 0))
+            for digest in _parse_corpus(source, min_count):
+                entry = digest[:width]
+                if entry < previous:
+                    raise ValueError("corpus must be sorted by hash")
+                if entry == previous:
+                    continue
+                f.write(entry)
+                previous = entry
+                count += 1
+
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, VERSION, ALGORITHMS[algorithm], width, count))
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return count
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m fastauth.validators.breached",
+        description="Build a breached-password file from a sorted hash corpus.",
+    )
+    parser.add_argument("input", help="Corpus of HASH:COUNT lines sorted by hash ('-' for stdin)")
+    parser.add_argument("output", help="Binary file to write")
+    parser.add_argument("--algorithm", choices=sorted(ALGORITHMS), default="sha1")
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--min-count", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    source: IO[str] = sys.stdin if args.input == "-" else open(args.input)
+    try:
+        count = build_breached_file(
+            source,
+            args.output,
+            algorithm=args.algorithm,
+            width=args.width,
+            min_count=args.min_count,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    sys.stderr.write(f"{count} entries written to {args.output}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,8 @@ from typing import Any, Optional
 import pytest
 from pydantic import BaseModel, ConfigDict
 
+from fastauth.crypto import set_password_hasher
+
 # -----------------
 # Mock Models
 # -----------------
@@ -51,6 +53,9 @@ class MockRedis:
         self.data[key] = value
         return True
 
+    async def getdel(self, key: str) -> Optional[bytes]:
+        return self.data.pop(key, None)
+
     async def delete(self, key: str) -> int:
         if key in self.data:
             del self.data[key]
@@ -99,6 +104,13 @@ class MockDatabaseSession:
 # -----------------
 
 
+@pytest.fixture(autouse=True)
+def reset_password_hasher():
+    # Every AuthManager installs its hasher process-wide; don't leak it
+    yield
+    set_password_hasher(None)
+
+
 @pytest.fixture
 def mock_redis():
     return MockRedis()
@@ -1,9 +1,12 @@
+import asyncio
+
 import pytest
 from fastapi import Request
 
 from fastauth.api.dependencies import (get_current_session_dependency,
                                        get_current_user_dependency)
 from fastauth.exceptions import CredentialsException
+from fastauth.users.loader import UserLoader
 
 
 class MockUser:
@@ -30,6 +33,7 @@ class MockAuthManager:
         self.strategy = None
         self.is_jwt_strategy = is_jwt
         self.user = MockUserStore()
+        self.user_loader = UserLoader(self.user)
         self.session = MockSessionStore() if has_session else None
 
 
@@ -104,3 +108,45 @@ async def test_get_current_user_stateless_jwt(mock_strategy):
 
     user = await dependency(request)
     assert user.id == "valid_user"
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_api_key_skips_session(mock_strategy):
+    # API key credentials identify the user and carry no session ID
+    auth = MockAuthManager(is_jwt=False, has_session=True)
+    auth.strategy = mock_strategy
+    mock_strategy.identifies_user = True
+
+    async def extract(r):
+        return {"sub": "valid_user", "key_id": "abc"}
+
+    mock_strategy.extract = extract
+
+    dependency = get_current_user_dependency(auth)
+    request = Request(scope={"type": "http"})
+
+    user = await dependency(request)
+    assert user.id == "valid_user"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_current_user_lookups_are_batched(mock_strategy):
+    class BatchStore(MockUserStore):
+        def __init__(self):
+            self.calls = []
+
+        async def get_many(self, user_ids):
+            self.calls.append(user_ids)
+            return [MockUser(id=user_id) for user_id in user_ids]
+
+    auth = MockAuthManager(is_jwt=True, has_session=False)
+    auth.strategy = mock_strategy
+    auth.user = BatchStore()
+    auth.user_loader = UserLoader(auth.user)
+    dependency = get_current_user_dependency(auth)
+
+    users = await asyncio.gather(
+        *(dependency(Request(scope={"type": "http"})) for _ in range(10))
+    )
+    assert {user.id for user in users} == {"valid_user"}
+    assert auth.user.calls == [["valid_user"]]
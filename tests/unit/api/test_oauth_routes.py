@@ -0,0 +1,330 @@
+import secrets
+import time
+from typing import Optional
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import httpx
+import jwt
+import pytest
+from fastapi import FastAPI, Form, Header, HTTPException
+from fastapi.responses import RedirectResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from fastauth import AuthConfig, AuthManager, OAuthConfig
+from fastauth.oauth import GitHubOAuthProvider, OIDCProvider, build_http_client
+from fastauth.oauth.state.base import code_challenge
+
+CLIENT_SECRET = "client-secret-0123456789abcdefghij"
+ISSUER = "https://idp.test"
+IDP_USERS = {
+    "ada": {"id": 1, "email": "ada@example.com", "verified": True},
+    # Claims an address the provider never verified
+    "mallory": {"id": 2, "email": "ada@example.com", "verified": False},
+    "grace": {"id": 3, "email": "grace@example.com", "verified": True},
+    "bob": {"id": 4, "email": "bob@example.com", "verified": False},
+    "anon": {"id": 5, "email": None, "verified": False},
+}
+
+
+class OAuthUserSchema(BaseModel):
+    id: Optional[str] = None
+    email: Optional[str] = None
+    username: Optional[str] = None
+    name: Optional[str] = None
+    password: str
+
+
+class EmailUserStore:
+    """Store without OAuth links; identities resolve by email only."""
+
+    def __init__(self):
+        self.users = {}
+
+    async def create(self, **kwargs):
+        user = OAuthUserSchema(id=f"user_{len(self.users) + 1}", **kwargs)
+        self.users[user.id] = user
+        return user
+
+    async def find(self, **kwargs):
+        return next(
+            (u for u in self.users.values() if u.email == kwargs.get("email")), None
+        )
+
+    async def get(self, user_id):
+        return self.users.get(user_id)
+
+
+class OAuthUserStore(EmailUserStore):
+    def __init__(self):
+        super().__init__()
+        self.links = {}
+
+    async def find_by_oauth(self, provider, subject):
+        return self.users.get(self.links.get((provider, subject)))
+
+    async def link_oauth(self, user_id, provider, subject):
+        self.links[(provider, subject)] = user_id
+
+
+class MockStrategy:
+    is_json_web_token = True
+
+    async def issue(self, response, data, ttl):
+        return {"access_token": f"token-{data['sub']}"}
+
+    async def revoke(self, response):
+        pass
+
+
+def build_idp():
+    """Stand-in IdP serving GitHub's and a generic OIDC provider's paths."""
+    idp = FastAPI()
+    idp.state.codes = {}
+
+    @idp.get("/login/oauth/authorize")
+    @idp.get("/authorize")
+    async def authorize(
+        client_id: str,
+        redirect_uri: str,
+        state: str,
+        code_challenge: str,
+        code_challenge_method: str,
+        nonce: str,
+        login: str = "ada",
+    ):
+        code = secrets.token_hex(8)
+        idp.state.codes[code] = (client_id, code_challenge, nonce, login)
+        query = urlencode({"code": code, "state": state})
+        return RedirectResponse(f"{redirect_uri}?{query}", status_code=302)
+
+    @idp.post("/login/oauth/access_token")
+    @idp.post("/token")
+    async def token(code: str = Form(), code_verifier: str = Form()):
+        entry = idp.state.codes.pop(code, None)
+        if entry is None or code_challenge(code_verifier) != entry[1]:
+            return {"error": "invalid_grant"}
+        client_id, _, nonce, login = entry
+        user = IDP_USERS[login]
+        now = int(time.time())
+        claims = {
+            "iss": ISSUER,
+            "aud": client_id,
+            "sub": str(user["id"]),
+            "email": user["email"],
+            "email_verified": user["verified"],
+            "nonce": nonce,
+            "iat": now,
+            "exp": now + 300,
+        }
+        id_token = jwt.encode(claims, CLIENT_SECRET, algorithm="HS256")
+        return {"access_token": f"at-{login}", "token_type": "bearer", "id_token": id_token}
+
+    def idp_user(authorization):
+        login = authorization.removeprefix("Bearer at-")
+        if login not in IDP_USERS:
+            raise HTTPException(status_code=401)
+        return login, IDP_USERS[login]
+
+    @idp.get("/user")
+    async def github_user(authorization: str = Header()):
+        login, user = idp_user(authorization)
+        return {"id": user["id"], "login": login, "name": None, "email": user["email"]}
+
+    @idp.get("/user/emails")
+    async def github_emails(authorization: str = Header()):
+        _, user = idp_user(authorization)
+        return [{"email": user["email"], "verified": user["verified"], "primary": True}]
+
+    @idp.get("/.well-known/openid-configuration")
+    async def discovery():
+        return {
+            "issuer": ISSUER,
+            "authorization_endpoint": f"{ISSUER}/authorize",
+            "token_endpoint": f"{ISSUER}/token",
+            "jwks_uri": f"{ISSUER}/jwks",
+            "id_token_signing_alg_values_supported": ["HS256"],
+        }
+
+    return idp
+
+
+class OAuthApp:
+    """The app under test plus a browser that follows redirects to the IdP."""
+
+    def __init__(self, user_store=None, login_fields=("email",), **oauth_config):
+        idp = build_idp()
+        http = build_http_client(transport=httpx.ASGITransport(app=idp))
+        self.user_store = user_store if user_store is not None else OAuthUserStore()
+        config = AuthConfig(
+            slug="auth",
+            login_fields=list(login_fields),
+            secure_cookies=False,
+            oauth=OAuthConfig(**oauth_config),
+        )
+        manager = AuthManager(
+            config=config,
+            user_store=self.user_store,
+            strategy=MockStrategy(),
+            schema=OAuthUserSchema,
+            oauth_providers=[
+                GitHubOAuthProvider(
+                    "gh-client",
+                    CLIENT_SECRET,
+                    redirect_uri="http://testserver/auth/oauth/github/callback",
+                    http_client=http,
+                ),
+                OIDCProvider(
+                    "acme-client",
+                    CLIENT_SECRET,
+                    redirect_uri="http://testserver/auth/oauth/acme/callback",
+                    http_client=http,
+                    issuer=ISSUER,
+                    name="acme",
+                ),
+            ],
+        )
+        app = FastAPI()
+        app.include_router(manager.router)
+        self.client = TestClient(app)
+        self.idp = TestClient(idp)
+
+    def start(self, provider, login="ada"):
+        response = self.client.get(f"/auth/oauth/{provider}", follow_redirects=False)
+        assert response.status_code == 302
+        url = urlsplit(response.headers["location"])
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        response = self.idp.get(url.path, params={**params, "login": login}, follow_redirects=False)
+        callback = urlsplit(response.headers["location"])
+        return callback.path, {k: v[0] for k, v in parse_qs(callback.query).items()}
+
+    def login(self, provider, login="ada"):
+        path, params = self.start(provider, login)
+        return self.client.get(path, params=params)
+
+
+@pytest.mark.parametrize("backend", ["memory", "signed"])
+def test_first_oauth_login_creates_and_links_the_user(backend, caplog):
+    app = OAuthApp(state_backend=backend, state_secret="s" * 32)
+
+    with caplog.at_level("INFO", logger="fastauth.audit"):
+        response = app.login("github")
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["email"], body["access_token"]) == ("ada@example.com", "token-user_1")
+    assert "password" not in body
+    assert app.user_store.links == {("github", "1"): "user_1"}
+    [event] = [r for r in caplog.records if r.getMessage() == "oauth_login"]
+    assert (event.success, event.resolution, event.provider) == (True, "created", "github")
+
+    # Later logins resolve through the link
+    assert app.login("github").json()["id"] == "user_1"
+    assert len(app.user_store.users) == 1
+
+
+def test_oauth_login_links_existing_account_by_verified_email():
+    app = OAuthApp()
+    app.user_store.users["user_9"] = OAuthUserSchema(
+        id="user_9", email="ada@example.com", password="hash"
+    )
+    response = app.login("acme")
+    assert response.json()["id"] == "user_9"
+    assert app.user_store.links == {("acme", "1"): "user_9"}
+
+
+def test_unverified_email_does_not_take_over_an_account():
+    app = OAuthApp()
+    assert app.login("github").status_code == 200
+    response = app.login("github", login="mallory")
+    assert response.status_code == 409
+    assert ("github", "2") not in app.user_store.links
+
+
+def test_oauth_login_never_creates_from_an_unverified_email():
+    app = OAuthApp()
+    assert app.login("github", login="bob").status_code == 403
+    assert app.user_store.users == {}
+
+
+def test_oauth_login_without_email_needs_a_linking_store():
+    app = OAuthApp()
+    response = app.login("github", login="anon")
+    assert response.status_code == 200
+    assert app.login("github", login="anon").json()["id"] == response.json()["id"]
+    assert len(app.user_store.users) == 1
+
+    app = OAuthApp(user_store=EmailUserStore())
+    assert app.login("github", login="anon").status_code == 403
+    assert app.user_store.users == {}
+
+
+def test_store_without_links_resolves_by_verified_email():
+    app = OAuthApp(user_store=EmailUserStore())
+    first = app.login("acme", login="grace")
+    assert first.status_code == 200
+    second = app.login("github", login="grace")
+    assert second.json()["id"] == first.json()["id"]
+    assert len(app.user_store.users) == 1
+
+    # No account created for an unverified address, so none to lock out
+    assert app.login("github", login="bob").status_code == 403
+    assert app.login("github", login="bob").status_code == 403
+    assert len(app.user_store.users) == 1
+
+
+def test_store_without_links_needs_email_as_a_login_field():
+    app = OAuthApp(user_store=EmailUserStore(), login_fields=["username"])
+    assert app.login("github", login="grace").status_code == 403
+    assert app.user_store.users == {}
+
+    # A linking store finds the identity again without email
+    app = OAuthApp(login_fields=["username"])
+    first = app.login("github", login="grace").json()["id"]
+    assert app.login("github", login="grace").json()["id"] == first
+    assert len(app.user_store.users) == 1
+
+
+def test_oauth_login_without_user_creation():
+    app = OAuthApp(create_users=False)
+    assert app.login("acme").status_code == 403
+    assert app.user_store.users == {}
+
+
+def test_oauth_state_is_single_use_and_bound_to_the_browser():
+    app = OAuthApp()
+    path, params = app.start("github")
+    cookie = app.client.cookies["auth_oauth_state"]
+
+    app.client.cookies.clear()
+    assert app.client.get(path, params=params).status_code == 400
+
+    app.client.cookies.set("auth_oauth_state", cookie, path="/auth/oauth")
+    assert app.client.get(path, params=params).status_code == 200
+    app.client.cookies.set("auth_oauth_state", cookie, path="/auth/oauth")
+    assert app.client.get(path, params=params).status_code == 400
+
+
+def test_state_from_one_provider_is_rejected_by_another():
+    app = OAuthApp()
+    _, params = app.start("github")
+    response = app.client.get("/auth/oauth/acme/callback", params=params)
+    assert response.status_code == 400
+    assert app.client.get("/auth/oauth/unknown", follow_redirects=False).status_code == 404
+
+
+def test_provider_names_must_be_unique():
+    config = AuthConfig(slug="auth", login_fields=["email"])
+    providers = [GitHubOAuthProvider("a", "b"), GitHubOAuthProvider("c", "d")]
+    with pytest.raises(ValueError, match="Duplicate OAuth provider"):
+        AuthManager(
+            config=config,
+            user_store=OAuthUserStore(),
+            strategy=MockStrategy(),
+            schema=OAuthUserSchema,
+            oauth_providers=providers,
+        )
+
+
+def test_signed_oauth_state_requires_a_secret():
+    with pytest.raises(ValueError, match="state_secret"):
+        OAuthApp(state_backend="signed")
@@ -3,8 +3,22 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from pydantic import BaseModel
 
-from fastauth import AuthConfig, AuthManager
+from fastauth import (
+    AuthConfig,
+    AuthManager,
+    HashingConfig,
+    IPAccessConfig,
+    LockoutConfig,
+    ProxyConfig,
+    RateLimitConfig,
+    RiskConfig,
+    GeoIPConfig,
+    StuffingConfig,
+)
 from fastauth.api.router import build_auth_router
+from fastauth.crypto import hash_password
+from fastauth.exceptions import ServiceUnavailableException
+from fastauth.risk import build_geoip_file
 
 
 class MockUserSchema(BaseModel):
@@ -48,23 +62,48 @@ class MockStrategy:
 
 
 @pytest.fixture
-def auth_manager():
-    config = AuthConfig(slug="auth", login_fields=["username"])
-    return AuthManager(
-        config=config,
-        user_store=MockUserStore(),
-        session_store=None,  # Stateless for simplicity
-        strategy=MockStrategy(),
-        schema=MockUserSchema,
+def make_client():
+    """Build a test client for a fresh auth router.
+
+    Keyword arguments override `AuthConfig` fields; `user_store` and
+    `session_store` go to the `AuthManager`. The manager is available as
+    `client.app.state.auth`.
+    """
+
+    def make(user_store=None, session_store=None, **config_overrides):
+        config = AuthConfig(
+            **{"slug": "auth", "login_fields": ["username"], **config_overrides}
+        )
+        manager = AuthManager(
+            config=config,
+            user_store=user_store if user_store is not None else MockUserStore(),
+            session_store=session_store,
+            strategy=MockStrategy(),
+            schema=MockUserSchema,
+        )
+        app = FastAPI()
+        app.state.auth = manager
+        app.include_router(build_auth_router(manager))
+        return TestClient(app)
+
+    return make
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client()
+
+
+def add_testuser(store, password=None):
+    store.users["testuser"] = MockUserSchema(
+        username="testuser", password=password or hash_password("password123")
     )
+    return store
 
 
 @pytest.fixture
-def client(auth_manager):
-    app = FastAPI()
-    router = build_auth_router(auth_manager)
-    app.include_router(router)
-    return TestClient(app)
+def user_store():
+    return add_testuser(MockUserStore())
 
 
 def test_signup_endpoint(client):
@@ -90,8 +129,328 @@ def test_login_endpoint(client):
     assert "access_token" in response.json()
 
 
+def test_login_rejects_oversized_password(client):
+    response = client.post(
+        "/auth/login", json={"username": "testuser", "password": "x" * 1025}
+    )
+    assert response.status_code == 401
+
+
 def test_login_invalid_credentials(client):
     response = client.post(
         "/auth/login", json={"username": "nonexistent", "password": "password"}
     )
     assert response.status_code == 401
+
+
+class RehashingUserStore(MockUserStore):
+    def __init__(self):
+        super().__init__()
+        self.updated = {}
+
+    async def update_password(self, user_id, hashed_password):
+        self.updated[user_id] = hashed_password
+
+
+def test_login_rehashes_stale_password_in_background(make_client):
+    store = add_testuser(RehashingUserStore())
+    client = make_client(
+        user_store=store,
+        hashing=HashingConfig(time_cost=1, memory_cost_kib=1024, parallelism=1),
+    )
+    manager = client.app.state.auth
+
+    response = client.post(
+        "/auth/login", json={"username": "testuser", "password": "password123"}
+    )
+    assert response.status_code == 200
+
+    new_hash = store.updated["user_123"]
+    assert "m=1024,t=1,p=1" in new_hash
+    assert manager.password_hasher.hasher.verify("password123", new_hash)
+    assert not manager.password_hasher.needs_update(new_hash)
+
+
+def test_login_migrates_legacy_hash(make_client):
+    from passlib.hash import pbkdf2_sha256
+
+    store = add_testuser(
+        RehashingUserStore(), pbkdf2_sha256.using(rounds=1000).hash("password123")
+    )
+    client = make_client(
+        user_store=store,
+        hashing=HashingConfig(
+            migrate_legacy_hashes=True, time_cost=1, memory_cost_kib=1024, parallelism=1
+        ),
+    )
+
+    response = client.post(
+        "/auth/login", json={"username": "testuser", "password": "password123"}
+    )
+    assert response.status_code == 200
+    assert store.updated["user_123"].startswith("$argon2id$")
+
+
+def test_login_skips_rehash_for_current_hash(make_client):
+    store = add_testuser(RehashingUserStore())
+    client = make_client(user_store=store)
+
+    response = client.post(
+        "/auth/login", json={"username": "testuser", "password": "password123"}
+    )
+    assert response.status_code == 200
+    assert store.updated == {}
+
+
+def test_login_rate_limited_by_identifier(make_client, user_store):
+    client = make_client(
+        user_store=user_store,
+        rate_limit=RateLimitConfig(enabled=True, login_identifier_limit=2),
+    )
+
+    for _ in range(2):
+        response = client.post(
+            "/auth/login", json={"username": "TestUser", "password": "wrong"}
+        )
+        assert response.status_code == 401
+
+    response = client.post(
+        "/auth/login", json={"username": "testuser", "password": "password123"}
+    )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_login_rejected_by_identifier_limit_keeps_ip_allowance(make_client):
+    client = make_client(
+        rate_limit=RateLimitConfig(
+            enabled=True, login_ip_limit=4, login_identifier_limit=1
+        )
+    )
+    body = {"username": "victim", "password": "guess"}
+
+    statuses = [client.post("/auth/login", json=body).status_code for _ in range(5)]
+    assert statuses == [401, 429, 429, 429, 429]
+    # Only the one allowed attempt used the client's IP allowance
+    for i in range(3):
+        response = client.post(
+            "/auth/login", json={"username": f"user{i}", "password": "guess"}
+        )
+        assert response.status_code == 401
+    response = client.post("/auth/login", json={"username": "user3", "password": "guess"})
+    assert response.status_code == 429
+
+
+def test_login_blocked_by_risk_score(make_client, user_store):
+    client = make_client(
+        user_store=user_store,
+        # no decay, so a window rotating mid-test cannot lower the score
+        risk=RiskConfig(
+            enabled=True, block_score=1.0, identifier_failure_threshold=3, decay=1.0
+        ),
+    )
+
+    for _ in range(3):
+        response = client.post(
+            "/auth/login", json={"username": "testuser", "password": "wrong"}
+        )
+        assert response.status_code == 401
+
+    response = client.post(
+        "/auth/login", json={"username": "testuser", "password": "password123"}
+    )
+    assert response.status_code == 429
+
+
+def test_login_blocked_by_credential_stuffing(make_client):
+    client = make_client(
+        stuffing=StuffingConfig(enabled=True, block=True, ip_threshold=5)
+    )
+
+    for i in range(4):
+        response = client.post(
+            "/auth/login", json={"username": f"victim{i}", "password": "guess"}
+        )
+        assert response.status_code == 401
+
+    response = client.post(
+        "/auth/login", json={"username": "victim4", "password": "guess"}
+    )
+    assert response.status_code == 429
+    assert client.app.state.auth.stuffing.is_flagged("testclient")
+
+
+class RecordingSessionStore:
+    def __init__(self):
+        self.created = []
+
+    async def create(self, user_id, data, ttl):
+        self.created.append(data)
+        return "session_123"
+
+
+def test_login_session_records_country_and_asn(make_client, user_store, tmp_path):
+    table = tmp_path / "geoip.bin"
+    build_geoip_file(
+        table,
+        ["203.0.113.0,203.0.113.255,NZ"],
+        ["203.0.113.0/24,64501,EXAMPLE"],
+    )
+    sessions = RecordingSessionStore()
+    client = make_client(
+        user_store=user_store,
+        session_store=sessions,
+        geoip=GeoIPConfig(enabled=True, path=str(table)),
+    )
+
+    response = client.post(
+        "/auth/login",
+        json={"username": "testuser", "password": "password123"},
+        headers={"X-Forwarded-For": "203.0.113.9"},
+    )
+    assert response.status_code == 200
+    assert sessions.created[0]["country"] == "NZ"
+    assert sessions.created[0]["asn"] == 64501
+    # The test client identifies itself as "testclient"
+    assert sessions.created[0]["device_class"] == "other"
+
+    client.post(
+        "/auth/login",
+        json={"username": "testuser", "password": "password123"},
+        headers={"X-Forwarded-For": "198.51.100.1"},
+    )
+    assert "country" not in sessions.created[1]
+
+
+def test_geoip_enabled_requires_a_table(make_client):
+    with pytest.raises(ValueError, match="geoip"):
+        make_client(geoip=GeoIPConfig(enabled=True))
+
+
+def test_login_lockout_blocks_before_hashing(make_client, user_store):
+    client = make_client(
+        user_store=user_store,
+        lockout=LockoutConfig(enabled=True, threshold=3, base_delay_seconds=30),
+    )
+    manager = client.app.state.auth
+    verified = []
+    verify = manager.password_hasher.verify
+
+    async def counting_verify(password, hashed):
+        verified.append(password)
+        return await verify(password, hashed)
+
+    manager.password_hasher.verify = counting_verify
+
+    # A success clears earlier failures
+    for password in ("wrong", "wrong", "password123"):
+        client.post("/auth/login", json={"username": "testuser", "password": password})
+    for _ in range(3):
+        response = client.post(
+            "/auth/login", json={"username": "testuser", "password": "wrong"}
+        )
+        assert response.status_code == 401
+
+    response = client.post(
+        "/auth/login", json={"username": "testuser", "password": "password123"}
+    )
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+    assert len(verified) == 6
+
+
+def test_login_lockout_refunds_attempts_the_hasher_shed(make_client, user_store):
+    client = make_client(
+        user_store=user_store,
+        lockout=LockoutConfig(enabled=True, threshold=2, base_delay_seconds=30),
+    )
+    manager = client.app.state.auth
+    verify = manager.password_hasher.verify
+    overloaded = [True]
+
+    async def shedding_verify(password, hashed):
+        if overloaded[0]:
+            raise ServiceUnavailableException(retry_after=1)
+        return await verify(password, hashed)
+
+    manager.password_hasher.verify = shedding_verify
+    body = {"username": "testuser", "password": "password123"}
+
+    for _ in range(5):
+        assert client.post("/auth/login", json=body).status_code == 503
+    overloaded[0] = False
+    assert client.post("/auth/login", json=body).status_code == 200
+
+    # Real failures still count
+    client.post("/auth/login", json={**body, "password": "wrong"})
+    overloaded[0] = True
+    assert client.post("/auth/login", json=body).status_code == 503
+    assert manager.lockout.failures("username:testuser") == 1
+
+
+def test_login_with_an_unverifiable_legacy_hash_is_rejected(make_client):
+    client = make_client(
+        user_store=add_testuser(MockUserStore(), "pbkdf2:sha256$salt$00ff"),
+        hashing=HashingConfig(migrate_legacy_hashes=True),
+    )
+    response = client.post(
+        "/auth/login", json={"username": "testuser", "password": "password123"}
+    )
+    assert response.status_code == 401
+
+
+def test_login_rate_limit_ignores_spoofed_forwarded_for(make_client):
+    client = make_client(
+        proxy=ProxyConfig(enabled=True, trusted_proxies=["10.0.0.0/8"]),
+        rate_limit=RateLimitConfig(enabled=True, login_ip_limit=2),
+    )
+
+    statuses = [
+        client.post(
+            "/auth/login",
+            json={"username": f"user{i}", "password": "guess"},
+            headers={"X-Forwarded-For": f"198.51.100.{i}"},
+        ).status_code
+        for i in range(3)
+    ]
+    assert statuses == [401, 401, 429]
+
+
+def test_ip_access_list_blocks_auth_routes(make_client, tmp_path):
+    deny_file = tmp_path / "deny.txt"
+    deny_file.write_text("203.0.113.0/24\n")
+    app = make_client(
+        ip_access=IPAccessConfig(enabled=True, deny_file=str(deny_file))
+    ).app
+    body = {"username": "someone", "password": "guess"}
+
+    denied = TestClient(app, client=("203.0.113.5", 5000)).post("/auth/login", json=body)
+    assert denied.status_code == 403
+    allowed = TestClient(app, client=("192.0.2.5", 5000)).post("/auth/login", json=body)
+    assert allowed.status_code == 401
+
+    # Without proxy config, forwarding headers are client-controlled
+    spoofed = TestClient(app, client=("203.0.113.5", 5000)).post(
+        "/auth/login",
+        json=body,
+        headers={"X-Forwarded-For": "192.0.2.5", "X-Real-IP": "192.0.2.5"},
+    )
+    assert spoofed.status_code == 403
+
+
+def test_ip_access_requires_a_list(make_client):
+    with pytest.raises(ValueError, match="ip_access"):
+        make_client(ip_access=IPAccessConfig(enabled=True))
+
+
+def test_audit_events_carry_request_id(make_client, caplog):
+    client = make_client(rate_limit=RateLimitConfig(enabled=True, login_ip_limit=1))
+    body = {"username": "someone", "password": "guess"}
+
+    client.post("/auth/login", json=body)
+    with caplog.at_level("INFO", logger="fastauth.audit"):
+        response = client.post("/auth/login", json=body, headers={"X-Request-ID": "req-7"})
+    assert response.status_code == 429
+    [event] = [r for r in caplog.records if r.getMessage() == "rate_limited"]
+    assert event.request_id == "req-7"
+    assert event.ip_address == "testclient"
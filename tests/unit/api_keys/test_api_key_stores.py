@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from fastauth.api_keys import MemoryAPIKeyStore, SQLAPIKeyStore
+
+
+class MockAPIKeyModel:
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    prefix = None
+    user_id = None
+    key_hash = None
+    name = None
+    scopes = None
+    expires_at = None
+    created_at = None
+
+
+@pytest.mark.asyncio
+async def test_memory_api_key_store():
+    store = MemoryAPIKeyStore()
+    await store.create("abc", "user_123", "digest", {"name": "ci", "scopes": ["read"]})
+
+    record = await store.get("abc")
+    assert record["user_id"] == "user_123"
+    assert record["scopes"] == ["read"]
+    assert len(await store.get_by_user("user_123")) == 1
+
+    await store.delete("abc")
+    assert await store.get("abc") is None
+    assert await store.get_by_user("user_123") is None
+
+
+@pytest.mark.asyncio
+async def test_memory_api_key_store_expiration():
+    store = MemoryAPIKeyStore()
+    await store.create("abc", "user_123", "digest", {}, ttl=60)
+    store.store["abc"]["expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+    assert await store.get("abc") is None
+    assert "abc" not in store.store
+
+
+@pytest.mark.asyncio
+async def test_sql_api_key_store(mock_db_session):
+    store = SQLAPIKeyStore(MockAPIKeyModel, mock_db_session)
+    await store.create("abc", "user_123", "digest", {"scopes": ["read", "write"]})
+
+    row = mock_db_session.added[0]
+    assert row.scopes == "read write"
+
+    record = await store.get("abc")
+    assert record["key_hash"] == "digest"
+    assert record["scopes"] == ["read", "write"]
+
+    await store.delete("abc")
+    assert len(mock_db_session.deleted) == 1
+
+
+def test_sql_api_key_store_validates_model(mock_db_session):
+    with pytest.raises(ValueError, match="missing required fields"):
+        SQLAPIKeyStore(object, mock_db_session)
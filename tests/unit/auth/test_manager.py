@@ -1,7 +1,8 @@
 import pytest
 from pydantic import BaseModel
 
-from fastauth import AuthConfig, AuthManager
+from fastauth import AuthConfig, AuthManager, HashingConfig
+from fastauth.crypto import ahash_password, configure_password_hasher, get_password_hasher
 
 
 class TestSchema(BaseModel):
@@ -53,3 +54,39 @@ def test_auth_manager_validation_stateless_opaque():
             strategy=MockStrategy(is_jwt=False),
             schema=TestSchema,
         )
+
+
+def test_auth_manager_api_key_strategy_needs_no_session_store():
+    from fastauth.api_keys import MemoryAPIKeyStore
+    from fastauth.strategies import APIKeyStrategy
+
+    config = AuthConfig(slug="auth", login_fields=["username"])
+    manager = AuthManager(
+        config=config,
+        user_store=None,
+        session_store=None,
+        strategy=APIKeyStrategy(MemoryAPIKeyStore()),
+        schema=TestSchema,
+    )
+    assert manager.identifies_user is True
+
+
+@pytest.mark.asyncio
+async def test_auth_manager_hasher_backs_the_module_helpers():
+    default = configure_password_hasher(max_workers=1)
+    manager = AuthManager(
+        config=AuthConfig(
+            slug="auth",
+            login_fields=["username"],
+            hashing=HashingConfig(time_cost=1, memory_cost_kib=1024, parallelism=1),
+        ),
+        user_store=None,
+        session_store=None,
+        strategy=MockStrategy(is_jwt=True),
+        schema=TestSchema,
+    )
+    # One pool per process: the helpers hash on the manager's pool
+    assert get_password_hasher() is manager.password_hasher
+    assert "m=1024,t=1,p=1" in await ahash_password("secret")
+    assert manager.password_hasher.stats()["completed"] == 1
+    assert default.stats()["completed"] == 0
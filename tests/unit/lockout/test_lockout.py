@@ -0,0 +1,197 @@
+import time
+
+import pytest
+
+from fastauth.lockout import MemoryLockoutStore, RedisLockoutStore
+from fastauth.lockout.base import backoff_delay
+from fastauth.lockout.redis import LOCKOUT_SCRIPT, LOCKOUT_SHA, REFUND_SCRIPT, REFUND_SHA
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+class LuaRedis:
+    """Redis double running the lockout scripts' logic in Python."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.scripts = set()
+        self.calls = 0
+
+    async def evalsha(self, sha, numkeys, key, *args):
+        if sha not in self.scripts:
+            raise Exception("NOSCRIPT No matching script")
+        if sha == REFUND_SHA:
+            return self._refund(key, *args)
+        return self._lockout(key, *args)
+
+    async def eval(self, script, numkeys, key, *args):
+        assert script in (LOCKOUT_SCRIPT, REFUND_SCRIPT)
+        if script == REFUND_SCRIPT:
+            self.scripts.add(REFUND_SHA)
+            return self._refund(key, *args)
+        self.scripts.add(LOCKOUT_SHA)
+        return self._lockout(key, *args)
+
+    async def delete(self, key):
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def _lockout(self, key, threshold, base_delay, max_delay, reset_after):
+        self.calls += 1
+        now = int(time.time() * 1000)
+        failures = 0
+        if key in self.data and self.ttls[key] > now:
+            failures, locked_until = map(int, self.data[key].split(":"))
+            if locked_until > now:
+                return locked_until - now
+        failures += 1
+        delay = int(backoff_delay(failures, threshold, base_delay, max_delay))
+        self.data[key] = f"{failures}:{now + delay}"
+        self.ttls[key] = now + delay + reset_after
+        return 0
+
+    def _refund(self, key, threshold, base_delay, max_delay, reset_after):
+        self.calls += 1
+        now = int(time.time() * 1000)
+        if key not in self.data or self.ttls[key] <= now:
+            return 0
+        failures, locked_until = map(int, self.data[key].split(":"))
+        last_failure = locked_until - int(
+            backoff_delay(failures, threshold, base_delay, max_delay)
+        )
+        failures -= 1
+        locked_until = last_failure + int(
+            backoff_delay(failures, threshold, base_delay, max_delay)
+        )
+        if failures <= 0 or locked_until + reset_after <= now:
+            del self.data[key]
+        else:
+            self.data[key] = f"{failures}:{locked_until}"
+            self.ttls[key] = locked_until + reset_after
+        return 0
+
+
+def test_backoff_delay_doubles_and_caps():
+    delays = [backoff_delay(n, 3, 1.0, 10.0) for n in range(1, 9)]
+    assert delays == [0.0, 0.0, 1.0, 2.0, 4.0, 8.0, 10.0, 10.0]
+    assert backoff_delay(10**6, 3, 1.0, 10.0) == 10.0
+
+
+@pytest.mark.asyncio
+async def test_memory_lockout_backs_off_exponentially(clock):
+    store = MemoryLockoutStore(threshold=3, base_delay_seconds=1, max_delay_seconds=8)
+
+    for _ in range(3):
+        assert await store.attempt("id:alice") == 0.0
+    # Third failure armed a 1s lock
+    assert await store.attempt("id:alice") == pytest.approx(1.0)
+
+    clock[0] += 1
+    assert await store.attempt("id:alice") == 0.0
+    assert await store.attempt("id:alice") == pytest.approx(2.0)
+
+    clock[0] += 2
+    assert await store.attempt("id:alice") == 0.0
+    assert await store.attempt("id:alice") == pytest.approx(4.0)
+    assert store.failures("id:alice") == 5
+
+
+@pytest.mark.asyncio
+async def test_memory_lockout_is_per_identifier(clock):
+    store = MemoryLockoutStore(threshold=1)
+    assert await store.attempt("id:alice") == 0.0
+    assert await store.attempt("id:alice") > 0
+    assert await store.attempt("id:bob") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_memory_lockout_reset_clears_failures(clock):
+    store = MemoryLockoutStore(threshold=2)
+    await store.attempt("id:alice")
+    await store.reset("id:alice")
+    assert store.failures("id:alice") == 0
+    assert await store.attempt("id:alice") == 0.0
+    assert await store.attempt("id:alice") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_memory_lockout_forgets_failures_lazily(clock):
+    store = MemoryLockoutStore(threshold=3, reset_after_seconds=60)
+    await store.attempt("id:alice")
+    await store.attempt("id:alice")
+
+    clock[0] += 60
+    assert store.failures("id:alice") == 0
+    # The stale record still occupies its slot until touched
+    assert "id:alice" in store.store
+    assert await store.attempt("id:alice") == 0.0
+    assert store.failures("id:alice") == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_lockout_bounds_tracked_identifiers(clock):
+    store = MemoryLockoutStore(max_keys=100)
+    for i in range(1000):
+        await store.attempt(f"id:user{i}")
+    assert len(store.store) <= 100
+    assert all(isinstance(record, int) for record in store.store.values())
+
+
+@pytest.mark.asyncio
+async def test_redis_lockout_uses_one_script_per_attempt(clock):
+    redis = LuaRedis()
+    store = RedisLockoutStore(redis, threshold=2, base_delay_seconds=5)
+
+    assert await store.attempt("id:alice") == 0.0
+    assert await store.attempt("id:alice") == 0.0
+    assert await store.attempt("id:alice") == pytest.approx(5.0)
+    assert redis.calls == 3
+    assert redis.data["lockout:id:alice"] == "2:1005000"
+
+    clock[0] += 5
+    assert await store.attempt("id:alice") == 0.0
+    assert await store.attempt("id:alice") == pytest.approx(10.0)
+
+    await store.reset("id:alice")
+    assert await store.attempt("id:alice") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_memory_lockout_refund_uncounts_one_failure(clock):
+    store = MemoryLockoutStore(threshold=2, base_delay_seconds=5)
+    await store.attempt("id:alice")
+    await store.attempt("id:alice")
+    assert await store.attempt("id:alice") == pytest.approx(5.0)
+
+    # Uncounting the failure that armed the lock lifts it
+    await store.refund("id:alice")
+    assert store.failures("id:alice") == 1
+    assert await store.attempt("id:alice") == 0.0
+
+    await store.refund("id:alice")
+    await store.refund("id:alice")
+    assert store.failures("id:alice") == 0
+    assert "id:alice" not in store.store
+
+
+@pytest.mark.asyncio
+async def test_redis_lockout_refund_uncounts_one_failure(clock):
+    redis = LuaRedis()
+    store = RedisLockoutStore(redis, threshold=2, base_delay_seconds=5)
+    await store.attempt("id:alice")
+    await store.attempt("id:alice")
+    assert redis.data["lockout:id:alice"] == "2:1005000"
+
+    await store.refund("id:alice")
+    assert redis.data["lockout:id:alice"] == "1:1000000"
+    assert await store.attempt("id:alice") == 0.0
+
+    await store.refund("id:alice")
+    await store.refund("id:alice")
+    assert "lockout:id:alice" not in redis.data
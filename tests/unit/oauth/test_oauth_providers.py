@@ -0,0 +1,217 @@
+import asyncio
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import jwt
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, Form, Header, HTTPException
+
+from fastauth.exceptions import OAuthException
+from fastauth.oauth import (
+    GitHubOAuthProvider,
+    GoogleOAuthProvider,
+    build_http_client,
+    clear_provider_cache,
+    close_http_client,
+    get_http_client,
+    get_provider,
+)
+
+CLIENT_SECRET = "client-secret-0123456789abcdefghij"
+
+
+def build_idp(email_scope=True):
+    """Stand-in identity provider serving Google's and GitHub's endpoint paths."""
+    idp = FastAPI()
+    idp.state.token_requests = []
+
+    @idp.get("/.well-known/openid-configuration")
+    async def discovery():
+        return {
+            "issuer": "https://accounts.google.com",
+            "authorization_endpoint": "https://accounts.google.com/o/oauth2/v2/auth",
+            "token_endpoint": "https://idp.test/token",
+            "userinfo_endpoint": "https://idp.test/v1/userinfo",
+            "jwks_uri": "https://idp.test/certs",
+            "id_token_signing_alg_values_supported": ["HS256"],
+        }
+
+    @idp.post("/token")
+    @idp.post("/login/oauth/access_token")
+    async def token(code: str = Form(), client_id: str = Form(), client_secret: str = Form()):
+        idp.state.token_requests.append(code)
+        if code != "good-code" or client_secret != CLIENT_SECRET:
+            return {"error": "bad_verification_code"}
+        now = int(time.time())
+        claims = {
+            "iss": "https://accounts.google.com",
+            "aud": client_id,
+            "sub": "1087",
+            "email": "ada@example.com",
+            "email_verified": True,
+            "iat": now,
+            "exp": now + 300,
+        }
+        id_token = jwt.encode(claims, client_secret, algorithm="HS256")
+        return {"access_token": "at-123", "token_type": "bearer", "id_token": id_token}
+
+    def check(authorization):
+        if authorization != "Bearer at-123":
+            raise HTTPException(status_code=401)
+
+    @idp.get("/v1/userinfo")
+    async def userinfo(authorization: str = Header()):
+        check(authorization)
+        return {"sub": "1087", "email": "ada@example.com", "email_verified": True, "name": "Ada"}
+
+    @idp.get("/user")
+    async def github_user(authorization: str = Header()):
+        check(authorization)
+        return {"id": 42, "login": "ada", "name": None, "email": "public@example.com"}
+
+    @idp.get("/user/emails")
+    async def github_emails(authorization: str = Header()):
+        check(authorization)
+        if not email_scope:
+            raise HTTPException(status_code=403)
+        return [
+            {"email": "old@example.com", "verified": True, "primary": False},
+            {"email": "ada@example.com", "verified": True, "primary": True},
+        ]
+
+    return idp
+
+
+@pytest.fixture
+def idp():
+    return build_idp()
+
+
+@pytest_asyncio.fixture
+async def idp_client(idp):
+    client = build_http_client(transport=httpx.ASGITransport(app=idp))
+    yield client
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_google_authorization_url(idp_client):
+    provider = GoogleOAuthProvider(
+        "id", CLIENT_SECRET, redirect_uri="https://app.test/cb", http_client=idp_client
+    )
+    url = urlsplit(await provider.get_authorization_url(state="s1", prompt="consent"))
+    assert url.netloc == "accounts.google.com"
+    assert parse_qs(url.query) == {
+        "response_type": ["code"],
+        "client_id": ["id"],
+        "redirect_uri": ["https://app.test/cb"],
+        "scope": ["openid email profile"],
+        "state": ["s1"],
+        "prompt": ["consent"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_google_login_flow(idp_client):
+    provider = GoogleOAuthProvider("id", CLIENT_SECRET, http_client=idp_client)
+    token_data = await provider.exchange_code("good-code")
+    user = await provider.fetch_user(token_data)
+    assert user["provider"] == "google"
+    assert user["raw"]["iss"] == "https://accounts.google.com"
+    assert user["id"] == "1087"
+    assert user["email"] == "ada@example.com"
+    assert user["email_verified"] is True
+
+
+@pytest.mark.asyncio
+async def test_google_accepts_issuer_without_scheme(idp_client):
+    provider = GoogleOAuthProvider("id", CLIENT_SECRET, http_client=idp_client)
+    now = int(time.time())
+    claims = {"aud": "id", "sub": "1087", "iat": now, "exp": now + 300}
+
+    token = jwt.encode({**claims, "iss": "accounts.google.com"}, CLIENT_SECRET, "HS256")
+    assert (await provider.verify_id_token(token))["sub"] == "1087"
+
+    token = jwt.encode({**claims, "iss": "https://evil.test"}, CLIENT_SECRET, "HS256")
+    with pytest.raises(OAuthException, match="issuer"):
+        await provider.verify_id_token(token)
+
+
+@pytest.mark.asyncio
+async def test_github_reports_errors_in_200_responses(idp, idp_client):
+    provider = GitHubOAuthProvider("id", CLIENT_SECRET, http_client=idp_client)
+    with pytest.raises(OAuthException, match="bad_verification_code"):
+        await provider.exchange_code("bad-code")
+    assert idp.state.token_requests == ["bad-code"]
+
+
+@pytest.mark.asyncio
+async def test_github_prefers_primary_verified_email(idp_client):
+    provider = GitHubOAuthProvider("id", CLIENT_SECRET, http_client=idp_client)
+    user = await provider.fetch_user(await provider.exchange_code("good-code"))
+    assert user["id"] == "42"
+    assert user["name"] == "ada"
+    assert (user["email"], user["email_verified"]) == ("ada@example.com", True)
+
+
+@pytest.mark.asyncio
+async def test_github_without_email_scope_falls_back_to_unverified_profile_email():
+    async with build_http_client(
+        transport=httpx.ASGITransport(app=build_idp(email_scope=False))
+    ) as client:
+        provider = GitHubOAuthProvider("id", CLIENT_SECRET, http_client=client)
+        user = await provider.fetch_user({"access_token": "at-123"})
+    assert (user["email"], user["email_verified"]) == ("public@example.com", False)
+
+
+@pytest.mark.asyncio
+async def test_provider_errors_become_oauth_exceptions(idp_client):
+    provider = GoogleOAuthProvider("id", CLIENT_SECRET, http_client=idp_client)
+    with pytest.raises(OAuthException) as exc_info:
+        # Without an ID token the user comes from the userinfo endpoint
+        await provider.fetch_user({"access_token": "expired"})
+    assert exc_info.value.status_code == 400
+
+    def refuse(request):
+        raise httpx.ConnectError("connection refused")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(refuse)) as client:
+        provider = GoogleOAuthProvider("id", CLIENT_SECRET, http_client=client)
+        with pytest.raises(OAuthException) as exc_info:
+            await provider.exchange_code("good-code")
+    assert exc_info.value.status_code == 502
+
+
+@pytest.mark.asyncio
+async def test_shared_client_is_reused_per_loop():
+    client = get_http_client()
+    assert get_http_client() is client
+    provider = GoogleOAuthProvider("id", CLIENT_SECRET)
+    assert provider.http is client
+
+    await close_http_client()
+    assert client.is_closed
+    replacement = get_http_client()
+    assert replacement is not client
+    await close_http_client()
+
+
+def test_shared_client_is_bound_to_its_loop():
+    async def current():
+        return get_http_client()
+
+    first = asyncio.run(current())
+    second = asyncio.run(current())
+    assert first is not second
+
+
+def test_registry_caches_provider_instances():
+    clear_provider_cache()
+    google = get_provider("google", client_id="id", client_secret=CLIENT_SECRET, scopes=["openid"])
+    assert get_provider("google", scopes=["openid"], client_secret=CLIENT_SECRET, client_id="id") is google
+    assert get_provider("google", client_id="other", client_secret=CLIENT_SECRET) is not google
+    assert isinstance(get_provider("github", client_id="id", client_secret=CLIENT_SECRET), GitHubOAuthProvider)
+    with pytest.raises(KeyError):
+        get_provider("myspace")
@@ -0,0 +1,130 @@
+import pytest
+
+from fastauth.exceptions import ServiceUnavailableException
+from fastauth.oauth.state import (
+    MemoryOAuthStateStore,
+    RedisOAuthStateStore,
+    SignedOAuthStateStore,
+)
+from fastauth.oauth.state import memory, signed
+from fastauth.oauth.state.base import code_challenge
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    class Clock:
+        now = 1000.0
+
+        def __call__(self):
+            return self.now
+
+    clock = Clock()
+    monkeypatch.setattr(memory.time, "monotonic", clock)
+    monkeypatch.setattr(signed.time, "time", clock)
+    return clock
+
+
+def test_code_challenge_matches_rfc7636_example():
+    verifier = "dBjftJeZ4CVP-mB92K27uhbUJU1p1r_wW1gFWFOEjXk"
+    assert code_challenge(verifier) == "E9Melhoa2OwvFrEMTJguCHaoeK1t8URWbuGJSstw-cM"
+
+
+@pytest.mark.asyncio
+async def test_memory_state_is_consumed_once():
+    store = MemoryOAuthStateStore()
+    flow = await store.create("google")
+    assert 43 <= len(flow.code_verifier) <= 128
+    assert await store.consume(flow.state, "github") is None
+    assert await store.consume(flow.state, "google") is None
+
+    flow = await store.create("google")
+    assert await store.consume(flow.state, "google") == flow
+    assert await store.consume(flow.state, "google") is None
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_timing_wheel_expires_flows(clock):
+    store = MemoryOAuthStateStore(ttl_seconds=10)
+    old = [await store.create("google") for _ in range(3)]
+    clock.now += 5
+    fresh = await store.create("google")
+
+    clock.now += 6
+    assert await store.consume(old[0].state, "google") is None
+    # Swept by the wheel, not just rejected on lookup
+    assert len(store) == 1
+    assert await store.consume(fresh.state, "google") == fresh
+
+    await store.create("google")
+    clock.now += 3600
+    await store.create("google")
+    assert len(store) == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_state_refuses_flows_when_full():
+    store = MemoryOAuthStateStore(max_states=2)
+    await store.create("google")
+    flow = await store.create("google")
+    with pytest.raises(ServiceUnavailableException):
+        await store.create("google")
+    await store.consume(flow.state, "google")
+    await store.create("google")
+
+
+@pytest.mark.asyncio
+async def test_redis_state_is_consumed_once(mock_redis):
+    store = RedisOAuthStateStore(mock_redis)
+    flow = await store.create("google")
+    assert mock_redis.data[f"oauth_state:{flow.state}"].startswith("google ")
+    assert await store.consume(flow.state, "google") == flow
+    assert await store.consume(flow.state, "google") is None
+
+    flow = await store.create("google")
+    assert await store.consume(flow.state, "github") is None
+    assert mock_redis.data == {}
+
+
+@pytest.mark.asyncio
+async def test_signed_state_round_trips_without_storage():
+    issuer = SignedOAuthStateStore("secret-key")
+    flow = await issuer.create("google")
+    # Another process with the same secret derives the same verifier and nonce
+    assert await SignedOAuthStateStore("secret-key").consume(flow.state, "google") == flow
+    assert await issuer.consume(flow.state, "google") == flow
+    assert await issuer.consume(flow.state, "google") is None
+
+
+@pytest.mark.asyncio
+async def test_signed_state_rejects_forgeries():
+    store = SignedOAuthStateStore("secret-key")
+    flow = await store.create("google")
+    tampered = flow.state[:-2] + ("AA" if flow.state[-2:] != "AA" else "BB")
+    assert await store.consume(tampered, "google") is None
+    assert await store.consume(flow.state, "github") is None
+    assert await SignedOAuthStateStore("other-key").consume(flow.state, "google") is None
+    assert await store.consume("not-a-state", "google") is None
+    assert await store.consume("!" * len(flow.state), "google") is None
+
+
+@pytest.mark.asyncio
+async def test_signed_state_expires_and_keeps_two_replay_windows(clock):
+    store = SignedOAuthStateStore("secret-key", ttl_seconds=600, replay_bits=1 << 10)
+    flow = await store.create("google")
+    clock.now += 600
+    assert await store.consume(flow.state, "google") is None
+
+    for _ in range(4):
+        flow = await store.create("google")
+        assert await store.consume(flow.state, "google") == flow
+        clock.now += 600
+    assert len(store._windows) <= 2
+    assert all(len(bitmap) == 128 for bitmap in store._windows.values())
+
+
+def test_signed_state_validates_settings():
+    with pytest.raises(ValueError):
+        SignedOAuthStateStore("")
+    with pytest.raises(ValueError):
+        SignedOAuthStateStore("secret-key", replay_bits=1000)
@@ -0,0 +1,253 @@
+import asyncio
+import base64
+import time
+from collections import Counter
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import httpx
+import jwt
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, Response
+
+from fastauth.exceptions import OAuthException
+from fastauth.oauth import JWKSCache, OIDCProvider, build_http_client
+from fastauth.oauth import oidc
+
+ISSUER = "https://idp.test"
+CLIENT_SECRET = "client-secret-0123456789abcdefghij"
+
+
+def oct_jwk(kid, secret, **extra):
+    k = base64.urlsafe_b64encode(secret.encode()).rstrip(b"=").decode()
+    return {"kty": "oct", "kid": kid, "k": k, "alg": "HS256", **extra}
+
+
+def build_idp():
+    """Stand-in OIDC provider counting hits per endpoint."""
+    idp = FastAPI()
+    idp.state.hits = Counter()
+    idp.state.issuer = ISSUER
+    idp.state.algorithms = ["HS256"]
+    idp.state.jwks = [oct_jwk("k1", "k" * 32)]
+    idp.state.jwks_status = 200
+
+    @idp.get("/.well-known/openid-configuration")
+    async def discovery():
+        idp.state.hits["discovery"] += 1
+        await asyncio.sleep(0.01)
+        return {
+            "issuer": idp.state.issuer,
+            "authorization_endpoint": f"{ISSUER}/authorize",
+            "token_endpoint": f"{ISSUER}/token",
+            "userinfo_endpoint": f"{ISSUER}/userinfo",
+            "jwks_uri": f"{ISSUER}/jwks",
+            "id_token_signing_alg_values_supported": idp.state.algorithms,
+        }
+
+    @idp.get("/jwks")
+    async def jwks(response: Response):
+        idp.state.hits["jwks"] += 1
+        await asyncio.sleep(0.01)
+        response.status_code = idp.state.jwks_status
+        response.headers["Cache-Control"] = "public, max-age=100"
+        return {"keys": idp.state.jwks}
+
+    @idp.get("/userinfo")
+    async def userinfo():
+        idp.state.hits["userinfo"] += 1
+        return {"sub": "u1", "email": "ada@example.com"}
+
+    return idp
+
+
+@pytest.fixture
+def idp():
+    return build_idp()
+
+
+@pytest_asyncio.fixture
+async def idp_client(idp):
+    client = build_http_client(transport=httpx.ASGITransport(app=idp))
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(oidc, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def id_token(key=CLIENT_SECRET, headers=None, **overrides):
+    now = int(time.time())
+    claims = {"iss": ISSUER, "aud": "client", "sub": "u1", "iat": now, "exp": now + 300}
+    claims.update(overrides)
+    claims = {name: value for name, value in claims.items() if value is not None}
+    return jwt.encode(claims, key, algorithm="HS256", headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_discovery_is_fetched_once_for_concurrent_logins(idp, idp_client):
+    provider = OIDCProvider("client", CLIENT_SECRET, http_client=idp_client, issuer=ISSUER)
+    urls = await asyncio.gather(*(provider.get_authorization_url(state="s") for _ in range(10)))
+    assert idp.state.hits["discovery"] == 1
+    assert {urlsplit(url).path for url in urls} == {"/authorize"}
+    assert provider.token_url == f"{ISSUER}/token"
+
+
+@pytest.mark.asyncio
+async def test_discovery_rejects_a_foreign_issuer(idp, idp_client):
+    idp.state.issuer = "https://evil.test"
+    provider = OIDCProvider("client", CLIENT_SECRET, http_client=idp_client, issuer=ISSUER)
+    with pytest.raises(OAuthException, match="does not match"):
+        await provider.discover()
+
+
+def test_issuer_is_required():
+    with pytest.raises(ValueError, match="issuer"):
+        OIDCProvider("client", CLIENT_SECRET)
+
+
+@pytest.mark.asyncio
+async def test_fetch_user_verifies_id_token_without_userinfo_call(idp, idp_client):
+    provider = OIDCProvider(
+        "client", CLIENT_SECRET, http_client=idp_client, issuer=ISSUER, name="acme"
+    )
+    token = id_token(email="ada@example.com", email_verified=True, nonce="n1")
+    user = await provider.fetch_user({"access_token": "at", "id_token": token}, nonce="n1")
+    assert (user["provider"], user["id"], user["email_verified"]) == ("acme", "u1", True)
+    assert idp.state.hits["userinfo"] == 0
+
+    user = await provider.fetch_user({"access_token": "at"})
+    assert user["email"] == "ada@example.com"
+    assert idp.state.hits["userinfo"] == 1
+
+
+@pytest.mark.parametrize(
+    "overrides, nonce",
+    [
+        ({"aud": "someone-else"}, None),
+        ({"iss": "https://evil.test"}, None),
+        ({"exp": int(time.time()) - 3600}, None),
+        ({"sub": None}, None),
+        ({"nonce": "n1"}, "n2"),
+        ({"aud": ["client", "other"], "azp": "other"}, None),
+        ({"key": "wrong-secret-0123456789abcdefghij"}, None),
+    ],
+)
+@pytest.mark.asyncio
+async def test_invalid_id_tokens_are_rejected(idp_client, overrides, nonce):
+    provider = OIDCProvider("client", CLIENT_SECRET, http_client=idp_client, issuer=ISSUER)
+    key = overrides.pop("key", CLIENT_SECRET)
+    with pytest.raises(OAuthException, match="ID token"):
+        await provider.verify_id_token(id_token(key=key, **overrides), nonce=nonce)
+
+
+@pytest.mark.asyncio
+async def test_unadvertised_algorithms_are_rejected(idp, idp_client):
+    idp.state.algorithms = ["RS256", "none"]
+    provider = OIDCProvider("client", CLIENT_SECRET, http_client=idp_client, issuer=ISSUER)
+    with pytest.raises(OAuthException, match="not allowed"):
+        await provider.verify_id_token(id_token())
+    unsigned = jwt.encode({"sub": "u1"}, None, algorithm="none")
+    with pytest.raises(OAuthException, match="not allowed"):
+        await provider.verify_id_token(unsigned)
+
+
+@pytest.mark.asyncio
+async def test_jwks_fetch_is_single_flight(idp, idp_client):
+    cache = JWKSCache(f"{ISSUER}/jwks", http_client=idp_client)
+    keys = await asyncio.gather(*(cache.get_key("k1") for _ in range(20)))
+    assert idp.state.hits["jwks"] == 1
+    assert all(key is keys[0] for key in keys)
+
+
+@pytest.mark.asyncio
+async def test_jwks_skips_encryption_keys_and_uses_a_lone_key_without_kid(idp, idp_client):
+    idp.state.jwks = [oct_jwk("k1", "k" * 32), oct_jwk("e1", "e" * 32, use="enc")]
+    cache = JWKSCache(f"{ISSUER}/jwks", http_client=idp_client)
+    assert (await cache.get_key(None)).key_id == "k1"
+    assert cache.kids == ["k1"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refetch_is_rate_limited(idp, idp_client, clock):
+    cache = JWKSCache(f"{ISSUER}/jwks", http_client=idp_client, min_refetch_interval_seconds=60)
+    first = await cache.get_key("k1")
+    idp.state.jwks = [oct_jwk("k1", "k" * 32), oct_jwk("k2", "2" * 32)]
+
+    clock.now += 10
+    for _ in range(5):
+        with pytest.raises(OAuthException, match="unknown key"):
+            await cache.get_key("k2")
+    assert idp.state.hits["jwks"] == 1
+
+    clock.now += 60
+    assert (await cache.get_key("k2")).key_id == "k2"
+    assert idp.state.hits["jwks"] == 2
+    # Unchanged keys are not parsed again
+    assert await cache.get_key("k1") is first
+
+
+@pytest.mark.asyncio
+async def test_keys_refresh_in_background_and_stay_served_when_refresh_fails(
+    idp, idp_client, clock
+):
+    cache = JWKSCache(f"{ISSUER}/jwks", http_client=idp_client)
+    key = await cache.get_key("k1")
+
+    # Past 80% of the 100s max-age: the cached key is returned while refreshing
+    clock.now += 81
+    assert await cache.get_key("k1") is key
+    await cache.refresh()
+    assert idp.state.hits["jwks"] == 2
+
+    idp.state.jwks_status = 500
+    clock.now += 81
+    assert await cache.get_key("k1") is key
+    with pytest.raises(OAuthException):
+        await cache.refresh()
+    assert await cache.get_key("k1") is key
+
+
+@pytest.mark.asyncio
+async def test_failing_background_refresh_is_rate_limited(idp, idp_client, clock):
+    cache = JWKSCache(f"{ISSUER}/jwks", http_client=idp_client, min_refetch_interval_seconds=60)
+    key = await cache.get_key("k1")
+
+    idp.state.jwks_status = 500
+    clock.now += 81
+    for _ in range(5):
+        assert await cache.get_key("k1") is key
+        await asyncio.sleep(0.01)
+        clock.now += 1
+    assert idp.state.hits["jwks"] == 2
+
+    clock.now += 60
+    assert await cache.get_key("k1") is key
+    await asyncio.sleep(0.01)
+    assert idp.state.hits["jwks"] == 3
+
+
+@pytest.mark.asyncio
+async def test_rs256_id_token_verified_with_jwks_key(idp, idp_client):
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    idp.state.jwks = [{**public_jwk, "kid": "rsa1", "use": "sig"}]
+    idp.state.algorithms = ["RS256"]
+
+    provider = OIDCProvider("client", CLIENT_SECRET, http_client=idp_client, issuer=ISSUER)
+    now = int(time.time())
+    token = jwt.encode(
+        {"iss": ISSUER, "aud": "client", "sub": "u1", "iat": now, "exp": now + 300},
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "rsa1"},
+    )
+    assert (await provider.verify_id_token(token))["sub"] == "u1"
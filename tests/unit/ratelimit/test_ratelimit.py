@@ -0,0 +1,161 @@
+import math
+import time
+
+import pytest
+
+from fastauth.ratelimit import MemoryRateLimiter, RedisRateLimiter
+from fastauth.ratelimit.redis import (
+    GCRA_LEASE_SCRIPT,
+    GCRA_LEASE_SHA,
+    GCRA_REFUND_SCRIPT,
+    GCRA_REFUND_SHA,
+)
+
+
+class LuaRedis:
+    """Redis double running the GCRA scripts' logic in Python."""
+
+    def __init__(self):
+        self.data = {}
+        self.scripts = set()
+        self.calls = 0
+
+    async def evalsha(self, sha, numkeys, key, *args):
+        if sha not in self.scripts:
+            raise Exception("NOSCRIPT No matching script")
+        if sha == GCRA_REFUND_SHA:
+            return self._refund(key, *args)
+        return self._gcra(key, *args)
+
+    async def eval(self, script, numkeys, key, *args):
+        if script == GCRA_REFUND_SCRIPT:
+            self.scripts.add(GCRA_REFUND_SHA)
+            return self._refund(key, *args)
+        assert script == GCRA_LEASE_SCRIPT
+        self.scripts.add(GCRA_LEASE_SHA)
+        return self._gcra(key, *args)
+
+    async def delete(self, key):
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def _gcra(self, key, interval, period, wanted):
+        self.calls += 1
+        now = int(time.time() * 1000)
+        tat = max(self.data.get(key, now), now)
+        available = (now + period - tat) // interval
+        if available < 1:
+            return [0, math.ceil(tat + interval - period - now)]
+        granted = min(wanted, available)
+        self.data[key] = tat + granted * interval
+        return [granted, 0]
+
+    def _refund(self, key, interval):
+        self.calls += 1
+        if key not in self.data:
+            return 0
+        tat = self.data[key] - interval
+        if tat <= int(time.time() * 1000):
+            del self.data[key]
+        else:
+            self.data[key] = tat
+        return 1
+
+
+@pytest.mark.asyncio
+async def test_memory_limiter_allows_burst_then_limits():
+    limiter = MemoryRateLimiter()
+    for _ in range(5):
+        assert await limiter.hit("k", 5, 60) == 0.0
+
+    retry_after = await limiter.hit("k", 5, 60)
+    assert 0 < retry_after <= 12
+
+    # other keys are independent
+    assert await limiter.hit("other", 5, 60) == 0.0
+
+    await limiter.reset("k")
+    assert await limiter.hit("k", 5, 60) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_memory_limiter_refills_over_time(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    limiter = MemoryRateLimiter()
+
+    for _ in range(2):
+        assert await limiter.hit("k", 2, 10) == 0.0
+    assert await limiter.hit("k", 2, 10) == pytest.approx(5.0)
+
+    clock[0] += 5
+    assert await limiter.hit("k", 2, 10) == 0.0
+    assert await limiter.hit("k", 2, 10) > 0
+
+
+@pytest.mark.asyncio
+async def test_memory_limiter_refund_restores_one_hit():
+    limiter = MemoryRateLimiter()
+    for _ in range(3):
+        assert await limiter.hit("k", 3, 60) == 0.0
+    await limiter.refund("k", 3, 60)
+    assert await limiter.hit("k", 3, 60) == 0.0
+    assert await limiter.hit("k", 3, 60) > 0
+
+    await limiter.refund("missing", 3, 60)
+    await limiter.refund("fresh", 3, 60)
+    assert "fresh" not in limiter.store
+
+
+@pytest.mark.asyncio
+async def test_memory_limiter_bounds_tracked_keys():
+    limiter = MemoryRateLimiter(max_keys=100)
+    for i in range(1000):
+        await limiter.hit(f"k{i}", 5, 60)
+    assert len(limiter.store) <= 100
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_leases_tokens_in_batches():
+    redis = LuaRedis()
+    limiter = RedisRateLimiter(redis, batch_size=10)
+
+    for _ in range(100):
+        assert await limiter.hit("ip:1", 100, 60) == 0.0
+    assert redis.calls == 10
+
+    assert await limiter.hit("ip:1", 100, 60) > 0
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_is_exact_for_small_limits():
+    redis = LuaRedis()
+    limiter = RedisRateLimiter(redis)
+
+    for _ in range(5):
+        assert await limiter.hit("id:alice", 5, 300) == 0.0
+    retry_after = await limiter.hit("id:alice", 5, 300)
+    assert 0 < retry_after <= 60
+    assert redis.calls == 6
+
+    await limiter.reset("id:alice")
+    assert await limiter.hit("id:alice", 5, 300) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_refunds_to_lease_or_redis():
+    redis = LuaRedis()
+    limiter = RedisRateLimiter(redis)
+
+    # Single-token leases: the hit goes back to Redis
+    for _ in range(5):
+        assert await limiter.hit("id:alice", 5, 300) == 0.0
+    await limiter.refund("id:alice", 5, 300)
+    assert await limiter.hit("id:alice", 5, 300) == 0.0
+    assert await limiter.hit("id:alice", 5, 300) > 0
+
+    # A running lease takes the hit back without a round trip
+    assert await limiter.hit("ip:1", 100, 60) == 0.0
+    calls = redis.calls
+    await limiter.refund("ip:1", 100, 60)
+    assert redis.calls == calls
+    assert limiter._leases["ip:1"][0] == 10
@@ -0,0 +1,119 @@
+import pytest
+
+from fastauth.risk import GeoIPDatabase, GeoIPRecord, build_geoip_file
+from fastauth.risk.geoip import main
+
+COUNTRIES = """start_ip,end_ip,country
+1.0.0.0,1.0.0.255,AU
+1.0.1.0,1.0.3.255,CN
+8.8.8.0,8.8.8.255,US
+2001:db8::,2001:db8:0:ffff:ffff:ffff:ffff:ffff,DE
+2001:db8:1::,2001:db8:1:0:7fff:ffff:ffff:ffff,FR
+2001:db8:1:0:8000::,2001:db8:1:0:ffff:ffff:ffff:ffff,NL
+"""
+
+ASNS = """network,autonomous_system_number,autonomous_system_organization
+1.0.0.0/24,13335,CLOUDFLARENET
+8.8.8.0/24,AS15169,GOOGLE
+2001:db8::/48,64500,EXAMPLE
+"""
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = tmp_path / "geoip.bin"
+    build_geoip_file(path, COUNTRIES.splitlines(), ASNS.splitlines())
+    db = GeoIPDatabase(path)
+    yield db
+    db.close()
+
+
+def test_lookup_ipv4(table):
+    assert table.lookup("1.0.0.1") == GeoIPRecord("AU", 13335)
+    assert table.lookup("1.0.2.200") == GeoIPRecord("CN", None)
+    assert table.lookup("8.8.8.8") == GeoIPRecord("US", 15169)
+
+
+def test_lookup_range_boundaries(table):
+    assert table.lookup("1.0.0.255").country == "AU"
+    assert table.lookup("1.0.1.0").country == "CN"
+    assert table.lookup("1.0.3.255").country == "CN"
+    assert table.lookup("1.0.4.0") is None
+    assert table.lookup("0.255.255.255") is None
+    assert table.lookup("255.255.255.255") is None
+
+
+def test_lookup_ipv6(table):
+    assert table.lookup("2001:db8::1") == GeoIPRecord("DE", 64500)
+    assert table.lookup("2001:db8:0:1::1") == GeoIPRecord("DE", 64500)
+    # Ranges splitting one /64 need the low half to decide
+    assert table.lookup("2001:db8:1::1") == GeoIPRecord("FR", None)
+    assert table.lookup("2001:db8:1:0:8000::1") == GeoIPRecord("NL", None)
+    assert table.lookup("2001:db8:1:1::") is None
+    assert table.lookup("2001:db7::1") is None
+
+
+def test_lookup_ipv4_mapped_ipv6(table):
+    assert table.lookup("::ffff:8.8.8.8") == GeoIPRecord("US", 15169)
+
+
+@pytest.mark.parametrize("ip", [None, "", "unknown", "testclient", "1.2.3", "::g"])
+def test_lookup_invalid_ip(table, ip):
+    assert table.lookup(ip) is None
+
+
+def test_overlapping_sources_are_combined(tmp_path):
+    path = tmp_path / "geoip.bin"
+    countries = ["10.0.0.0,10.0.255.255,GB"]
+    asns = ["10.0.128.0/17,64496,SPLIT"]
+    ipv4, ipv6 = build_geoip_file(path, countries, asns)
+
+    db = GeoIPDatabase(path)
+    assert db.lookup("10.0.0.1") == GeoIPRecord("GB", None)
+    assert db.lookup("10.0.200.1") == GeoIPRecord("GB", 64496)
+    assert db.lookup("10.1.0.0") is None
+    # gap before, two data ranges, gap after
+    assert (ipv4, db.ipv4_ranges) == (4, 4)
+    db.close()
+
+
+def test_ranges_reaching_the_last_address(tmp_path):
+    path = tmp_path / "geoip.bin"
+    countries = [
+        "0.0.0.0,239.255.255.255,AU",
+        "240.0.0.0,255.255.255.255,US",
+        "::,7fff:ffff:ffff:ffff:ffff:ffff:ffff:ffff,FR",
+        "8000::,ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff,DE",
+    ]
+    assert build_geoip_file(path, countries) == (2, 2)
+
+    db = GeoIPDatabase(path)
+    assert db.lookup("0.0.0.0").country == "AU"
+    assert db.lookup("255.255.255.255").country == "US"
+    assert db.lookup("ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff").country == "DE"
+    assert db.lookup("::1").country == "FR"
+    db.close()
+
+
+def test_rejects_foreign_and_truncated_files(tmp_path):
+    path = tmp_path / "geoip.bin"
+    build_geoip_file(path, COUNTRIES.splitlines())
+
+    data = path.read_bytes()
+    path.write_bytes(data[:-8])
+    with pytest.raises(ValueError, match="truncated"):
+        GeoIPDatabase(path).lookup("1.0.0.1")
+
+    path.write_bytes(b"XXXX" + data[4:])
+    with pytest.raises(ValueError, match="not a GeoIP table"):
+        GeoIPDatabase(path).lookup("1.0.0.1")
+
+
+def test_cli_builds_table(tmp_path, capsys):
+    countries = tmp_path / "country.csv"
+    countries.write_text(COUNTRIES)
+    output = tmp_path / "geoip.bin"
+
+    assert main([str(output), "--country", str(countries)]) == 0
+    assert "IPv4" in capsys.readouterr().err
+    assert GeoIPDatabase(output).lookup("8.8.8.8") == GeoIPRecord("US", None)
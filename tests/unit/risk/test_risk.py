@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from fastauth.risk import CountMinRiskEvaluator, DecayingCountMinSketch
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_sketch_never_undercounts():
+    sketch = DecayingCountMinSketch(width=256, depth=4)
+    for i in range(2000):
+        sketch.add(f"key{i % 500}")
+
+    for i in range(500):
+        assert sketch.estimate(f"key{i}") >= 4
+
+
+@pytest.mark.parametrize("width,depth", [(256, 4), (65536, 5)])
+def test_sketch_rows_from_split_or_double_hashing(width, depth):
+    # 8 * 4 bits fit one 64-bit hash; 16 * 5 bits fall back to double hashing
+    sketch = DecayingCountMinSketch(width=width, depth=depth)
+    assert sketch._split == (width == 256)
+    sketch.add_many(["a", "b", "a"])
+    sketch.add("a", count=2)
+    assert len(sketch._indices("a")) == depth
+    assert (sketch.estimate("a"), sketch.estimate("b")) == (4, 1)
+
+
+def test_sketch_memory_is_fixed():
+    sketch = DecayingCountMinSketch(width=1000, depth=4, windows=6)
+    assert sketch.width == 1024
+    before = sketch.memory_bytes
+    for i in range(10000):
+        sketch.add(str(i))
+    assert sketch.memory_bytes == before == 6 * 4 * 1024 * 4
+
+
+def test_sketch_decays_and_expires(clock):
+    sketch = DecayingCountMinSketch(window_seconds=10, windows=3, decay=0.5)
+    for _ in range(8):
+        sketch.add("k")
+    assert sketch.estimate("k") == 8
+
+    clock[0] += 10
+    assert sketch.estimate("k") == 4
+    clock[0] += 10
+    assert sketch.estimate("k") == 2
+    clock[0] += 10
+    assert sketch.estimate("k") == 0
+
+
+def test_risk_score_from_identifier_failures():
+    risk = CountMinRiskEvaluator(identifier_failure_threshold=5)
+    assert risk.score("203.0.113.7", "username:alice") == 0.0
+
+    for _ in range(5):
+        risk.record("203.0.113.7", "username:alice", success=False)
+    assert risk.score("198.51.100.1", "username:alice") == 1.0
+    assert risk.score("198.51.100.1", "username:bob") == 0.0
+
+
+def test_risk_ip_successes_damp_score():
+    risk = CountMinRiskEvaluator(ip_failure_threshold=10)
+    for _ in range(5):
+        risk.record("203.0.113.7", None, success=False)
+    assert risk.score("203.0.113.7", None) == pytest.approx(0.5)
+
+    for _ in range(40):
+        risk.record("203.0.113.7", None, success=True)
+    assert risk.score("203.0.113.7", None) == pytest.approx(0.1)
+    assert risk.counts("203.0.113.7", None)["ip_successes"] == 40
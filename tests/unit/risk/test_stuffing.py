@@ -0,0 +1,240 @@
+import time
+
+import pytest
+
+from fastauth.risk import CredentialStuffingDetector, HyperLogLog
+from fastauth.risk.hyperloglog import (
+    HLL_DENSE_SIZE,
+    HLL_REGISTERS,
+    hll_pattern,
+    murmurhash64a,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+class PFRedis:
+    """Minimal async Redis double implementing PFMERGE on HLL strings."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, *, ex=None):
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    async def expire(self, key, time):
+        self.ttls[key] = time
+        return key in self.data
+
+    async def pfmerge(self, dest, *sources):
+        merged = HyperLogLog()
+        for key in (dest, *sources):
+            if key in self.data:
+                merged.merge(HyperLogLog.from_bytes(self.data[key]))
+        self.data[dest] = merged.to_bytes()
+        return True
+
+
+def test_murmurhash64a_is_deterministic_and_length_sensitive():
+    assert murmurhash64a(b"") != murmurhash64a(b"\x00")
+    assert murmurhash64a(b"user@example.com") == murmurhash64a(b"user@example.com")
+    index, run = hll_pattern("user@example.com")
+    assert 0 <= index < HLL_REGISTERS
+    assert 1 <= run <= 51
+
+
+@pytest.mark.parametrize("n", [0, 1, 10, 200, 5000])
+def test_hyperloglog_estimates_distinct_elements(n):
+    hll = HyperLogLog()
+    for i in range(n):
+        hll.add(f"user{i}@example.com")
+        hll.add(f"user{i}@example.com")
+    assert abs(hll.count() - n) <= max(1, n * 0.02)
+
+
+def test_hyperloglog_promotes_sparse_to_dense():
+    hll = HyperLogLog()
+    for i in range(100):
+        hll.add(str(i))
+    assert hll.is_sparse
+    for i in range(2000):
+        hll.add(str(i))
+    assert not hll.is_sparse
+
+
+def test_hyperloglog_merge_is_union():
+    a, b = HyperLogLog(), HyperLogLog()
+    for i in range(300):
+        a.add(f"a{i}")
+        b.add(f"b{i}")
+    b.add("a1")
+    a.merge(b)
+    assert abs(a.count() - 600) <= 12
+
+
+def test_hyperloglog_redis_dense_round_trip():
+    hll = HyperLogLog()
+    for i in range(3000):
+        hll.add(str(i))
+    data = hll.to_bytes()
+
+    assert len(data) == HLL_DENSE_SIZE
+    assert data[:5] == b"HYLL\x00"
+    restored = HyperLogLog.from_bytes(data)
+    assert restored.count() == hll.count()
+    assert restored.to_bytes() == data
+
+
+def test_hyperloglog_reads_redis_sparse_encoding():
+    index, run = hll_pattern("alice")
+    # XZERO up to the register, VAL for it, XZERO for the rest
+    def xzero(length):
+        return bytes([0x40 | ((length - 1) >> 8), (length - 1) & 0xFF])
+
+    body = b""
+    if index:
+        body += xzero(index)
+    body += bytes([0x80 | ((run - 1) << 2)])
+    if HLL_REGISTERS - index - 1:
+        body += xzero(HLL_REGISTERS - index - 1)
+    data = b"HYLL\x01" + bytes(11) + body
+
+    expected = HyperLogLog()
+    expected.add("alice")
+    restored = HyperLogLog.from_bytes(data)
+    assert restored.count() == 1
+    assert restored.to_bytes() == expected.to_bytes()
+
+
+def test_hyperloglog_rejects_garbage():
+    with pytest.raises(ValueError):
+        HyperLogLog.from_bytes(b"not a sketch at all")
+    with pytest.raises(ValueError):
+        HyperLogLog.from_bytes(b"HYLL\x00" + bytes(11) + b"\x00" * 10)
+
+
+def test_detector_flags_ip_trying_many_accounts(clock):
+    detector = CredentialStuffingDetector(ip_threshold=10, subnet_threshold=100)
+    for i in range(9):
+        assert not detector.observe("203.0.113.7", f"victim{i}")
+    assert detector.observe("203.0.113.7", "victim9")
+    assert detector.is_flagged("203.0.113.7")
+    assert not detector.is_flagged("203.0.113.8")
+
+
+def test_detector_ignores_repeated_identifier(clock):
+    detector = CredentialStuffingDetector(ip_threshold=3)
+    for _ in range(50):
+        assert not detector.observe("203.0.113.7", "alice")
+    assert detector.distinct_identifiers("ip:203.0.113.7") == 1
+
+
+def test_detector_flags_subnet_rotating_addresses(clock):
+    detector = CredentialStuffingDetector(ip_threshold=10, subnet_threshold=20)
+    for i in range(20):
+        detector.observe(f"198.51.100.{i}", f"victim{i}")
+
+    assert detector.distinct_identifiers("net:198.51.100.0/24") == 20
+    assert detector.is_flagged("198.51.100.200")
+    assert not detector.is_flagged("198.51.101.1")
+
+
+def test_detector_groups_ipv6_by_prefix(clock):
+    detector = CredentialStuffingDetector(ip_threshold=100, subnet_threshold=5)
+    for i in range(5):
+        detector.observe(f"2001:db8:1:2::{i + 1:x}", f"victim{i}")
+    assert detector.is_flagged("2001:db8:1:2:ffff::1")
+    assert not detector.is_flagged("2001:db8:1:3::1")
+
+
+def test_detector_window_slides(clock):
+    detector = CredentialStuffingDetector(ip_threshold=10, window_seconds=60, windows=2)
+    for i in range(6):
+        detector.observe("203.0.113.7", f"old{i}")
+    clock[0] += 60
+    for i in range(4):
+        detector.observe("203.0.113.7", f"new{i}")
+    assert detector.is_flagged("203.0.113.7")
+
+    clock[0] += 60
+    assert detector.distinct_identifiers("ip:203.0.113.7") == 4
+    assert not detector.is_flagged("203.0.113.7")
+
+
+def test_detector_audits_once_per_episode(clock, caplog):
+    detector = CredentialStuffingDetector(ip_threshold=3, subnet_threshold=1000)
+    with caplog.at_level("INFO", logger="fastauth.audit"):
+        for i in range(10):
+            detector.observe("203.0.113.7", f"victim{i}")
+
+    events = [r for r in caplog.records if r.getMessage() == "credential_stuffing_detected"]
+    assert len(events) == 1
+    assert events[0].source == "ip:203.0.113.7"
+    assert events[0].ip_address == "203.0.113.7"
+
+
+def test_detector_bounds_tracked_sources(clock):
+    detector = CredentialStuffingDetector(max_sources=10)
+    for i in range(100):
+        detector.observe(f"10.0.{i}.1", "alice")
+    assert len(detector._sources) == 10
+
+
+@pytest.mark.asyncio
+async def test_detector_sync_pools_workers_through_redis(clock):
+    redis = PFRedis()
+    workers = [CredentialStuffingDetector(ip_threshold=10) for _ in range(3)]
+    for i in range(12):
+        workers[i % 3].observe("203.0.113.7", f"victim{i}")
+    assert not any(w.is_flagged("203.0.113.7") for w in workers)
+
+    for worker in workers:
+        await worker.sync(redis)
+    # The last worker to sync has already folded in everyone's sketches
+    assert workers[2].is_flagged("203.0.113.7")
+    assert not workers[0].is_flagged("203.0.113.7")
+
+    workers[0].observe("203.0.113.7", "victim12")
+    await workers[0].sync(redis)
+    assert workers[0].is_flagged("203.0.113.7")
+    assert await workers[1].sync(redis) == 0
+
+    shared = [key for key in redis.data if key.endswith(":ip:203.0.113.7")]
+    assert len(shared) == 1
+    assert HyperLogLog.from_bytes(redis.data[shared[0]]).count() == 13
+    assert all(ttl == 300 for ttl in redis.ttls.values())
+
+
+@pytest.mark.asyncio
+async def test_detector_sync_pools_previous_window_after_rollover(clock):
+    redis = PFRedis()
+    a, b = (CredentialStuffingDetector(ip_threshold=10, window_seconds=60) for _ in range(2))
+    for i in range(5):
+        b.observe("203.0.113.7", f"b{i}")
+    await b.sync(redis)
+    for i in range(5):
+        a.observe("203.0.113.7", f"a{i}")
+
+    # A's first sync after the rollover still pushes and pulls the old window
+    clock[0] += 60
+    a.observe("203.0.113.7", "a5")
+    assert await a.sync(redis) == 2  # the IP and its /24
+    assert a.distinct_identifiers("ip:203.0.113.7") == 11
+    assert a.is_flagged("203.0.113.7")
+
+    b.observe("203.0.113.7", "b5")
+    await b.sync(redis)
+    assert b.distinct_identifiers("ip:203.0.113.7") == 11
@@ -76,3 +76,25 @@ async def test_db_session_refresh(mock_db_session, mock_session_model):
     await store.refresh(session_id, ttl=7200)
     assert session.expires_at > old_expires_at
     assert mock_db_session.committed is True
+
+
+@pytest.mark.asyncio
+async def test_db_session_persists_device_class_when_model_has_it(
+    mock_db_session, mock_session_model
+):
+    class DeviceSessionModel(mock_session_model):
+        device_class = None
+
+    store = SQLSessionStore(DeviceSessionModel, mock_db_session)
+    session_id = await store.create("user_123", {"device_class": "mobile"})
+    assert mock_db_session.added[0].device_class == "mobile"
+    assert (await store.get(session_id))["device_class"] == "mobile"
+
+
+@pytest.mark.asyncio
+async def test_db_session_ignores_device_class_without_column(
+    mock_db_session, mock_session_model
+):
+    store = SQLSessionStore(mock_session_model, mock_db_session)
+    session_id = await store.create("user_123", {"device_class": "mobile"})
+    assert "device_class" not in (await store.get(session_id))
@@ -0,0 +1,102 @@
+import pytest
+from fastapi import Request, Response
+
+from fastauth.api_keys import MemoryAPIKeyStore
+from fastauth.exceptions import TokenException
+from fastauth.strategies.api_key import APIKeyStrategy
+
+
+class CountingStore(MemoryAPIKeyStore):
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+
+    async def get(self, prefix):
+        self.lookups += 1
+        return await super().get(prefix)
+
+
+@pytest.fixture
+def store():
+    return CountingStore()
+
+
+@pytest.fixture
+def strategy(store):
+    return APIKeyStrategy(store)
+
+
+def _request(headers):
+    return Request(scope={"type": "http", "headers": headers, "path": "/test"})
+
+
+@pytest.mark.asyncio
+async def test_api_key_create_and_verify(strategy, store):
+    api_key, key_id = await strategy.create_key("user_123", scopes=["read"])
+    assert api_key.startswith(f"fa_{key_id}_")
+    assert api_key.split("_", 2)[2] not in str(store.store)
+
+    claims = await strategy.verify(api_key)
+    assert claims == {"sub": "user_123", "key_id": key_id, "scopes": ["read"]}
+
+
+@pytest.mark.asyncio
+async def test_api_key_verified_keys_are_cached(strategy, store):
+    api_key, _ = await strategy.create_key("user_123")
+
+    for _ in range(5):
+        await strategy.verify(api_key)
+    assert store.lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_api_key_wrong_secret_rejected(strategy):
+    api_key, key_id = await strategy.create_key("user_123")
+    await strategy.verify(api_key)
+
+    with pytest.raises(TokenException):
+        await strategy.verify(f"fa_{key_id}_wrong-secret")
+    with pytest.raises(TokenException):
+        await strategy.verify("not-an-api-key")
+
+
+@pytest.mark.asyncio
+async def test_api_key_revocation_clears_cache(strategy):
+    api_key, key_id = await strategy.create_key("user_123")
+    await strategy.verify(api_key)
+
+    await strategy.revoke_key(key_id)
+    with pytest.raises(TokenException):
+        await strategy.verify(api_key)
+
+
+@pytest.mark.asyncio
+async def test_api_key_pepper_changes_digest(store):
+    peppered = APIKeyStrategy(store, pepper="server-secret")
+    api_key, key_id = await peppered.create_key("user_123")
+
+    assert (await peppered.verify(api_key))["sub"] == "user_123"
+    with pytest.raises(TokenException):
+        await APIKeyStrategy(store).verify(api_key)
+
+
+@pytest.mark.asyncio
+async def test_api_key_extract_header_and_bearer(strategy):
+    api_key, _ = await strategy.create_key("user_123")
+
+    claims = await strategy.extract(_request([(b"x-api-key", api_key.encode())]))
+    assert claims["sub"] == "user_123"
+
+    claims = await strategy.extract(
+        _request([(b"authorization", f"Bearer {api_key}".encode())])
+    )
+    assert claims["sub"] == "user_123"
+
+    assert await strategy.extract(_request([])) is None
+
+
+@pytest.mark.asyncio
+async def test_api_key_issue(strategy):
+    tokens = await strategy.issue(Response(), {"sub": "user_123"}, ttl_seconds=3600)
+    claims = await strategy.verify(tokens["api_key"])
+    assert claims["key_id"] == tokens["key_id"]
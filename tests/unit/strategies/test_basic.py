@@ -0,0 +1,184 @@
+import asyncio
+import base64
+import hashlib
+
+import pytest
+from fastapi import Request
+from pydantic import BaseModel
+
+from fastauth import AuthConfig, AuthManager, HashingConfig
+
+from fastauth.crypto import ThreadPoolPasswordHasher, hash_password
+from fastauth.exceptions import CredentialsException
+from fastauth.strategies.basic import BasicAuthStrategy
+from fastauth.strategies.cache import VerifiedCredentialCache
+
+
+class MockUser:
+    def __init__(self, id, username, password):
+        self.id = id
+        self.username = username
+        self.password = password
+
+
+class MockUserStore:
+    def __init__(self):
+        self.users = {"alice": MockUser("user_1", "alice", hash_password("s3cret"))}
+        self.finds = 0
+
+    async def find(self, **kwargs):
+        self.finds += 1
+        return self.users.get(kwargs.get("username"))
+
+
+@pytest.fixture
+def store():
+    return MockUserStore()
+
+
+class CountingHasher(ThreadPoolPasswordHasher):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.verifies = 0
+
+    async def verify(self, password, hashed):
+        self.verifies += 1
+        return await super().verify(password, hashed)
+
+
+@pytest.fixture
+def hasher():
+    return CountingHasher()
+
+
+@pytest.fixture
+def strategy(store, hasher):
+    return BasicAuthStrategy(store, password_hasher=hasher)
+
+
+def _request(username, password):
+    token = base64.b64encode(f"{username}:{password}".encode())
+    return Request(
+        scope={"type": "http", "headers": [(b"authorization", b"Basic " + token)]}
+    )
+
+
+@pytest.mark.asyncio
+async def test_basic_auth_extract(strategy):
+    claims = await strategy.extract(_request("alice", "s3cret"))
+    assert claims == {"sub": "user_1"}
+
+
+@pytest.mark.asyncio
+async def test_basic_auth_rejects_invalid_credentials(strategy):
+    with pytest.raises(CredentialsException):
+        await strategy.extract(_request("alice", "wrong"))
+    with pytest.raises(CredentialsException):
+        await strategy.extract(_request("bob", "s3cret"))
+
+    request = Request(scope={"type": "http", "headers": [(b"authorization", b"Basic !!")]})
+    with pytest.raises(CredentialsException, match="Malformed"):
+        await strategy.extract(request)
+
+    assert await strategy.extract(Request(scope={"type": "http", "headers": []})) is None
+
+
+@pytest.mark.asyncio
+async def test_basic_auth_caches_verified_credentials(strategy, hasher):
+    for _ in range(5):
+        await strategy.verify("alice", "s3cret")
+    assert hasher.verifies == 1
+
+
+@pytest.mark.asyncio
+async def test_basic_auth_coalesces_concurrent_verifications(strategy, hasher):
+    results = await asyncio.gather(*(strategy.verify("alice", "s3cret") for _ in range(10)))
+    assert all(claims["sub"] == "user_1" for claims in results)
+    assert hasher.verifies == 1
+
+
+@pytest.mark.asyncio
+async def test_basic_auth_password_change_invalidates_cache(strategy, store):
+    await strategy.verify("alice", "s3cret")
+
+    # No explicit invalidation: the new stored hash misses the cache
+    store.users["alice"].password = hash_password("new-password")
+
+    with pytest.raises(CredentialsException):
+        await strategy.verify("alice", "s3cret")
+    assert (await strategy.verify("alice", "new-password"))["sub"] == "user_1"
+
+    strategy.invalidate_user("user_1")
+    assert len(strategy._cache) == 0
+
+
+def test_verified_credential_cache_bounds():
+    cache = VerifiedCredentialCache(max_size=2, ttl_seconds=60)
+    cache.put("a", "g1", {"sub": "1"})
+    cache.put("b", "g1", {"sub": "1"})
+    cache.get("a")  # refresh "a" so "b" is evicted first
+    cache.put("c", "g2", {"sub": "2"})
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    cache.invalidate("g1")
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+    cache.put("d", "g2", {"sub": "2"}, ttl=-1)
+    assert cache.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_basic_auth_uses_the_managers_hasher(store):
+    # A Werkzeug hash only the configured LegacyHasher understands
+    store.users["alice"].password = "pbkdf2:sha256:1000$salt$" + hashlib.pbkdf2_hmac(
+        "sha256", b"s3cret", b"salt", 1000
+    ).hex()
+
+    class Schema(BaseModel):
+        id: str | None = None
+        username: str
+        password: str
+
+    strategy = BasicAuthStrategy(store)
+    manager = AuthManager(
+        config=AuthConfig(
+            slug="auth",
+            login_fields=["username"],
+            hashing=HashingConfig(migrate_legacy_hashes=True),
+        ),
+        user_store=store,
+        strategy=strategy,
+        schema=Schema,
+    )
+    assert strategy.password_hasher is manager.password_hasher
+    assert (await strategy.verify("alice", "s3cret"))["sub"] == "user_1"
+
+
+@pytest.mark.asyncio
+async def test_basic_auth_cancelled_caller_does_not_fail_the_others(store):
+    gate = asyncio.Event()
+
+    verifies = []
+
+    class GatedHasher:
+        async def verify(self, password, hashed):
+            verifies.append(password)
+            await gate.wait()
+            return password == "s3cret"
+
+    strategy = BasicAuthStrategy(store, password_hasher=GatedHasher())
+    leader = asyncio.ensure_future(strategy.verify("alice", "s3cret"))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(strategy.verify("alice", "s3cret"))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    gate.set()
+    assert (await follower)["sub"] == "user_1"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert len(verifies) == 1
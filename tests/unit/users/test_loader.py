@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from fastauth.users.base import BaseUser
+from fastauth.users.loader import UserLoader
+
+
+class BatchUserStore:
+    def __init__(self, ids=("u1", "u2", "u3")):
+        self.users = {i: BaseUser(id=i, password="hash") for i in ids}
+        self.batches = []
+        self.gate = None
+        self.error = None
+
+    async def get_many(self, user_ids):
+        self.batches.append(list(user_ids))
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        # Unordered, missing IDs omitted
+        return [self.users[i] for i in reversed(user_ids) if i in self.users]
+
+
+class SingleUserStore:
+    def __init__(self):
+        self.users = BatchUserStore().users
+        self.batches = []
+
+    async def get(self, user_id):
+        self.batches.append([user_id])
+        return self.users.get(user_id)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_share_one_batch():
+    store = BatchUserStore()
+    loader = UserLoader(store)
+    users = await asyncio.gather(
+        loader.load("u1"), loader.load("u2"), loader.load("u1"), loader.load("nobody")
+    )
+    assert [u and u.id for u in users] == ["u1", "u2", "u1", None]
+    assert store.batches == [["u1", "u2", "nobody"]]
+
+
+@pytest.mark.asyncio
+async def test_loads_join_a_fetch_already_in_flight():
+    store = BatchUserStore()
+    store.gate = asyncio.Event()
+    loader = UserLoader(store)
+    first = asyncio.ensure_future(loader.load("u1"))
+    await asyncio.sleep(0.01)
+    assert store.batches == [["u1"]]
+
+    second = asyncio.ensure_future(loader.load("u1"))
+    third = asyncio.ensure_future(loader.load("u2"))
+    await asyncio.sleep(0.01)
+    store.gate.set()
+    assert (await first) is (await second)
+    assert (await third).id == "u2"
+    assert store.batches == [["u1"], ["u2"]]
+
+
+@pytest.mark.asyncio
+async def test_stores_without_get_many_fall_back_to_get():
+    store = SingleUserStore()
+    loader = UserLoader(store)
+    users = await loader.load_many(["u1", "u2", "u1"])
+    assert [u.id for u in users] == ["u1", "u2", "u1"]
+    assert sorted(store.batches) == [["u1"], ["u2"]]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped():
+    store = BatchUserStore(ids=[f"u{i}" for i in range(5)])
+    loader = UserLoader(store, max_batch_size=2)
+    await loader.load_many([f"u{i}" for i in range(5)])
+    assert store.batches == [["u0", "u1"], ["u2", "u3"], ["u4"]]
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter_and_are_not_cached():
+    store = BatchUserStore()
+    store.error = RuntimeError("database down")
+    loader = UserLoader(store)
+    results = await asyncio.gather(
+        loader.load("u1"), loader.load("u1"), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    store.error = None
+    assert (await loader.load("u1")).id == "u1"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_shared_fetch():
+    store = BatchUserStore()
+    store.gate = asyncio.Event()
+    loader = UserLoader(store)
+    cancelled = asyncio.ensure_future(loader.load("u1"))
+    waiting = asyncio.ensure_future(loader.load("u1"))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+    store.gate.set()
+    assert (await waiting).id == "u1"
@@ -0,0 +1,140 @@
+from typing import Optional
+
+import pytest
+import pytest_asyncio
+
+sa = pytest.importorskip("sqlalchemy")
+pytest.importorskip("aiosqlite")
+
+from pydantic import BaseModel
+from sqlalchemy import Column, DateTime, ForeignKey, String, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from fastauth.users.sql import SQLOAuthUserStore, SQLUserStore
+
+Base = declarative_base()
+
+
+class User(Base):
+    __tablename__ = "users"
+    id = Column(String(36), primary_key=True)
+    password = Column(String(255), nullable=False)
+    email = Column(String(320), nullable=True)
+    email_key = Column(String(320), nullable=True, unique=True)
+    username = Column(String(64), nullable=True)
+    username_key = Column(String(64), nullable=True, unique=True)
+    name = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class UserOAuth(Base):
+    __tablename__ = "user_oauth"
+    provider = Column(String(64), primary_key=True)
+    subject = Column(String(255), primary_key=True)
+    user_id = Column(String(36), ForeignKey("users.id"), index=True, nullable=False)
+
+
+class UserSchema(BaseModel):
+    id: Optional[str] = None
+    email: Optional[str] = None
+    username: Optional[str] = None
+    name: Optional[str] = None
+    password: str
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'users.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def store(engine):
+    return SQLOAuthUserStore(
+        User, UserOAuth, engine, login_fields=["email", "username"], schema=UserSchema
+    )
+
+
+@pytest.mark.asyncio
+async def test_sql_user_create_and_find_case_insensitively(store):
+    user = await store.create(email="Ada@Example.com", username="Ada", password="hash")
+    assert (user.email, user.username) == ("Ada@Example.com", "Ada")
+
+    found = await store.find(email=" ada@EXAMPLE.com")
+    assert found.id == user.id
+    assert found.email == "Ada@Example.com"
+    assert (await store.find(username="ADA")).id == user.id
+    assert (await store.find(email="ada@example.com", username="ada")).id == user.id
+    assert await store.find(email="ada@example.com", username="grace") is None
+    assert await store.find(email="nobody@example.com") is None
+    assert await store.find(password="hash") is None
+
+
+@pytest.mark.asyncio
+async def test_sql_user_login_fields_are_unique_ignoring_case(store):
+    await store.create(email="ada@example.com", username="ada", password="hash")
+    with pytest.raises(ValueError, match="already exists"):
+        await store.create(email="ADA@example.com", username="other", password="hash")
+    with pytest.raises(ValueError, match="Unknown user fields: role"):
+        await store.create(email="grace@example.com", role="admin", password="hash")
+
+
+@pytest.mark.asyncio
+async def test_sql_user_loads_only_schema_columns(engine):
+    store = SQLUserStore(User, engine)
+    await store.create(email="ada@example.com", name="Ada", password="hash")
+    user = await store.find(email="ada@example.com")
+    # BaseUser has no `name`; `_key` and timestamp columns are never loaded
+    assert set(user.model_dump()) == {"id", "password", "email"}
+
+
+@pytest.mark.asyncio
+async def test_sql_user_get_many_update_and_delete(store):
+    ada = await store.create(email="ada@example.com", password="hash")
+    grace = await store.create(email="grace@example.com", password="hash")
+
+    users = await store.get_many([grace.id, "missing", ada.id, ada.id])
+    assert sorted(u.id for u in users) == sorted([ada.id, grace.id])
+
+    await store.update_password(ada.id, "new-hash")
+    assert (await store.get(ada.id)).password == "new-hash"
+
+    await store.link_oauth(ada.id, "github", "1")
+    await store.delete(ada.id)
+    assert await store.get(ada.id) is None
+    assert await store.find_by_oauth("github", "1") is None
+
+
+@pytest.mark.asyncio
+async def test_sql_user_oauth_links(store):
+    ada = await store.create(email="ada@example.com", password="hash")
+    grace = await store.create(email="grace@example.com", password="hash")
+    await store.link_oauth(ada.id, "github", "1")
+    # The first link wins
+    await store.link_oauth(grace.id, "github", "1")
+
+    assert (await store.find_by_oauth("github", "1")).id == ada.id
+    assert await store.find_by_oauth("google", "1") is None
+
+
+@pytest.mark.asyncio
+async def test_sql_user_find_uses_the_login_index(store, engine):
+    await store.create(email="ada@example.com", password="hash")
+    statement = sa.select(*store._projection).where(User.email_key == "ada@example.com")
+    compiled = statement.compile(engine.sync_engine, compile_kwargs={"literal_binds": True})
+    async with engine.connect() as conn:
+        plan = (await conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))).all()
+    assert "USING INDEX" in " ".join(str(row) for row in plan)
+
+
+def test_sql_user_model_validation(engine):
+    with pytest.raises(ValueError, match="missing required fields: phone, phone_key"):
+        SQLUserStore(User, engine, login_fields=["email", "phone"])
+    with pytest.raises(ValueError, match="OAuth model is missing"):
+        SQLOAuthUserStore(User, User, engine)
+    # Only stores that can link OAuth identities offer the link methods
+    assert not hasattr(SQLUserStore(User, engine), "find_by_oauth")
@@ -0,0 +1,443 @@
+import asyncio
+import hashlib
+import json
+import pickle
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from fastauth import HashingConfig
+from fastauth.crypto import (AdmissionControlledPasswordHasher, Argon2Hasher, LegacyHasher, PasslibHasher,
+                             ProcessPoolPasswordHasher,
+                             ThreadPoolPasswordHasher, ahash_password,
+                             argon2_memory_cost_kib, averify_password,
+                             build_crypt_context, build_password_hasher)
+from fastauth.crypto.calibration import calibrate_argon2
+from fastauth.crypto.legacy import wrap_records
+from fastauth.exceptions import ServiceUnavailableException
+
+
+@pytest.mark.asyncio
+async def test_async_password_hashing():
+    hashed = await ahash_password("secret_password")
+    assert hashed != "secret_password"
+    assert await averify_password("secret_password", hashed) is True
+    assert await averify_password("wrong_password", hashed) is False
+
+
+@pytest.mark.asyncio
+async def test_hashing_runs_off_event_loop():
+    hasher = ThreadPoolPasswordHasher(max_workers=2)
+    loop_thread = threading.get_ident()
+    seen = []
+
+    class RecordingContext:
+        def hash(self, password):
+            seen.append(threading.get_ident())
+            return password[::-1]
+
+    hasher.hasher = RecordingContext()
+    assert await hasher.hash("abc") == "cba"
+    assert seen and seen[0] != loop_thread
+    hasher.shutdown()
+
+
+def test_memory_budget_limits_concurrency():
+    per_run_mib = argon2_memory_cost_kib() // 1024
+    hasher = ThreadPoolPasswordHasher(max_workers=8, memory_budget_mib=per_run_mib * 2)
+    assert hasher.concurrency == 2
+
+    # Budget smaller than a single run still allows one hash at a time
+    hasher = ThreadPoolPasswordHasher(max_workers=8, memory_budget_mib=1)
+    assert hasher.concurrency == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_never_exceeds_limit():
+    hasher = ThreadPoolPasswordHasher(max_workers=4, memory_budget_mib=1)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    class SlowContext:
+        def hash(self, password):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            threading.Event().wait(0.01)
+            with lock:
+                active -= 1
+            return password
+
+    hasher.hasher = SlowContext()
+    await asyncio.gather(*(hasher.hash(str(i)) for i in range(6)))
+    assert peak == 1
+    hasher.shutdown()
+
+
+# -----------------
+# Process pool backend
+# -----------------
+
+
+@pytest.fixture
+def process_hasher():
+    hasher = ProcessPoolPasswordHasher(max_workers=1, max_queue_size=1)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_hash_and_verify(process_hasher):
+    hashed = await process_hasher.hash("secret_password")
+    assert await process_hasher.verify("secret_password", hashed) is True
+    assert await process_hasher.verify("wrong_password", hashed) is False
+
+    stats = process_hasher.stats()
+    assert stats["submitted"] == 3
+    assert stats["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_process_pool_rejects_when_queue_full(process_hasher):
+    results = await asyncio.gather(
+        *(process_hasher.hash(str(i)) for i in range(4)), return_exceptions=True
+    )
+    rejected = [r for r in results if isinstance(r, ServiceUnavailableException)]
+    assert len(rejected) == 2
+    assert rejected[0].status_code == 503
+    assert rejected[0].headers["Retry-After"] == "1"
+    assert process_hasher.stats()["rejected"] == 2
+
+
+@pytest.mark.asyncio
+async def test_process_pool_job_deadline():
+    hasher = ProcessPoolPasswordHasher(max_workers=1, job_timeout_seconds=0.0)
+    with pytest.raises(ServiceUnavailableException, match="timed out"):
+        await hasher.hash("secret_password")
+    assert hasher.stats()["timed_out"] == 1
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_recovers_from_dead_worker(process_hasher):
+    await process_hasher.hash("warm_up")
+    for process in list(process_hasher._pool._processes.values()):
+        process.kill()
+        process.join()
+
+    hashed = await process_hasher.hash("secret_password")
+    assert await process_hasher.verify("secret_password", hashed) is True
+    assert process_hasher.stats()["restarts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_process_pool_that_stays_broken_is_unavailable(process_hasher):
+    from concurrent.futures.process import BrokenProcessPool
+
+    class BrokenPool:
+        def submit(self, *args):
+            raise BrokenProcessPool("workers died")
+
+        def shutdown(self, **kwargs):
+            pass
+
+    process_hasher._get_pool = BrokenPool
+    with pytest.raises(ServiceUnavailableException) as excinfo:
+        await process_hasher.verify("secret_password", "$argon2id$...")
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers["Retry-After"] == "1"
+    assert process_hasher.stats()["pending"] == 0
+
+
+def test_process_pool_rebuilt_in_forked_child(process_hasher):
+    pool = process_hasher._get_pool()
+    # Simulate running in a child that inherited the parent's state
+    process_hasher._pid = -1
+    assert process_hasher._get_pool() is not pool
+    pool.shutdown()
+
+
+def test_build_password_hasher_from_config():
+    assert isinstance(
+        build_password_hasher(HashingConfig()), ThreadPoolPasswordHasher
+    )
+    hasher = build_password_hasher(
+        HashingConfig(backend="process", max_workers=2, max_queue_size=8)
+    )
+    assert isinstance(hasher, ProcessPoolPasswordHasher)
+    assert hasher.stats()["max_queue_size"] == 8
+
+
+# -----------------
+# Argon2 calibration
+# -----------------
+
+
+def test_calibrate_argon2_respects_budget():
+    result = calibrate_argon2(target_ms=5, max_memory_mib=1, min_memory_mib=1, samples=1)
+    assert result["memory_cost_kib"] <= 1024
+    assert result["time_cost"] >= 1
+    assert 1 <= result["parallelism"] <= 4
+    assert result["measured_ms"] > 0
+
+
+def test_calibration_is_persisted_and_reused(tmp_path, monkeypatch):
+    from fastauth.crypto import calibration
+
+    calls = []
+
+    def fake_calibrate(**kwargs):
+        calls.append(kwargs)
+        return {"time_cost": 2, "memory_cost_kib": 4096, "parallelism": 1, "measured_ms": 10.0}
+
+    monkeypatch.setattr(calibration, "calibrate_argon2", fake_calibrate)
+    path = str(tmp_path / "argon2.json")
+
+    first = calibration.load_or_calibrate(path, target_ms=50, max_memory_mib=32)
+    second = calibration.load_or_calibrate(path, target_ms=50, max_memory_mib=32)
+    assert first == second
+    assert len(calls) == 1
+
+    # A different target invalidates the stored result
+    calibration.load_or_calibrate(path, target_ms=100, max_memory_mib=32)
+    assert len(calls) == 2
+
+
+def test_hasher_uses_configured_argon2_costs():
+    hasher = build_password_hasher(
+        HashingConfig(time_cost=1, memory_cost_kib=1024, parallelism=1)
+    )
+    assert argon2_memory_cost_kib(hasher.hasher) == 1024
+    assert "m=1024,t=1,p=1" in hasher.hasher.hash("secret_password")
+
+
+def test_calibration_cli(tmp_path, capsys):
+    from fastauth.crypto.calibration import main
+
+    output = tmp_path / "argon2.json"
+    assert main(["--target-ms", "5", "--max-memory-mib", "1", "--samples", "1",
+                 "--output", str(output)]) == 0
+    assert json.loads(output.read_text())["max_memory_mib"] == 1
+    assert "time_cost" in capsys.readouterr().out
+
+
+# -----------------
+# Hashers
+# -----------------
+
+
+def test_argon2_hasher_round_trip():
+    hasher = Argon2Hasher(time_cost=1, memory_cost_kib=1024, parallelism=1)
+    hashed = hasher.hash("secret_password")
+    assert hashed.startswith("$argon2id$")
+    assert hasher.verify("secret_password", hashed) is True
+    assert hasher.verify("wrong_password", hashed) is False
+    assert hasher.needs_update(hashed) is False
+
+    with pytest.raises(ValueError):
+        hasher.verify("secret_password", "not-a-hash")
+
+
+def test_argon2_and_passlib_hashes_are_interchangeable():
+    argon2_hasher = Argon2Hasher(time_cost=1, memory_cost_kib=1024, parallelism=1)
+    passlib_hasher = PasslibHasher(
+        build_crypt_context(time_cost=1, memory_cost_kib=1024, parallelism=1)
+    )
+    assert argon2_hasher.verify("secret_password", passlib_hasher.hash("secret_password"))
+    assert passlib_hasher.verify("secret_password", argon2_hasher.hash("secret_password"))
+
+
+def test_argon2_hasher_flags_outdated_parameters():
+    old = Argon2Hasher(time_cost=1, memory_cost_kib=1024, parallelism=1)
+    new = Argon2Hasher(time_cost=2, memory_cost_kib=1024, parallelism=1)
+    assert new.needs_update(old.hash("secret_password")) is True
+    assert new.needs_update("$pbkdf2-sha256$legacy") is True
+
+
+def test_hashers_are_picklable():
+    for hasher in (
+        Argon2Hasher(time_cost=1, memory_cost_kib=1024, parallelism=1),
+        PasslibHasher(build_crypt_context(time_cost=1, memory_cost_kib=1024, parallelism=1)),
+    ):
+        clone = pickle.loads(pickle.dumps(hasher))
+        assert clone.verify("secret_password", hasher.hash("secret_password"))
+        assert clone.memory_cost_kib == 1024
+
+
+def test_passlib_scheme_selected_by_config():
+    hasher = build_password_hasher(HashingConfig(scheme="passlib", time_cost=1))
+    assert isinstance(hasher.hasher, PasslibHasher)
+
+
+def test_importing_fastauth_does_not_import_passlib():
+    code = "import sys, fastauth, fastauth.crypto; print('passlib' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+# -----------------
+# Legacy hashes
+# -----------------
+
+
+@pytest.fixture
+def legacy_hasher():
+    return LegacyHasher(Argon2Hasher(time_cost=1, memory_cost_kib=1024, parallelism=1))
+
+
+def _legacy_hashes():
+    from passlib import hash as passlib_hash
+
+    hashes = [
+        passlib_hash.pbkdf2_sha256.using(rounds=1000).hash("secret_password"),
+        passlib_hash.scrypt.using(rounds=4).hash("secret_password"),
+        passlib_hash.django_pbkdf2_sha256.using(rounds=1000).hash("secret_password"),
+        "pbkdf2:sha256:1000$salt$"
+        + hashlib.pbkdf2_hmac("sha256", b"secret_password", b"salt", 1000).hex(),
+    ]
+    try:
+        import bcrypt
+    except ImportError:
+        pass
+    else:
+        hashes.append(bcrypt.hashpw(b"secret_password", bcrypt.gensalt(4)).decode())
+    return hashes
+
+
+def test_legacy_hashes_verify_and_need_update(legacy_hasher):
+    for hashed in _legacy_hashes():
+        assert legacy_hasher.is_legacy(hashed), hashed
+        assert legacy_hasher.verify("secret_password", hashed) is True, hashed
+        assert legacy_hasher.verify("wrong_password", hashed) is False, hashed
+        assert legacy_hasher.needs_update(hashed) is True
+
+    current = legacy_hasher.hash("secret_password")
+    assert current.startswith("$argon2id$")
+    assert legacy_hasher.verify("secret_password", current) is True
+    assert legacy_hasher.needs_update(current) is False
+
+
+def test_werkzeug_hash_without_iterations_is_rejected_cleanly(legacy_hasher):
+    hashed = "pbkdf2:sha256$salt$" + hashlib.pbkdf2_hmac(
+        "sha256", b"secret_password", b"salt", 260000
+    ).hex()
+    assert legacy_hasher.is_legacy(hashed)
+    with pytest.raises(ValueError, match="iteration count"):
+        legacy_hasher.verify("secret_password", hashed)
+
+
+def test_wrapped_legacy_hashes_verify(legacy_hasher):
+    for hashed in _legacy_hashes():
+        wrapped = legacy_hasher.wrap(hashed)
+        assert wrapped.startswith("$fawrap$")
+        assert legacy_hasher.verify("secret_password", wrapped) is True, hashed
+        assert legacy_hasher.verify("wrong_password", wrapped) is False, hashed
+        assert legacy_hasher.needs_update(wrapped) is True
+
+    with pytest.raises(ValueError):
+        legacy_hasher.wrap(legacy_hasher.hash("secret_password"))
+
+
+def test_wrap_records_streams_in_order(legacy_hasher):
+    legacy = _legacy_hashes()[0]
+    records = [{"id": i, "password": legacy} for i in range(3)]
+    records.append({"id": 3, "password": legacy_hasher.hash("secret_password")})
+
+    result = list(wrap_records(records, hasher=legacy_hasher, workers=1, chunksize=2))
+    assert [record["id"] for record in result] == [0, 1, 2, 3]
+    assert all(r["password"].startswith("$fawrap$") for r in result[:3])
+    assert result[3]["password"].startswith("$argon2id$")
+    assert legacy_hasher.verify("secret_password", result[0]["password"])
+
+
+def test_legacy_migration_selected_by_config():
+    hasher = build_password_hasher(HashingConfig(migrate_legacy_hashes=True))
+    assert isinstance(hasher.hasher, LegacyHasher)
+
+
+# -----------------
+# Admission control
+# -----------------
+
+
+class SlowBackend:
+    def __init__(self, delay):
+        self.delay = delay
+        self.hasher = Argon2Hasher(time_cost=1, memory_cost_kib=1024, parallelism=1)
+        self.calls = 0
+
+    async def hash(self, password):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return "hashed"
+
+    async def verify(self, password, hashed):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return True
+
+    def needs_update(self, hashed):
+        return False
+
+    def stats(self):
+        return {"workers": 2}
+
+    def shutdown(self, wait=True):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_admission_passes_through_when_idle():
+    hasher = AdmissionControlledPasswordHasher(SlowBackend(0.001))
+    assert await hasher.verify("pw", "hashed") is True
+    assert hasher.stats()["admission_admitted"] == 1
+    assert hasher.stats()["workers"] == 2
+
+
+@pytest.mark.asyncio
+async def test_admission_sheds_when_backlog_exceeds_max_wait():
+    backend = SlowBackend(0.05)
+    hasher = AdmissionControlledPasswordHasher(backend, max_wait_ms=120)
+
+    # Prime the service-time estimate
+    await hasher.verify("pw", "hashed")
+
+    results = await asyncio.gather(
+        *(hasher.verify("pw", "hashed") for _ in range(20)), return_exceptions=True
+    )
+    rejected = [r for r in results if isinstance(r, ServiceUnavailableException)]
+    assert rejected and all(r.status_code == 503 for r in rejected)
+    assert all(int(r.headers["Retry-After"]) >= 1 for r in rejected)
+    assert results.count(True) >= 2
+    # shed requests never reached the backend
+    assert backend.calls == 1 + results.count(True)
+
+
+@pytest.mark.asyncio
+async def test_admission_enters_overload_on_standing_queue():
+    hasher = AdmissionControlledPasswordHasher(
+        SlowBackend(0.03), max_concurrency=1, target_delay_ms=10, interval_ms=20
+    )
+    await asyncio.gather(
+        *(hasher.verify("pw", "hashed") for _ in range(6)), return_exceptions=True
+    )
+    assert hasher.stats()["admission_overloaded"] == 1
+
+    # a calm interval clears the overload state
+    await asyncio.sleep(0.03)
+    await hasher.verify("pw", "hashed")
+    await asyncio.sleep(0.03)
+    await hasher.verify("pw", "hashed")
+    assert hasher.stats()["admission_overloaded"] == 0
+
+
+def test_admission_control_selected_by_config():
+    hasher = build_password_hasher(HashingConfig(admission_control=True))
+    assert isinstance(hasher, AdmissionControlledPasswordHasher)
+    assert isinstance(hasher.backend, ThreadPoolPasswordHasher)
@@ -0,0 +1,140 @@
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fastauth.ip_access import IPAccessList, IPAccessMiddleware, read_networks
+from fastauth.network import IPRangeSet, parse_network
+
+
+def test_parse_network():
+    assert parse_network("10.1.2.3/8") == (4, 0x0A000000, 0x0AFFFFFF)
+    assert parse_network(" 192.0.2.1 ") == (4, 0xC0000201, 0xC0000201)
+    assert parse_network("::ffff:10.0.0.0/104") == (4, 0x0A000000, 0x0AFFFFFF)
+    assert parse_network("2001:db8::/32")[0] == 6
+    for invalid in ("10.0.0.0/33", "10.0.0.0/-1", "10.0.0/8", "::/129", "x"):
+        with pytest.raises(ValueError):
+            parse_network(invalid)
+
+
+def test_range_set_ipv6_intervals_sharing_high_half():
+    ranges = IPRangeSet(["2001:db8::5", "2001:db8::10/127", "2001:db8:0:1::/64"])
+    assert len(ranges) == 3
+    assert "2001:db8::5" in ranges
+    assert "2001:db8::4" not in ranges
+    assert "2001:db8::6" not in ranges
+    assert "2001:db8::11" in ranges
+    assert "2001:db8::12" not in ranges
+    assert "2001:db8:0:1:ffff:ffff:ffff:ffff" in ranges
+    assert "2001:db7:ffff:ffff:ffff:ffff:ffff:ffff" not in ranges
+    assert "::1" not in ranges
+
+
+def test_range_set_reports_packed_size():
+    ranges = IPRangeSet(f"10.{i >> 8}.{i & 255}.0/24" for i in range(0, 2000, 2))
+    assert ranges.network_count == 1000
+    assert len(ranges) == 1000
+    assert ranges.nbytes == 1000 * 8
+    assert IPRangeSet(["2001:db8::/32"]).nbytes == 32
+
+
+def test_access_list_allow_overrides_deny():
+    access_list = IPAccessList(deny=["10.0.0.0/8"], allow=["10.1.0.0/16"])
+    assert not access_list.is_allowed("10.2.0.1")
+    assert access_list.is_allowed("10.1.2.3")
+    assert access_list.is_allowed("192.0.2.1")
+    assert access_list.is_allowed("unknown")
+
+
+def test_access_list_allow_only():
+    access_list = IPAccessList(allow=["192.0.2.0/24", "2001:db8::/32"], allow_only=True)
+    assert access_list.is_allowed("192.0.2.7")
+    assert access_list.is_allowed("2001:db8::1")
+    assert not access_list.is_allowed("198.51.100.1")
+    assert not access_list.is_allowed("unknown")
+    assert not access_list.is_allowed(None)
+
+
+def test_read_networks_skips_comments(tmp_path):
+    path = tmp_path / "drop.txt"
+    path.write_text(
+        "; Spamhaus DROP List\n"
+        "1.10.16.0/20 ; SBL256894\n"
+        "\n"
+        "# local additions\n"
+        "2001:db8::/32  # test net\n"
+    )
+    assert list(read_networks(path)) == ["1.10.16.0/20", "2001:db8::/32"]
+
+
+def test_access_list_reload_swaps_lists_when_file_changes(tmp_path):
+    path = tmp_path / "deny.txt"
+    path.write_text("192.0.2.0/24\n")
+    access_list = IPAccessList.from_files(deny_file=path)
+    assert not access_list.is_allowed("192.0.2.1")
+    assert access_list.reload() is False
+
+    replacement = tmp_path / "deny.txt.new"
+    replacement.write_text("198.51.100.0/24\n203.0.113.0/24\n")
+    os.replace(replacement, path)
+    assert access_list.reload() is True
+    assert access_list.is_allowed("192.0.2.1")
+    assert not access_list.is_allowed("203.0.113.9")
+    assert access_list.stats() == (2, 2, 16, 8.0)
+
+
+def test_access_list_keeps_old_lists_on_bad_reload(tmp_path):
+    path = tmp_path / "deny.txt"
+    path.write_text("192.0.2.0/24\n")
+    access_list = IPAccessList.from_files(deny_file=path)
+    path.write_text("192.0.2.0/24\nnot-a-network\n")
+    with pytest.raises(ValueError):
+        access_list.reload()
+    assert not access_list.is_allowed("192.0.2.1")
+
+
+@pytest.mark.asyncio
+async def test_access_list_poll_reloads_in_background(tmp_path):
+    path = tmp_path / "deny.txt"
+    path.write_text("192.0.2.0/24\n")
+    access_list = IPAccessList.from_files(deny_file=path, reload_interval_seconds=0)
+    path.write_text("198.51.100.0/24\n")
+
+    access_list.poll()
+    # The swap happens off the request path
+    assert not access_list.is_allowed("192.0.2.1")
+    task = access_list._reload_task
+    assert task is not None
+    access_list.poll()
+    assert access_list._reload_task is task
+    await task
+
+    assert access_list.is_allowed("192.0.2.1")
+    assert not access_list.is_allowed("198.51.100.1")
+    assert access_list._reload_task is None
+
+
+def test_middleware_rejects_denied_peers():
+    app = FastAPI()
+
+    @app.get("/")
+    async def index():
+        return {"ok": True}
+
+    access_list = IPAccessList(deny=["127.0.0.0/8"])
+    app.add_middleware(IPAccessMiddleware, access_list=access_list)
+    assert TestClient(app, client=("127.0.0.1", 5000)).get("/").status_code == 403
+    response = TestClient(app, client=("192.0.2.1", 5000)).get("/")
+    assert response.status_code == 200
+
+
+def test_bulk_lists_pack_to_eight_bytes_per_ipv4_interval():
+    deny = [f"{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}.0/24" for i in range(0, 400000, 2)]
+    access_list = IPAccessList(deny=deny)
+    stats = access_list.stats()
+    assert stats.networks == 200000
+    # 8 bytes per interval plus the 16-bit prefix index
+    assert stats.nbytes == 200000 * 8 + 65537 * 4
+    assert not access_list.is_allowed("0.0.2.1")
+    assert access_list.is_allowed("0.0.3.1")
@@ -0,0 +1,138 @@
+import pytest
+from fastapi import Request
+
+from fastauth.network import (
+    ClientIPResolver,
+    IPRangeSet,
+    parse_forwarded_for,
+    parse_ip,
+)
+from fastauth.utils import get_client_ip
+
+
+def make_request(peer="10.0.0.1", **headers):
+    return Request(
+        scope={
+            "type": "http",
+            "client": (peer, 1234) if peer else None,
+            "headers": [
+                (name.replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def test_parse_ip():
+    assert parse_ip("1.2.3.4") == (4, 0x01020304)
+    assert parse_ip("::1") == (6, 1)
+    assert parse_ip("::ffff:1.2.3.4") == (4, 0x01020304)
+    assert parse_ip("fe80::1%eth0") == (6, 0xFE80 << 112 | 1)
+    assert parse_ip("unknown") is None
+    assert parse_ip("1.2.3.4.5") is None
+    assert parse_ip("") is None
+
+
+def test_range_set_membership():
+    ranges = IPRangeSet(["10.0.0.0/8", "192.168.1.7", "2001:db8::/32"])
+    assert "10.255.0.1" in ranges
+    assert "192.168.1.7" in ranges
+    assert "192.168.1.8" not in ranges
+    assert "11.0.0.0" not in ranges
+    assert "2001:db8:ffff::1" in ranges
+    assert "2001:db9::1" not in ranges
+    assert "::ffff:10.1.2.3" in ranges
+    assert "garbage" not in ranges
+    assert None not in ranges
+
+
+def test_range_set_merges_overlapping_networks():
+    ranges = IPRangeSet(["10.0.0.0/24", "10.0.1.0/24", "10.0.0.128/25", "::ffff:10.0.2.0/120"])
+    assert len(ranges) == 1
+    assert ranges.intervals(4) == [(0x0A000000, 0x0A0002FF)]
+
+
+def test_range_set_rejects_invalid_networks():
+    with pytest.raises(ValueError):
+        IPRangeSet(["10.0.0.0/33"])
+
+
+def test_parse_forwarded_for():
+    header = (
+        'for=192.0.2.60;proto=http;by=203.0.113.43, '
+        'for="[2001:db8:cafe::17]:4711", For=198.51.100.17:8080, proto=https'
+    )
+    assert parse_forwarded_for(header) == [
+        "192.0.2.60",
+        "2001:db8:cafe::17",
+        "198.51.100.17",
+        "",
+    ]
+
+
+def test_resolver_ignores_headers_from_untrusted_peer():
+    resolver = ClientIPResolver(["10.0.0.0/8"])
+    request = make_request(peer="203.0.113.9", x_forwarded_for="1.2.3.4")
+    assert resolver.resolve(request) == "203.0.113.9"
+
+
+def test_resolver_skips_trusted_hops_right_to_left():
+    resolver = ClientIPResolver(["10.0.0.0/8"])
+    # The client forged the first entry; the edge proxy appended the real one
+    request = make_request(x_forwarded_for="6.6.6.6, 198.51.100.7, 10.0.0.2")
+    assert resolver.resolve(request) == "198.51.100.7"
+
+
+def test_resolver_stops_at_malformed_hop():
+    resolver = ClientIPResolver(["10.0.0.0/8"])
+    request = make_request(x_forwarded_for="nonsense, 10.0.0.3:8080")
+    assert resolver.resolve(request) == "10.0.0.3"
+
+
+def test_resolver_all_trusted_hops_returns_leftmost():
+    resolver = ClientIPResolver(["10.0.0.0/8"])
+    assert resolver.resolve(make_request(x_forwarded_for="10.1.1.1, 10.2.2.2")) == "10.1.1.1"
+    assert resolver.resolve(make_request()) == "10.0.0.1"
+    assert resolver.resolve(make_request(peer=None)) == "unknown"
+
+
+def test_resolver_reads_only_the_configured_header():
+    resolver = ClientIPResolver(["10.0.0.0/8", "2001:db8::/32"], header="forwarded")
+    request = make_request(
+        forwarded='for="[2001:db8:cafe::17]:4711", for=198.51.100.17;by=10.0.0.1',
+        x_forwarded_for="6.6.6.6",
+    )
+    assert resolver.resolve(request) == "198.51.100.17"
+
+    request = make_request(forwarded='for=198.51.100.17, for="[2001:db8::1]"')
+    assert resolver.resolve(request) == "198.51.100.17"
+
+
+def test_resolver_memoizes_results():
+    resolver = ClientIPResolver(["10.0.0.0/8"], cache_size=2)
+    for i in range(5):
+        resolver.resolve_hops("10.0.0.1", f"198.51.100.{i}")
+    assert len(resolver._cache) <= 2
+    assert resolver.resolve_hops("10.0.0.1", "198.51.100.4") == "198.51.100.4"
+
+
+def test_get_client_ip_uses_resolver():
+    resolver = ClientIPResolver()
+    request = make_request(peer="203.0.113.9", x_forwarded_for="1.2.3.4")
+    assert get_client_ip(request) == "1.2.3.4"
+    assert get_client_ip(request, resolver) == "203.0.113.9"
+
+
+def test_resolver_joins_repeated_header_lines():
+    resolver = ClientIPResolver(["10.0.0.0/8"])
+    request = Request(
+        scope={
+            "type": "http",
+            "client": ("10.0.0.1", 1234),
+            "headers": [
+                (b"x-forwarded-for", b"6.6.6.6"),
+                (b"x-forwarded-for", b"198.51.100.7"),
+            ],
+        }
+    )
+    assert resolver.resolve(request) == "198.51.100.7"
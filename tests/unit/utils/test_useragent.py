@@ -0,0 +1,80 @@
+import pytest
+
+from fastauth.useragent import UNKNOWN_USER_AGENT, _classify, parse_user_agent
+
+CHROME_WINDOWS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+@pytest.mark.parametrize(
+    "user_agent, expected",
+    [
+        (CHROME_WINDOWS, ("Chrome", "Windows", "desktop")),
+        (CHROME_WINDOWS + " Edg/120.0.2210.91", ("Edge", "Windows", "desktop")),
+        (CHROME_WINDOWS + " OPR/106.0.0.0", ("Opera", "Windows", "desktop")),
+        (
+            "Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 "
+            "(KHTML, like Gecko) Version/17.2 Mobile/15E148 Safari/604.1",
+            ("Safari", "iOS", "mobile"),
+        ),
+        (
+            "Mozilla/5.0 (iPad; CPU OS 16_6 like Mac OS X) AppleWebKit/605.1.15 "
+            "(KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1",
+            ("Safari", "iOS", "tablet"),
+        ),
+        (
+            "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/120.0.6099.144 Mobile Safari/537.36",
+            ("Chrome", "Android", "mobile"),
+        ),
+        (
+            "Mozilla/5.0 (Linux; Android 13; SM-X700) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            ("Chrome", "Android", "tablet"),
+        ),
+        (
+            "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0",
+            ("Firefox", "Linux", "desktop"),
+        ),
+        (
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 "
+            "(KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+            ("Safari", "macOS", "desktop"),
+        ),
+        (
+            "Mozilla/5.0 (Windows NT 10.0; Trident/7.0; rv:11.0) like Gecko",
+            ("Internet Explorer", "Windows", "desktop"),
+        ),
+        (
+            "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+            ("Other", "Other", "bot"),
+        ),
+        ("curl/8.4.0", ("Other", "Other", "bot")),
+        ("SomeInternalClient/1.0", ("Other", "Other", "other")),
+    ],
+)
+def test_parse_user_agent(user_agent, expected):
+    assert tuple(parse_user_agent(user_agent)) == expected
+
+
+def test_parse_user_agent_handles_missing_header():
+    assert parse_user_agent(None) is UNKNOWN_USER_AGENT
+    assert parse_user_agent("") is UNKNOWN_USER_AGENT
+
+
+def test_parse_user_agent_caches_by_raw_string():
+    _classify.cache_clear()
+    first = parse_user_agent(CHROME_WINDOWS)
+    assert parse_user_agent(CHROME_WINDOWS) is first
+    assert _classify.cache_info().hits == 1
+
+
+def test_parse_user_agent_bounds_oversized_headers():
+    _classify.cache_clear()
+    padded = CHROME_WINDOWS + " x" * 10000
+    assert parse_user_agent(padded).browser == "Chrome"
+    # Classified (and cached) by the leading 512 characters only
+    parse_user_agent(padded + " different tail")
+    assert _classify.cache_info().currsize == 1
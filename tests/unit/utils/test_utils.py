@@ -1,7 +1,17 @@
+import contextvars
+
 from fastapi import Request
 
-from fastauth.crypto import hash_password, verify_password
-from fastauth.utils import get_accept_language, get_client_ip, get_user_agent
+from fastauth.audit import audit_event
+from fastauth.crypto import hash_password, soft_fingerprint, verify_password
+from fastauth.network import ClientIPResolver
+from fastauth.utils import (
+    current_request_meta,
+    get_accept_language,
+    get_client_ip,
+    get_request_meta,
+    get_user_agent,
+)
 
 
 def test_password_hashing():
@@ -43,3 +53,56 @@ def test_get_accept_language():
         scope={"type": "http", "headers": [(b"accept-language", b"en-US,en;q=0.9")]}
     )
     assert get_accept_language(request) == "en-US,en;q=0.9"
+
+
+def test_request_meta_is_built_once_per_request():
+    request = Request(
+        scope={
+            "type": "http",
+            "client": ("10.0.0.1", 1234),
+            "headers": [
+                (b"user-agent", b"Mozilla/5.0"),
+                (b"accept-language", b"en"),
+                (b"x-forwarded-for", b"198.51.100.7"),
+                (b"user-agent", b"ignored duplicate"),
+            ],
+        }
+    )
+    meta = contextvars.copy_context().run(
+        get_request_meta, request, ClientIPResolver(["10.0.0.0/8"])
+    )
+    assert get_request_meta(request) is meta
+    assert request.state.request_meta is meta
+    assert meta.client_ip == "198.51.100.7"
+    assert meta.user_agent == "Mozilla/5.0"
+    assert meta.accept_encoding is None
+    assert meta.fingerprint.hex() == soft_fingerprint(
+        "Mozilla/5.0", "198.51.100.7", "en", None
+    )
+    # Generated once, then stable
+    first = meta.request_id
+    second = meta.request_id
+    assert first and second == first
+    assert get_request_meta(request).request_id == first
+
+
+def test_audit_event_defaults_to_current_request(caplog):
+    request = Request(
+        scope={
+            "type": "http",
+            "client": ("192.0.2.4", 1234),
+            "headers": [(b"x-request-id", b"req-42")],
+        }
+    )
+
+    def handle():
+        get_request_meta(request)
+        audit_event("login", success=True)
+        audit_event("login", ip_address="203.0.113.1", success=True)
+
+    with caplog.at_level("INFO", logger="fastauth.audit"):
+        contextvars.copy_context().run(handle)
+    assert current_request_meta() is None
+    first, second = caplog.records
+    assert (first.request_id, first.ip_address) == ("req-42", "192.0.2.4")
+    assert (second.request_id, second.ip_address) == ("req-42", "203.0.113.1")
@@ -0,0 +1,75 @@
+import hashlib
+
+import pytest
+
+from fastauth.validators import BreachedPasswordValidator, build_breached_file
+from fastauth.validators.breached import main, password_digest
+
+BREACHED = ["password", "123456", "qwerty", "letmein", "hunter2"]
+
+
+def _corpus(passwords, algorithm="sha1", count=10):
+    digests = sorted(password_digest(p, algorithm).hex().upper() for p in passwords)
+    return [f"{digest}:{count}\n" for digest in digests]
+
+
+@pytest.fixture
+def breached_file(tmp_path):
+    path = tmp_path / "breached.bin"
+    assert build_breached_file(_corpus(BREACHED), path) == len(BREACHED)
+    return path
+
+
+def test_breached_passwords_are_found(breached_file):
+    validator = BreachedPasswordValidator(breached_file)
+    for password in BREACHED:
+        assert validator.is_breached(password)
+    assert not validator.is_breached("correct horse battery staple")
+    assert validator.count == len(BREACHED)
+    validator.close()
+
+
+def test_validator_raises_for_breached_password(breached_file):
+    validator = BreachedPasswordValidator(breached_file)
+    with pytest.raises(ValueError, match="data breach"):
+        validator("hunter2")
+    assert validator("correct horse battery staple") is True
+
+
+def test_ntlm_corpus(tmp_path):
+    assert password_digest("password", "ntlm").hex() == "8846f7eaee8fb117ad06bdd830b7586c"
+
+    path = tmp_path / "ntlm.bin"
+    build_breached_file(_corpus(BREACHED, "ntlm"), path, algorithm="ntlm")
+    validator = BreachedPasswordValidator(path)
+    assert validator.is_breached("letmein")
+    assert not validator.is_breached("correct horse battery staple")
+
+
+def test_build_filters_and_validates_input(tmp_path):
+    path = tmp_path / "breached.bin"
+    lines = _corpus(["password"], count=50) + _corpus(["zz-rare"], count=1)
+    lines.sort()
+    assert build_breached_file(lines, path, min_count=10) == 1
+
+    with pytest.raises(ValueError, match="sorted"):
+        build_breached_file(list(reversed(_corpus(BREACHED))), tmp_path / "bad.bin")
+    assert not (tmp_path / "bad.bin").exists()
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(hashlib.sha256(b"x").digest())
+    with pytest.raises(ValueError, match="not a breached-password file"):
+        BreachedPasswordValidator(path).is_breached("password")
+
+
+def test_build_cli(tmp_path):
+    source = tmp_path / "corpus.txt"
+    source.write_text("".join(_corpus(BREACHED)))
+    output = tmp_path / "breached.bin"
+
+    assert main([str(source), str(output), "--width", "6"]) == 0
+    validator = BreachedPasswordValidator(output)
+    assert validator.is_breached("qwerty")
+    assert validator.width == 6